@@ -0,0 +1,61 @@
+"""Configuração do gunicorn (lida automaticamente no diretório do projeto).
+
+O banco e o cache são arquivos SQLite no disco do contêiner, que serviços
+diferentes do Railway não compartilham. Por isso o worker de importação
+(``manage.py importar_noticias --worker``) sobe aqui, como processo filho
+do gunicorn, no mesmo contêiner do site. ``IMPORTACAO_WORKER=0`` desliga
+isso (quando o worker roda em outro lugar com o mesmo banco).
+"""
+import logging
+import os
+import subprocess
+import sys
+import threading
+
+logger = logging.getLogger(__name__)
+
+MANAGE_PY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'manage.py')
+ESPERA_REINICIO = 5
+
+_importacao = {'processo': None, 'encerrando': threading.Event()}
+
+
+def _manter_worker_importacao():
+    """Roda o worker de importação e o sobe de novo se ele parar."""
+    encerrando = _importacao['encerrando']
+    while not encerrando.is_set():
+        processo = subprocess.Popen([sys.executable, MANAGE_PY, 'importar_noticias', '--worker'])
+        _importacao['processo'] = processo
+        codigo = processo.wait()
+        # Num desligamento o filho pode sair antes de on_exit avisar.
+        if encerrando.wait(ESPERA_REINICIO):
+            return
+        logger.error("Worker de importação saiu com código %s; reiniciando.", codigo)
+
+
+def when_ready(server):
+    if os.getenv('IMPORTACAO_WORKER', '1') != '1':
+        return
+    threading.Thread(target=_manter_worker_importacao, name='worker-importacao', daemon=True).start()
+
+
+def on_exit(server):
+    _importacao['encerrando'].set()
+    processo = _importacao['processo']
+    if processo is None or processo.poll() is not None:
+        return
+    processo.terminate()
+    try:
+        processo.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        processo.kill()
+
+
+def post_worker_init(worker):
+    """Monta o índice de sugestões ao subir o worker, e não na primeira busca."""
+    from jornal_app.busca import carregar_indice_titulos
+
+    try:
+        carregar_indice_titulos()
+    except Exception:
+        logger.exception("Falha ao montar o índice de sugestões no worker %s", worker.pid)
@@ -56,6 +56,7 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'jornal_app.context_processors.menu_categorias',
+                'jornal_app.context_processors.placar_usuario',
             ],
         },
     },
@@ -108,15 +109,44 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # NewsDataAPI Configuration
 NEWSDATA_API_KEY = os.getenv('NEWSDATA_API_KEY', 'pub_04e01d69f2d14875b26d03e36e6a5d1d')
+NEWSDATA_URL = os.getenv('NEWSDATA_URL', 'https://newsdata.io/api/1/news')
+# Cliente da API (jornal_app/newsdata.py): novas tentativas em 429/5xx com
+# espera exponencial e limite de requisições por minuto (cota do plano).
+NEWSDATA_TENTATIVAS = int(os.getenv('NEWSDATA_TENTATIVAS', '4'))
+NEWSDATA_BACKOFF_BASE = float(os.getenv('NEWSDATA_BACKOFF_BASE', '1'))
+NEWSDATA_BACKOFF_MAXIMO = float(os.getenv('NEWSDATA_BACKOFF_MAXIMO', '30'))
+NEWSDATA_REQUISICOES_POR_MINUTO = int(os.getenv('NEWSDATA_REQUISICOES_POR_MINUTO', '30'))
+NEWSDATA_RAJADA = int(os.getenv('NEWSDATA_RAJADA', '5'))
+
+# Importação de várias categorias: buscas em paralelo, com limite de
+# requisições simultâneas por host.
+IMPORTACAO_THREADS = int(os.getenv('IMPORTACAO_THREADS', '4'))
+IMPORTACAO_POR_HOST = int(os.getenv('IMPORTACAO_POR_HOST', '2'))
+# Tarefa de importação em execução há mais que isso (segundos) é dada como falha.
+IMPORTACAO_TAREFA_TIMEOUT = int(os.getenv('IMPORTACAO_TAREFA_TIMEOUT', '900'))
 
 # Cache configuration para melhor performance
+# Arquivo SQLite (WAL) compartilhado por todos os workers do gunicorn, para
+# que as invalidações feitas num worker valham para os outros.
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'unique-snowflake',
+        'BACKEND': 'jornal_app.cache_sqlite.SQLiteCache',
+        'LOCATION': os.getenv('CACHE_PATH', str(BASE_DIR / 'cache.sqlite3')),
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+            'CULL_FREQUENCY': 4,
+        },
     }
 }
 
+# Nos testes, o cache vai para um arquivo temporário (veja test_runner.py).
+TEST_RUNNER = 'jornalDoCommercio.test_runner.ExecutorDeTestes'
+
+# Gamificação: visitas (GET) acumulam pontos em memória e são gravadas em
+# lote a cada N segundos ou quando a fila passa do limite de eventos.
+GAMIFICACAO_FLUSH_INTERVALO = float(os.getenv('GAMIFICACAO_FLUSH_INTERVALO', '5'))
+GAMIFICACAO_FLUSH_LIMITE = int(os.getenv('GAMIFICACAO_FLUSH_LIMITE', '200'))
+
 # Configurações de logging para debug
 LOGGING = {
     'version': 1,
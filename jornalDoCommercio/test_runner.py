@@ -0,0 +1,31 @@
+"""
+Executor dos testes: troca o arquivo do cache por um temporário.
+
+Os testes limpam o cache (``cache.clear()``); com o ``cache.sqlite3`` do
+projeto, isso apagaria o cache do servidor de desenvolvimento, e entradas
+dele vazariam para os testes.
+"""
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class ExecutorDeTestes(DiscoverRunner):
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._pasta_cache = tempfile.mkdtemp(prefix='cache-testes-')
+        caches = {
+            alias: {**config, 'LOCATION': f'{self._pasta_cache}/{alias}.sqlite3'}
+            for alias, config in settings.CACHES.items()
+        }
+        self._cache_temporario = override_settings(CACHES=caches)
+        self._cache_temporario.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._cache_temporario.disable()
+        shutil.rmtree(self._pasta_cache, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
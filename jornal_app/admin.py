@@ -1,5 +1,6 @@
 from django.contrib import admin
 from .models import Categoria, Noticia, Comentario  
+from .cache_noticias import invalidar_cache_noticias
 
 @admin.register(Categoria)
 class CategoriaAdmin(admin.ModelAdmin):
@@ -31,11 +32,14 @@ class NoticiaAdmin(admin.ModelAdmin):
     
     def marcar_como_destaque(self, request, queryset):
         queryset.update(destaque=True)
+        # update() não dispara post_save, então invalidamos o cache aqui
+        invalidar_cache_noticias()
         self.message_user(request, f"{queryset.count()} notícia(s) marcada(s) como destaque!")
     marcar_como_destaque.short_description = "Marcar como destaque"
     
     def remover_destaque(self, request, queryset):
         queryset.update(destaque=False)
+        invalidar_cache_noticias()
         self.message_user(request, f"{queryset.count()} notícia(s) removida(s) dos destaques!")
     remover_destaque.short_description = "Remover dos destaques"
 
@@ -0,0 +1,72 @@
+"""
+Agregação periódica do registro de atividades.
+
+Leituras e visitas a categorias chegam a ``EventoAtividade`` por
+acréscimo, em lote (``bulk_create`` da fila de gamificação), sem tocar no
+``UserProfile``. ``agregar_eventos()`` pega os eventos ainda não agregados,
+aplica-os perfil a perfil (contadores, badges, rankings e
+``ResumoDiario``) e marca-os com o número do lote. Roda logo depois de
+cada descarga da fila e pelo comando ``python manage.py agregar_atividades``,
+que recupera eventos deixados por um processo que parou antes de agregar.
+"""
+import logging
+import secrets
+from collections import defaultdict
+
+from django.db import transaction
+
+from .models import EventoAtividade, UserProfile
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_LOTE = 1000
+
+
+def novo_lote():
+    # Zero é reservado para os eventos aplicados na hora (EventoAtividade.APLICADO).
+    return secrets.randbelow(2 ** 62) + 1
+
+
+def agregar_eventos(perfil_ids=None, tamanho_lote=TAMANHO_LOTE):
+    """Aplica os eventos pendentes (de todos ou só de ``perfil_ids``).
+
+    Retorna ``{usuario_id: subiu_de_nivel}`` dos perfis que tiveram eventos.
+    """
+    resultado = {}
+    # Um lote incompleto (ou com eventos devolvidos) encerra a rodada.
+    while _agregar_lote(perfil_ids, tamanho_lote, resultado) == tamanho_lote:
+        pass
+    return resultado
+
+
+def _agregar_lote(perfil_ids, tamanho_lote, resultado):
+    pendentes = EventoAtividade.objects.filter(lote__isnull=True)
+    if perfil_ids is not None:
+        pendentes = pendentes.filter(perfil_id__in=perfil_ids)
+    lote = novo_lote()
+
+    with transaction.atomic():
+        # Reservar é a primeira escrita da transação: dois agregadores
+        # simultâneos nunca aplicam o mesmo evento.
+        primeiros = pendentes.order_by('pk').values('pk')[:tamanho_lote]
+        reservados = EventoAtividade.objects.filter(pk__in=primeiros, lote__isnull=True).update(lote=lote)
+        if not reservados:
+            return 0
+
+        por_perfil = defaultdict(list)
+        for evento in EventoAtividade.objects.filter(lote=lote).order_by('pk'):
+            por_perfil[evento.perfil_id].append(evento)
+        perfis = UserProfile.objects.select_related('usuario').in_bulk(list(por_perfil))
+
+        for perfil_id, eventos in por_perfil.items():
+            perfil = perfis[perfil_id]
+            try:
+                with transaction.atomic():
+                    subiu = perfil.aplicar_eventos(eventos)
+            except Exception:
+                logger.exception("Falha ao agregar os eventos do perfil %s", perfil_id)
+                # Devolve os eventos à fila para a próxima agregação.
+                reservados -= EventoAtividade.objects.filter(lote=lote, perfil_id=perfil_id).update(lote=None)
+                continue
+            resultado[perfil.usuario_id] = resultado.get(perfil.usuario_id, False) or subiu
+    return reservados
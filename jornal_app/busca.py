@@ -0,0 +1,390 @@
+"""
+Busca textual de notícias.
+
+Quando o banco é SQLite com FTS5, as buscas usam a tabela virtual
+``jornal_app_noticia_fts`` (criada na migração 0005) e os resultados são
+ordenados por relevância (BM25). Em qualquer outro caso a busca filtra a
+coluna ``Noticia.texto_busca``, que guarda título, conteúdo e fonte já
+sem acentos e em minúsculas.
+
+As sugestões de digitação (autocomplete) saem de ``indice_titulos``, um
+índice de prefixos em memória em cada processo. Cada título gravado ou
+removido (sinais de ``Noticia`` e importação) entra num registro de
+mudanças no cache compartilhado, numerado pela geração ``titulos``; os
+outros processos aplicam só essas notícias, sem remontar o índice.
+"""
+import logging
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+
+from django.core.cache import cache
+from django.db import connection, DatabaseError
+from django.db.models import Case, IntegerField, When
+
+logger = logging.getLogger(__name__)
+
+TABELA_FTS = 'jornal_app_noticia_fts'
+
+# Pesos do BM25 para (titulo, conteudo, autor_fonte): título vale mais.
+PESOS_BM25 = (10.0, 1.0, 5.0)
+
+_fts_por_banco = {}
+
+
+def fts_disponivel():
+    """Indica se a tabela FTS5 existe no banco atual (resultado memorizado)."""
+    if connection.vendor != 'sqlite':
+        return False
+
+    nome_banco = str(connection.settings_dict['NAME'])
+    if nome_banco not in _fts_por_banco:
+        try:
+            _fts_por_banco[nome_banco] = TABELA_FTS in connection.introspection.table_names()
+        except DatabaseError:
+            return False
+    return _fts_por_banco[nome_banco]
+
+
+def normalizar_texto(texto):
+    """Remove acentos, aplica ``casefold`` e junta espaços repetidos.
+
+    "Política  e SAÚDE" vira "politica e saude". É usada tanto para montar
+    ``Noticia.texto_busca`` quanto para tratar o que o leitor digita.
+    """
+    decomposto = unicodedata.normalize('NFKD', texto or '')
+    sem_acentos = ''.join(c for c in decomposto if not unicodedata.combining(c))
+    return ' '.join(sem_acentos.casefold().split())
+
+
+def montar_consulta_fts(termo):
+    """Converte o texto digitado em uma expressão MATCH segura.
+
+    Cada palavra vira um prefixo entre aspas (``"medida"*``), então
+    operadores do FTS5 digitados pelo leitor não são interpretados.
+    """
+    palavras = re.findall(r'\w+', normalizar_texto(termo))
+    return ' '.join(f'"{palavra}"*' for palavra in palavras)
+
+
+def _executar_fts(sql, termo, parametros=()):
+    consulta = montar_consulta_fts(termo)
+    if not consulta:
+        return []
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [consulta, *parametros])
+        return cursor.fetchall()
+
+
+def buscar_ids(termo, limite=None, deslocamento=0):
+    """Retorna os ids das notícias que casam com ``termo``, do mais ao menos relevante.
+
+    ``limite``/``deslocamento`` recortam a lista direto no SQL. Retorna
+    ``None`` quando o índice FTS5 não está disponível.
+    """
+    if not fts_disponivel():
+        return None
+
+    linhas = _executar_fts(
+        f"SELECT rowid FROM {TABELA_FTS} WHERE {TABELA_FTS} MATCH %s "
+        f"ORDER BY bm25({TABELA_FTS}, %s, %s, %s), rowid DESC "
+        f"LIMIT %s OFFSET %s",
+        termo,
+        [*PESOS_BM25, -1 if limite is None else limite, deslocamento],
+    )
+    return [linha[0] for linha in linhas]
+
+
+def ordenar_por_ids(queryset, ids):
+    """Filtra ``queryset`` pelos ``ids`` mantendo a ordem da lista."""
+    if not ids:
+        return queryset.none()
+
+    ordem = Case(
+        *[When(pk=pk, then=posicao) for posicao, pk in enumerate(ids)],
+        output_field=IntegerField(),
+    )
+    return queryset.filter(pk__in=ids).order_by(ordem)
+
+
+def _filtro_normalizado(queryset, termo):
+    palavras = normalizar_texto(termo).split()
+    if not palavras:
+        return queryset.none()
+
+    for palavra in palavras:
+        queryset = queryset.filter(texto_busca__contains=palavra)
+    return queryset.order_by('-data_publicacao')
+
+
+def buscar_pagina(queryset, termo, pagina, por_pagina):
+    """Carrega só a página ``pagina`` (começando em 1) dos resultados.
+
+    Retorna ``(noticias, tem_proxima)``. Busca um item a mais que o
+    tamanho da página para saber se existe próxima sem contar tudo.
+    """
+    deslocamento = (pagina - 1) * por_pagina
+
+    ids = buscar_ids(termo, limite=por_pagina + 1, deslocamento=deslocamento)
+    if ids is not None:
+        noticias = list(ordenar_por_ids(queryset, ids[:por_pagina]))
+        return noticias, len(ids) > por_pagina
+
+    noticias = list(_filtro_normalizado(queryset, termo)[deslocamento:deslocamento + por_pagina + 1])
+    return noticias[:por_pagina], len(noticias) > por_pagina
+
+
+def contar_resultados(queryset, termo, limite):
+    """Conta os resultados até ``limite``.
+
+    Retorna ``(total, exato)``. Quando há mais de ``limite`` resultados,
+    devolve ``(limite, False)`` e a tela mostra "mais de N" em vez de
+    percorrer todos os resultados.
+    """
+    if fts_disponivel():
+        linhas = _executar_fts(
+            f"SELECT COUNT(*) FROM (SELECT rowid FROM {TABELA_FTS} "
+            f"WHERE {TABELA_FTS} MATCH %s LIMIT %s)",
+            termo,
+            [limite + 1],
+        )
+        total = linhas[0][0] if linhas else 0
+    else:
+        total = _filtro_normalizado(queryset, termo)[:limite + 1].count()
+
+    if total > limite:
+        return limite, False
+    return total, True
+
+
+def indexar_noticia(noticia):
+    """Grava (ou regrava) a notícia no índice FTS5."""
+    indexar_noticias([noticia])
+
+
+def indexar_noticias(noticias):
+    """Grava (ou regrava) várias notícias no índice FTS5 com um ``executemany``."""
+    if not noticias or not fts_disponivel():
+        return
+
+    with connection.cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {TABELA_FTS} WHERE rowid = %s", [[noticia.pk] for noticia in noticias])
+        cursor.executemany(
+            f"INSERT INTO {TABELA_FTS} (rowid, titulo, conteudo, autor_fonte) VALUES (%s, %s, %s, %s)",
+            [[noticia.pk, noticia.titulo or '', noticia.conteudo or '', noticia.autor_fonte or ''] for noticia in noticias],
+        )
+
+
+def remover_noticia_do_indice(noticia_id):
+    """Remove a notícia do índice FTS5."""
+    if not fts_disponivel():
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABELA_FTS} WHERE rowid = %s", [noticia_id])
+
+
+class IndicePrefixos:
+    """Índice em memória das palavras dos títulos para autocomplete.
+
+    Guarda uma lista ordenada de ``(palavra, -pk)``; um prefixo vira uma
+    busca binária seguida de uma varredura curta. O ``-pk`` faz notícias
+    mais novas aparecerem primeiro entre títulos com a mesma palavra.
+    """
+
+    # Quantas entradas no máximo são examinadas por consulta, para manter o
+    # tempo por tecla limitado mesmo com prefixos muito comuns.
+    MAX_CANDIDATOS = 300
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._entradas = []
+        self._titulos = {}
+        self._remontagem = None
+        self.carregado = False
+        self.geracao = None
+
+    @staticmethod
+    def _palavras(titulo_normalizado):
+        return set(re.findall(r'\w+', titulo_normalizado))
+
+    def carregar(self, pares, geracao=None):
+        """Reconstrói o índice a partir de pares ``(pk, titulo)``.
+
+        A montagem é feita fora do lock; só a troca pelo índice novo o usa.
+        """
+        entradas = []
+        titulos = {}
+        for pk, titulo in pares:
+            normalizado = normalizar_texto(titulo)
+            titulos[pk] = (titulo, normalizado)
+            entradas.extend((palavra, -pk) for palavra in self._palavras(normalizado))
+        entradas.sort()
+
+        with self._lock:
+            self._entradas = entradas
+            self._titulos = titulos
+            self.carregado = True
+            self.geracao = geracao
+
+    def garantir_carregado(self, obter_pares, geracao=None):
+        """Carrega o índice com ``obter_pares()`` se ainda não foi carregado."""
+        if self.carregado:
+            return
+        with self._lock:
+            if not self.carregado:
+                self.carregar(obter_pares(), geracao)
+
+    def remontar_em_segundo_plano(self, obter_pares, geracao):
+        """Reconstrói o índice numa thread, servindo o atual enquanto isso."""
+        with self._lock:
+            if self._remontagem is not None and self._remontagem.is_alive():
+                return self._remontagem
+
+            def remontar():
+                try:
+                    self.carregar(obter_pares(), geracao)
+                except Exception:
+                    logger.exception("Falha ao remontar o índice de títulos")
+                finally:
+                    connection.close()
+
+            self._remontagem = threading.Thread(target=remontar, name='indice-titulos', daemon=True)
+            self._remontagem.start()
+            return self._remontagem
+
+    def aplicar(self, pares):
+        """Atualiza as notícias ``(pk, titulo)``; ``titulo`` ``None`` remove."""
+        with self._lock:
+            for pk, titulo in pares:
+                if titulo is None:
+                    self.remover(pk)
+                else:
+                    self.adicionar(pk, titulo)
+
+    def sincronizar(self, pares, de, ate):
+        """Aplica as mudanças das gerações ``de + 1`` a ``ate``.
+
+        Não faz nada se outra thread já saiu de ``de``; a próxima consulta
+        continua de onde ela parou.
+        """
+        with self._lock:
+            if self.geracao != de:
+                return False
+            self.aplicar(pares)
+            self.geracao = ate
+            return True
+
+    def adicionar(self, pk, titulo):
+        with self._lock:
+            self.remover(pk)
+            normalizado = normalizar_texto(titulo)
+            self._titulos[pk] = (titulo, normalizado)
+            for palavra in self._palavras(normalizado):
+                insort(self._entradas, (palavra, -pk))
+
+    def remover(self, pk):
+        with self._lock:
+            anterior = self._titulos.pop(pk, None)
+            if anterior is None:
+                return
+            for palavra in self._palavras(anterior[1]):
+                posicao = bisect_left(self._entradas, (palavra, -pk))
+                if posicao < len(self._entradas) and self._entradas[posicao] == (palavra, -pk):
+                    del self._entradas[posicao]
+
+    def sugerir(self, termo, limite=8):
+        """Retorna até ``limite`` pares ``(pk, titulo)`` cujo título contém
+        todas as palavras digitadas, sendo a última tratada como prefixo."""
+        palavras = re.findall(r'\w+', normalizar_texto(termo))
+        if not palavras:
+            return []
+        prefixo, completas = palavras[-1], palavras[:-1]
+
+        with self._lock:
+            encontrados = []
+            posicao = bisect_left(self._entradas, (prefixo,))
+            fim = min(len(self._entradas), posicao + self.MAX_CANDIDATOS)
+            while posicao < fim and self._entradas[posicao][0].startswith(prefixo):
+                pk = -self._entradas[posicao][1]
+                titulo, normalizado = self._titulos[pk]
+                if all(palavra in normalizado for palavra in completas):
+                    encontrados.append((pk, titulo))
+                posicao += 1
+
+        unicos = {pk: titulo for pk, titulo in encontrados}
+        return sorted(unicos.items(), reverse=True)[:limite]
+
+
+indice_titulos = IndicePrefixos()
+
+
+CHAVE_MUDANCA_TITULO = 'jornal:titulos:mudanca:{}'
+MUDANCAS_TITULOS_TIMEOUT = 60 * 60 * 24
+# Processo mais atrasado que isso remonta o índice em vez de aplicar as mudanças.
+MAX_MUDANCAS_TITULOS = 1000
+
+
+def _pares_titulos():
+    from .models import Noticia
+
+    return Noticia.objects.values_list('pk', 'titulo').iterator(chunk_size=2000)
+
+
+def registrar_mudancas_titulos(pares):
+    """Publica as notícias ``(pk, titulo)`` gravadas (``titulo`` ``None``
+    para removidas) e as aplica ao índice deste processo.
+
+    Deve rodar depois do commit: os outros processos leem os títulos do
+    banco ao aplicar a mudança.
+    """
+    from .cache_noticias import GERACAO_TITULOS, incrementar_geracao
+
+    pares = list(pares)
+    if not pares:
+        return
+    ate = incrementar_geracao(GERACAO_TITULOS, len(pares))
+    de = ate - len(pares)
+    cache.set_many(
+        {CHAVE_MUDANCA_TITULO.format(de + 1 + i): pk for i, (pk, _) in enumerate(pares)},
+        timeout=MUDANCAS_TITULOS_TIMEOUT,
+    )
+    if not indice_titulos.carregado:
+        return
+    # Se o índice estava em dia, avança a geração junto e a própria
+    # gravação não precisa ser lida de volta do banco.
+    if not indice_titulos.sincronizar(pares, de, ate):
+        indice_titulos.aplicar(pares)
+
+
+def carregar_indice_titulos():
+    """Garante ``indice_titulos`` montado e em dia com a geração ``titulos``.
+
+    Por consulta, custa uma leitura da geração no cache. Quando outro
+    processo mudou títulos, lê do registro quais notícias mudaram e busca
+    só essas no banco. Se o registro não cobre o atraso (entradas expiradas
+    ou mais de ``MAX_MUDANCAS_TITULOS``), remonta o índice numa thread e
+    continua respondendo com o atual.
+    """
+    from .cache_noticias import GERACAO_TITULOS, obter_geracao
+    from .models import Noticia
+
+    atual = obter_geracao(GERACAO_TITULOS)
+    if not indice_titulos.carregado:
+        indice_titulos.garantir_carregado(_pares_titulos, atual)
+        return
+
+    de = indice_titulos.geracao
+    if de == atual:
+        return
+    if de is not None and 0 < atual - de <= MAX_MUDANCAS_TITULOS:
+        chaves = [CHAVE_MUDANCA_TITULO.format(geracao) for geracao in range(de + 1, atual + 1)]
+        mudancas = cache.get_many(chaves)
+        if len(mudancas) == len(chaves):
+            pks = set(mudancas.values())
+            titulos = dict(Noticia.objects.filter(pk__in=pks).values_list('pk', 'titulo'))
+            indice_titulos.sincronizar([(pk, titulos.get(pk)) for pk in pks], de, atual)
+            return
+    indice_titulos.remontar_em_segundo_plano(_pares_titulos, atual)
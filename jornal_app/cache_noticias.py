@@ -0,0 +1,147 @@
+"""
+Cache de páginas que dependem das notícias publicadas e das categorias.
+
+As chaves levam um número de "geração". Em vez de apagar as entradas uma a
+uma, quem altera notícias chama ``invalidar_cache_noticias()`` (e quem
+altera categorias, ``invalidar_cache_categorias()``), que incrementa a
+geração; as entradas antigas deixam de ser lidas e expiram sozinhas.
+"""
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .busca import normalizar_texto
+
+CHAVE_GERACAO = 'jornal:geracao:{}'
+GERACAO_NOTICIAS = 'noticias'
+GERACAO_CATEGORIAS = 'categorias'
+# Recálculo das notícias relacionadas: só o ETag da página do artigo usa.
+GERACAO_RELACIONADAS = 'relacionadas'
+# Numera o registro de mudanças do índice de títulos (veja busca.py).
+GERACAO_TITULOS = 'titulos'
+
+BUSCA_CACHE_TIMEOUT = 60 * 10
+HOME_CACHE_TIMEOUT = 60 * 15
+MENU_CACHE_TIMEOUT = 60 * 60 * 24
+PLACAR_CACHE_TIMEOUT = 60 * 60
+
+CHAVE_PLACAR = 'jornal:placar:{}'
+
+# Cópia do menu de categorias neste processo, válida enquanto a geração
+# de categorias no cache compartilhado não mudar.
+_menu_local = {'geracao': None, 'categorias': None}
+
+
+def obter_geracao(nome):
+    chave = CHAVE_GERACAO.format(nome)
+    geracao = cache.get(chave)
+    if geracao is None:
+        # Começa num valor baseado no relógio: se a chave for despejada do
+        # cache, a nova geração não reaproveita entradas antigas.
+        cache.add(chave, int(time.time() * 1000), timeout=None)
+        geracao = cache.get(chave)
+    return geracao
+
+
+def incrementar_geracao(nome, quantidade=1):
+    chave = CHAVE_GERACAO.format(nome)
+    try:
+        return cache.incr(chave, quantidade)
+    except ValueError:
+        obter_geracao(nome)
+        return cache.incr(chave, quantidade)
+
+
+def invalidar_cache(nome):
+    """Incrementa a geração ``nome`` agora e de novo após o commit.
+
+    O segundo incremento descarta o que outra requisição tenha colocado no
+    cache enquanto a transação ainda não estava visível.
+    """
+    incrementar_geracao(nome)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: incrementar_geracao(nome))
+
+
+def invalidar_cache_noticias():
+    """Chamado sempre que uma notícia é criada, editada ou removida."""
+    invalidar_cache(GERACAO_NOTICIAS)
+
+
+def invalidar_cache_relacionadas():
+    """Chamado quando os vizinhos de ``NoticiaRelacionada`` são regravados."""
+    invalidar_cache(GERACAO_RELACIONADAS)
+
+
+def invalidar_cache_categorias():
+    """Chamado sempre que uma categoria é criada, editada ou removida."""
+    invalidar_cache(GERACAO_CATEGORIAS)
+
+
+def obter_categorias_menu():
+    """Lista de categorias do menu, ordenada por nome.
+
+    Custa uma leitura da geração no cache compartilhado; o banco só é
+    consultado quando nenhum processo tem o menu da geração atual.
+    """
+    geracao = obter_geracao(GERACAO_CATEGORIAS)
+    if _menu_local['geracao'] == geracao:
+        return _menu_local['categorias']
+
+    chave = f'jornal:menu_categorias:{geracao}'
+    categorias = cache.get(chave)
+    if categorias is None:
+        from .models import Categoria
+
+        categorias = list(Categoria.objects.all().order_by('nome'))
+        cache.set(chave, categorias, MENU_CACHE_TIMEOUT)
+
+    _menu_local.update(geracao=geracao, categorias=categorias)
+    return categorias
+
+
+def chave_busca(query, pagina=None):
+    """Chave da página ``pagina`` da busca; sem página, a chave da contagem."""
+    resumo = hashlib.md5(normalizar_texto(query).encode('utf-8')).hexdigest()
+    sufixo = 'total' if pagina is None else f'p{pagina}'
+    return f'jornal:busca:{obter_geracao(GERACAO_NOTICIAS)}:{resumo}:{sufixo}'
+
+
+def obter_ou_calcular(chave, calcular, timeout=BUSCA_CACHE_TIMEOUT):
+    valor = cache.get(chave)
+    if valor is None:
+        valor = calcular()
+        cache.set(chave, valor, timeout)
+    return valor
+
+
+def obter_placar(usuario_id):
+    """Pontos e nível do usuário para o cabeçalho: ``{'pontos': ..., 'nivel': ...}``.
+
+    Vem do cache compartilhado; o perfil só é consultado quando o placar
+    não está lá (primeiro acesso ou entrada despejada).
+    """
+    chave = CHAVE_PLACAR.format(usuario_id)
+    placar = cache.get(chave)
+    if placar is None:
+        from .models import UserProfile
+
+        placar = UserProfile.objects.filter(usuario_id=usuario_id).values('pontos', 'nivel').first()
+        placar = placar or {'pontos': 0, 'nivel': 1}
+        cache.set(chave, placar, PLACAR_CACHE_TIMEOUT)
+    return placar
+
+
+def atualizar_placar(usuario_id, pontos, nivel):
+    """Grava o placar novo; dentro de uma transação, só depois do commit."""
+    chave = CHAVE_PLACAR.format(usuario_id)
+    placar = {'pontos': pontos, 'nivel': nivel}
+    if transaction.get_connection().in_atomic_block:
+        # Até o commit o cabeçalho volta a ler o perfil, que ainda tem os
+        # valores antigos; se houver rollback, nada errado fica no cache.
+        cache.delete(chave)
+        transaction.on_commit(lambda: cache.set(chave, placar, PLACAR_CACHE_TIMEOUT))
+    else:
+        cache.set(chave, placar, PLACAR_CACHE_TIMEOUT)
@@ -0,0 +1,299 @@
+"""
+Backend de cache do Django guardado num arquivo SQLite em modo WAL.
+
+Todos os workers do gunicorn na mesma máquina abrem o mesmo arquivo, então
+o que um worker grava (inclusive os contadores de geração usados para
+invalidar o cache) os outros enxergam. Não depende de Redis nem Memcached.
+
+Configuração em ``settings.CACHES``::
+
+    'default': {
+        'BACKEND': 'jornal_app.cache_sqlite.SQLiteCache',
+        'LOCATION': BASE_DIR / 'cache.sqlite3',
+        'OPTIONS': {'MAX_ENTRIES': 10000, 'CULL_FREQUENCY': 4},
+    }
+
+Além do TTL, o backend remove as entradas menos usadas (LRU) quando passa de
+``MAX_ENTRIES``, e mantém contadores de acertos e falhas compartilhados
+entre os processos (veja ``estatisticas()``).
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    chave TEXT PRIMARY KEY,
+    valor BLOB NOT NULL,
+    expira REAL,
+    acesso REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS cache_acesso ON cache (acesso);
+CREATE TABLE IF NOT EXISTS cache_estatisticas (
+    nome TEXT PRIMARY KEY,
+    valor INTEGER NOT NULL
+);
+"""
+
+
+class SQLiteCache(BaseCache):
+    # Só regrava o horário de acesso (usado pelo LRU) se o último registro
+    # tiver mais de N segundos; evita transformar toda leitura em escrita.
+    RESOLUCAO_ACESSO = 30
+
+    # A contagem de entradas (para decidir o despejo) roda a cada N gravações.
+    INTERVALO_VERIFICACAO = 50
+
+    # Os contadores de acertos/falhas vão para o arquivo a cada N leituras.
+    INTERVALO_ESTATISTICAS = 100
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        self._caminho = str(location)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._gravacoes = 0
+        self._acertos_pendentes = 0
+        self._falhas_pendentes = 0
+
+    # --- conexão ---------------------------------------------------------
+
+    def _conexao(self):
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is None or self._local.pid != os.getpid():
+            conexao = sqlite3.connect(self._caminho, timeout=10, isolation_level=None, check_same_thread=False)
+            conexao.execute('PRAGMA journal_mode=WAL')
+            conexao.execute('PRAGMA synchronous=NORMAL')
+            conexao.executescript(ESQUEMA)
+            self._local.conexao = conexao
+            self._local.pid = os.getpid()
+        return conexao
+
+    def _transacao(self, funcao):
+        """Executa ``funcao(conexao)`` dentro de ``BEGIN IMMEDIATE``."""
+        conexao = self._conexao()
+        conexao.execute('BEGIN IMMEDIATE')
+        try:
+            resultado = funcao(conexao)
+        except BaseException:
+            conexao.execute('ROLLBACK')
+            raise
+        conexao.execute('COMMIT')
+        return resultado
+
+    # --- auxiliares ------------------------------------------------------
+
+    def _expiracao(self, timeout):
+        return self.get_backend_timeout(timeout)
+
+    @staticmethod
+    def _serializar(valor):
+        return pickle.dumps(valor, pickle.HIGHEST_PROTOCOL)
+
+    def _registrar_leitura(self, acertos, falhas):
+        with self._lock:
+            self._acertos_pendentes += acertos
+            self._falhas_pendentes += falhas
+            pendentes = self._acertos_pendentes + self._falhas_pendentes
+        if pendentes >= self.INTERVALO_ESTATISTICAS:
+            self._gravar_estatisticas()
+
+    def _gravar_estatisticas(self):
+        with self._lock:
+            acertos, falhas = self._acertos_pendentes, self._falhas_pendentes
+            self._acertos_pendentes = self._falhas_pendentes = 0
+        if not acertos and not falhas:
+            return
+
+        def gravar(conexao):
+            conexao.executemany(
+                'INSERT INTO cache_estatisticas (nome, valor) VALUES (?, ?) '
+                'ON CONFLICT(nome) DO UPDATE SET valor = valor + excluded.valor',
+                [('acertos', acertos), ('falhas', falhas)],
+            )
+
+        self._transacao(gravar)
+
+    def _ler(self, chaves):
+        """Retorna ``{chave: valor}`` das chaves válidas, atualizando o LRU."""
+        if not chaves:
+            return {}
+
+        agora = time.time()
+        marcadores = ','.join('?' * len(chaves))
+        linhas = self._conexao().execute(
+            f'SELECT chave, valor, expira, acesso FROM cache WHERE chave IN ({marcadores})',
+            chaves,
+        ).fetchall()
+
+        encontrados = {}
+        expiradas = []
+        tocar = []
+        for chave, valor, expira, acesso in linhas:
+            if expira is not None and expira <= agora:
+                expiradas.append(chave)
+                continue
+            encontrados[chave] = pickle.loads(valor)
+            if agora - acesso > self.RESOLUCAO_ACESSO:
+                tocar.append(chave)
+
+        if expiradas or tocar:
+            def atualizar(conexao):
+                conexao.executemany(
+                    'DELETE FROM cache WHERE chave = ? AND expira <= ?',
+                    [(chave, agora) for chave in expiradas],
+                )
+                conexao.executemany(
+                    'UPDATE cache SET acesso = ? WHERE chave = ?',
+                    [(agora, chave) for chave in tocar],
+                )
+
+            self._transacao(atualizar)
+
+        self._registrar_leitura(len(encontrados), len(chaves) - len(encontrados))
+        return encontrados
+
+    def _gravar(self, conexao, itens, timeout):
+        agora = time.time()
+        expira = self._expiracao(timeout)
+        conexao.executemany(
+            'INSERT OR REPLACE INTO cache (chave, valor, expira, acesso) VALUES (?, ?, ?, ?)',
+            [(chave, self._serializar(valor), expira, agora) for chave, valor in itens],
+        )
+
+    def _talvez_despejar(self, gravadas):
+        with self._lock:
+            self._gravacoes += gravadas
+            if self._gravacoes < self.INTERVALO_VERIFICACAO:
+                return
+            self._gravacoes = 0
+        self._despejar()
+
+    def _despejar(self):
+        """Remove as expiradas e, se ainda passar do limite, as menos usadas."""
+        def despejar(conexao):
+            conexao.execute('DELETE FROM cache WHERE expira <= ?', [time.time()])
+            total = conexao.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+            if total <= self._max_entries:
+                return
+            excesso = total - self._max_entries
+            remover = max(excesso, total // self._cull_frequency) if self._cull_frequency else total
+            conexao.execute(
+                'DELETE FROM cache WHERE chave IN (SELECT chave FROM cache ORDER BY acesso LIMIT ?)',
+                [remover],
+            )
+
+        self._transacao(despejar)
+
+    # --- API do BaseCache ------------------------------------------------
+
+    def get(self, key, default=None, version=None):
+        chave = self.make_and_validate_key(key, version=version)
+        return self._ler([chave]).get(chave, default)
+
+    def get_many(self, keys, version=None):
+        chaves = {self.make_and_validate_key(key, version=version): key for key in keys}
+        encontrados = self._ler(list(chaves))
+        return {chaves[chave]: valor for chave, valor in encontrados.items()}
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        chave = self.make_and_validate_key(key, version=version)
+        self._transacao(lambda conexao: self._gravar(conexao, [(chave, value)], timeout))
+        self._talvez_despejar(1)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        itens = [(self.make_and_validate_key(key, version=version), value) for key, value in data.items()]
+        if itens:
+            self._transacao(lambda conexao: self._gravar(conexao, itens, timeout))
+            self._talvez_despejar(len(itens))
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        chave = self.make_and_validate_key(key, version=version)
+
+        def adicionar(conexao):
+            conexao.execute('DELETE FROM cache WHERE chave = ? AND expira <= ?', [chave, time.time()])
+            cursor = conexao.execute(
+                'INSERT OR IGNORE INTO cache (chave, valor, expira, acesso) VALUES (?, ?, ?, ?)',
+                [chave, self._serializar(value), self._expiracao(timeout), time.time()],
+            )
+            return cursor.rowcount == 1
+
+        adicionado = self._transacao(adicionar)
+        if adicionado:
+            self._talvez_despejar(1)
+        return adicionado
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        chave = self.make_and_validate_key(key, version=version)
+
+        def tocar(conexao):
+            cursor = conexao.execute(
+                'UPDATE cache SET expira = ?, acesso = ? WHERE chave = ? AND (expira IS NULL OR expira > ?)',
+                [self._expiracao(timeout), time.time(), chave, time.time()],
+            )
+            return cursor.rowcount == 1
+
+        return self._transacao(tocar)
+
+    def incr(self, key, delta=1, version=None):
+        """Incremento atômico entre processos (o do BaseCache faz get + set)."""
+        chave = self.make_and_validate_key(key, version=version)
+
+        def incrementar(conexao):
+            linha = conexao.execute(
+                'SELECT valor FROM cache WHERE chave = ? AND (expira IS NULL OR expira > ?)',
+                [chave, time.time()],
+            ).fetchone()
+            if linha is None:
+                raise ValueError("Key '%s' not found" % key)
+            novo_valor = pickle.loads(linha[0]) + delta
+            conexao.execute(
+                'UPDATE cache SET valor = ?, acesso = ? WHERE chave = ?',
+                [self._serializar(novo_valor), time.time(), chave],
+            )
+            return novo_valor
+
+        return self._transacao(incrementar)
+
+    def delete(self, key, version=None):
+        chave = self.make_and_validate_key(key, version=version)
+        cursor = self._transacao(lambda conexao: conexao.execute('DELETE FROM cache WHERE chave = ?', [chave]))
+        return cursor.rowcount == 1
+
+    def delete_many(self, keys, version=None):
+        chaves = [(self.make_and_validate_key(key, version=version),) for key in keys]
+        if chaves:
+            self._transacao(lambda conexao: conexao.executemany('DELETE FROM cache WHERE chave = ?', chaves))
+
+    def has_key(self, key, version=None):
+        chave = self.make_and_validate_key(key, version=version)
+        linha = self._conexao().execute(
+            'SELECT 1 FROM cache WHERE chave = ? AND (expira IS NULL OR expira > ?)',
+            [chave, time.time()],
+        ).fetchone()
+        return linha is not None
+
+    def clear(self):
+        self._transacao(lambda conexao: conexao.execute('DELETE FROM cache'))
+
+    # --- estatísticas ----------------------------------------------------
+
+    def estatisticas(self):
+        """Acertos, falhas e entradas somando todos os processos."""
+        self._gravar_estatisticas()
+        conexao = self._conexao()
+        contadores = dict(conexao.execute('SELECT nome, valor FROM cache_estatisticas').fetchall())
+        acertos = contadores.get('acertos', 0)
+        falhas = contadores.get('falhas', 0)
+        total = acertos + falhas
+        return {
+            'acertos': acertos,
+            'falhas': falhas,
+            'taxa_acerto': acertos / total if total else 0.0,
+            'entradas': conexao.execute('SELECT COUNT(*) FROM cache').fetchone()[0],
+        }
@@ -0,0 +1,72 @@
+"""
+Regras dos badges (conquistas) da gamificação.
+
+Cada badge é uma linha de ``REGRAS_BADGES``: um contador do
+``UserProfile`` e o valor mínimo dele. ``UserProfile.incrementar()`` só
+avalia as regras dos contadores que acabou de alterar, e só grava o badge
+quando o contador passa do mínimo; a página de perfil lê os badges já
+gravados em ``Conquista``.
+"""
+from dataclasses import dataclass
+
+from .cache_noticias import obter_categorias_menu
+
+# Mínimo que depende de quantas categorias existem no momento.
+TODAS_AS_CATEGORIAS = None
+
+
+@dataclass(frozen=True)
+class RegraBadge:
+    codigo: str
+    nome: str
+    contador: str
+    minimo: object
+
+    def limite(self, total_categorias):
+        return total_categorias() if self.minimo is TODAS_AS_CATEGORIAS else self.minimo
+
+
+REGRAS_BADGES = (
+    RegraBadge('leitor_iniciante', '📚  Leitor Iniciante', 'noticias_lidas', 10),
+    RegraBadge('leitor_avido', '📖  Leitor Ávido', 'noticias_lidas', 50),
+    RegraBadge('comentarista', '💬  Comentarista', 'comentarios_feitos', 5),
+    RegraBadge('debatedor', '🗣️  Debatedor', 'comentarios_feitos', 20),
+    RegraBadge('explorador', '🧭  Explorador', 'total_categorias_visitadas', 3),
+    RegraBadge('navegador_completo', '🌎  Navegador Completo', 'total_categorias_visitadas', TODAS_AS_CATEGORIAS),
+    RegraBadge('estrela_em_ascensao', '⭐  Estrela em Ascensão', 'nivel', 5),
+    RegraBadge('lenda_do_jornal', '🏆  Lenda do Jornal', 'nivel', 10),
+)
+
+REGRAS_POR_CODIGO = {regra.codigo: regra for regra in REGRAS_BADGES}
+
+
+def contar_categorias():
+    """Total de categorias, lido do menu já guardado em cache."""
+    return len(obter_categorias_menu())
+
+
+def regras_alcancadas(antes, depois, total_categorias=contar_categorias):
+    """Regras cujo contador passou do mínimo entre ``antes`` e ``depois``.
+
+    Os dois são dicionários ``contador -> valor`` e só os contadores
+    presentes em ``depois`` são avaliados.
+    """
+    return [
+        regra for regra in REGRAS_BADGES
+        if regra.contador in depois
+        and antes.get(regra.contador, 0) < regra.limite(total_categorias) <= depois[regra.contador]
+    ]
+
+
+def regras_satisfeitas(valores, total_categorias=contar_categorias):
+    """Todas as regras atendidas por ``valores`` (usado para recalcular do zero)."""
+    return [
+        regra for regra in REGRAS_BADGES
+        if regra.contador in valores and valores[regra.contador] >= regra.limite(total_categorias)
+    ]
+
+
+def nomes_dos_badges(codigos):
+    """Nomes dos badges em ``codigos``, na ordem de ``REGRAS_BADGES``."""
+    codigos = set(codigos)
+    return [regra.nome for regra in REGRAS_BADGES if regra.codigo in codigos]
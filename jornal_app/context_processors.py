@@ -1,7 +1,15 @@
-from .models import Categoria
+from django.utils.functional import SimpleLazyObject
+
+from .cache_noticias import obter_categorias_menu, obter_placar
 
 def menu_categorias(request):
-    categorias = Categoria.objects.all().order_by('nome')
     return {
-        'categorias': categorias
-    }
\ No newline at end of file
+        'categorias': obter_categorias_menu()
+    }
+
+def placar_usuario(request):
+    if not request.user.is_authenticated:
+        return {}
+    return {
+        'placar': SimpleLazyObject(lambda: obter_placar(request.user.pk))
+    }
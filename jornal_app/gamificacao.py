@@ -0,0 +1,174 @@
+"""
+Fila de escrita adiada (write-behind) da gamificação.
+
+Ler uma notícia ou abrir uma categoria dá pontos, mas essas visitas são
+GETs e não devem esperar por UPDATEs (no SQLite um escritor bloqueia os
+demais). As visitas são acumuladas em memória por usuário e gravadas em
+lote pelo ``descarregar()``, que roda numa thread a cada
+``GAMIFICACAO_FLUSH_INTERVALO`` segundos ou assim que a fila passa de
+``GAMIFICACAO_FLUSH_LIMITE`` eventos. A descarga só acrescenta linhas a
+``EventoAtividade`` (um ``bulk_create``) e em seguida chama a agregação
+de ``atividades``, que soma os eventos ao ``UserProfile``.
+
+Enquanto a fila não é gravada, o nível mostrado ao leitor é projetado a
+partir dos pontos do banco somados aos pendentes, então a mensagem de
+"subiu de nível" continua aparecendo na visita certa.
+"""
+import atexit
+import logging
+import threading
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from .atividades import agregar_eventos
+from .models import EventoAtividade, PONTOS_CATEGORIA_NOVA, PONTOS_LEITURA, nivel_para_pontos
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Pendencia:
+    perfil_id: int
+    leituras: dict = field(default_factory=dict)  # noticia_id -> (categoria_id, quando)
+    categorias: dict = field(default_factory=dict)  # categoria_id -> quando
+
+    def pontos(self, categorias_conhecidas=()):
+        novas = self.categorias.keys() - set(categorias_conhecidas)
+        return len(self.leituras) * PONTOS_LEITURA + len(novas) * PONTOS_CATEGORIA_NOVA
+
+    def eventos(self):
+        leituras = [
+            EventoAtividade(
+                perfil_id=self.perfil_id, tipo=EventoAtividade.LEITURA,
+                objeto_id=noticia_id, categoria_id=categoria_id, criado_em=quando,
+            )
+            for noticia_id, (categoria_id, quando) in self.leituras.items()
+        ]
+        categorias = [
+            EventoAtividade(
+                perfil_id=self.perfil_id, tipo=EventoAtividade.CATEGORIA,
+                objeto_id=categoria_id, categoria_id=categoria_id, criado_em=quando,
+            )
+            for categoria_id, quando in self.categorias.items()
+        ]
+        return leituras + categorias
+
+
+class FilaGamificacao:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pendencias = {}
+        self._eventos = 0
+        self._timer = None
+
+    @property
+    def intervalo(self):
+        return getattr(settings, 'GAMIFICACAO_FLUSH_INTERVALO', 5)
+
+    @property
+    def limite(self):
+        return getattr(settings, 'GAMIFICACAO_FLUSH_LIMITE', 200)
+
+    def pontos_pendentes(self, perfil):
+        conhecidas = perfil.ids_categorias_visitadas
+        with self._lock:
+            pendencia = self._pendencias.get(perfil.usuario_id)
+            return pendencia.pontos(conhecidas) if pendencia else 0
+
+    def _registrar(self, perfil, noticia_id=None, categoria_id=None):
+        """Enfileira a visita e retorna ``(subiu_de_nivel, nivel_projetado)``."""
+        conhecidas = perfil.ids_categorias_visitadas
+        if noticia_id is not None and perfil.ja_leu(noticia_id):
+            # Releitura: não pontua nem gera escrita.
+            noticia_id = None
+        if noticia_id is None and (categoria_id is None or categoria_id in conhecidas):
+            return False, nivel_para_pontos(perfil.pontos + self.pontos_pendentes(perfil))
+
+        agora = timezone.now()
+        with self._lock:
+            pendencia = self._pendencias.setdefault(perfil.usuario_id, Pendencia(perfil.pk))
+            antes = perfil.pontos + pendencia.pontos(conhecidas)
+            if noticia_id is not None:
+                pendencia.leituras.setdefault(noticia_id, (categoria_id, agora))
+            if categoria_id is not None:
+                pendencia.categorias.setdefault(categoria_id, agora)
+            depois = perfil.pontos + pendencia.pontos(conhecidas)
+            self._eventos += 1
+            eventos = self._eventos
+
+        if self.intervalo <= 0:
+            self.descarregar()
+        elif eventos >= self.limite:
+            threading.Thread(target=self._descarregar_em_thread, daemon=True).start()
+        else:
+            self._agendar()
+
+        nivel = nivel_para_pontos(depois)
+        return nivel > nivel_para_pontos(antes), nivel
+
+    def registrar_leitura(self, perfil, noticia_id, categoria_id):
+        return self._registrar(perfil, noticia_id=noticia_id, categoria_id=categoria_id)
+
+    def registrar_visita_categoria(self, perfil, categoria_id):
+        return self._registrar(perfil, categoria_id=categoria_id)
+
+    def _agendar(self):
+        with self._lock:
+            if self._timer is not None:
+                return
+            self._timer = threading.Timer(self.intervalo, self._descarregar_em_thread)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _descarregar_em_thread(self):
+        try:
+            self.descarregar()
+        finally:
+            # Cada thread abre a própria conexão com o banco.
+            connection.close()
+
+    def descarregar(self, usuario_id=None):
+        """Grava as pendências (de todos ou só de ``usuario_id``), agrega e retorna quantas gravou."""
+        with self._lock:
+            if usuario_id is None:
+                pendencias, self._pendencias = self._pendencias, {}
+                self._eventos = 0
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            else:
+                pendencia = self._pendencias.pop(usuario_id, None)
+                pendencias = {usuario_id: pendencia} if pendencia else {}
+
+        if not pendencias:
+            return 0
+        eventos = [evento for pendencia in pendencias.values() for evento in pendencia.eventos()]
+        try:
+            EventoAtividade.objects.bulk_create(eventos)
+        except Exception:
+            logger.exception("Falha ao gravar %s eventos de atividade", len(eventos))
+            return 0
+        perfil_ids = None if usuario_id is None else [pendencias[usuario_id].perfil_id]
+        try:
+            agregar_eventos(perfil_ids)
+        except Exception:
+            # Os eventos já estão gravados; a próxima agregação os pega.
+            logger.exception("Falha ao agregar eventos de atividade")
+        return len(pendencias)
+
+    def descartar(self):
+        """Esvazia a fila sem gravar (usado nos testes)."""
+        with self._lock:
+            self._pendencias = {}
+            self._eventos = 0
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+
+fila_gamificacao = FilaGamificacao()
+atexit.register(fila_gamificacao.descarregar)
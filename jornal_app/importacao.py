@@ -0,0 +1,355 @@
+"""
+Importação de notícias da API do NewsData.
+
+Toda requisição passa pelo cliente de ``newsdata`` (sessão com pool de
+conexões, novas tentativas e limite de taxa). Ao importar várias
+categorias, as buscas rodam num pool de ``IMPORTACAO_THREADS`` threads,
+com no máximo ``IMPORTACAO_POR_HOST`` requisições abertas ao mesmo tempo
+para o mesmo host. As threads só fazem a requisição HTTP: as notícias de
+cada categoria são gravadas pela thread que chamou, conforme as buscas
+terminam, então o banco continua com um só escritor e o tempo total fica
+perto do da categoria mais lenta.
+
+O admin não importa dentro da requisição: ``enfileirar_importacao()`` cria
+uma ``TarefaImportacao`` por categoria e o worker
+(``python manage.py importar_noticias --worker``) executa as pendentes com
+``executar_tarefas()``.
+"""
+import logging
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from functools import partial
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .busca import indexar_noticias, registrar_mudancas_titulos
+from .cache_noticias import invalidar_cache_noticias
+from .links import normalizar_url
+from .models import Noticia, TarefaImportacao
+from .newsdata import cliente_newsdata
+from .relacionadas import atualizar_relacionadas
+
+logger = logging.getLogger(__name__)
+
+# Links por consulta de duplicadas e notícias por INSERT.
+TAMANHO_LOTE = 500
+
+# Tarefa em execução há mais tempo que isso é de um worker que parou.
+TAREFA_TIMEOUT = 15 * 60
+
+MAPEAMENTO_PARA_API = {
+    'Política': 'politics',
+    'Esportes': 'sports',
+    'Economia': 'business',
+    'Tecnologia': 'technology',
+    'Entretenimento': 'entertainment',
+    'Saúde': 'health',
+    'Ciência': 'science',
+    'Geral': 'general'
+}
+
+
+@dataclass
+class ResultadoImportacao:
+    categoria: object
+    recebidas: int = 0
+    importadas: int = 0
+    erro: str = ''
+    duracao: float = 0.0
+
+
+class LimitePorHost:
+    """Um semáforo por host, para não abrir requisições demais no mesmo servidor."""
+
+    def __init__(self, limite):
+        self.limite = limite
+        self._lock = threading.Lock()
+        self._semaforos = {}
+
+    def __call__(self, url):
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            if host not in self._semaforos:
+                self._semaforos[host] = threading.BoundedSemaphore(self.limite)
+            return self._semaforos[host]
+
+
+def buscar_artigos(categoria, limite_por_host=None):
+    """Artigos da API para ``categoria``; levanta ``ErroNewsData`` se a busca falhar."""
+    cliente = cliente_newsdata()
+    params = {
+        'country': 'br',
+        'language': 'pt',
+        'category': MAPEAMENTO_PARA_API.get(categoria.nome, 'general'),
+        'size': 5
+    }
+
+    if limite_por_host is None:
+        return cliente.buscar_noticias(**params)
+    with limite_por_host(cliente.url):
+        return cliente.buscar_noticias(**params)
+
+
+def _buscar(categoria, limite_por_host):
+    """Roda no pool: retorna ``(artigos, erro, duracao)`` sem levantar exceção."""
+    inicio = time.monotonic()
+    try:
+        artigos, erro = buscar_artigos(categoria, limite_por_host), ''
+    except Exception as e:
+        artigos, erro = [], str(e) or e.__class__.__name__
+    return artigos, erro, time.monotonic() - inicio
+
+
+def _gravar(resultado, artigos, erro, duracao):
+    resultado.duracao = duracao
+    if erro:
+        resultado.erro = erro
+        logger.warning("Falha ao buscar notícias de %s: %s", resultado.categoria.nome, erro)
+        return resultado
+    resultado.recebidas = len(artigos)
+    try:
+        resultado.importadas = processar_artigos_para_categoria(artigos, resultado.categoria)
+    except Exception as e:
+        resultado.erro = str(e)
+        logger.exception("Falha ao gravar notícias de %s", resultado.categoria.nome)
+    return resultado
+
+
+def importar_categoria(categoria):
+    return _gravar(ResultadoImportacao(categoria), *_buscar(categoria, None))
+
+
+def importar_categorias(categorias, threads=None, por_host=None, ao_concluir=None):
+    """Importa as ``categorias`` com as buscas em paralelo.
+
+    Retorna um ``ResultadoImportacao`` por categoria, na ordem recebida; a
+    falha de uma categoria fica no resultado dela e não interrompe as outras.
+    ``ao_concluir(resultado)``, se informado, é chamado na thread de quem
+    chamou assim que cada categoria termina.
+    """
+    categorias = list(categorias)
+    if not categorias:
+        return []
+    threads = threads or getattr(settings, 'IMPORTACAO_THREADS', 4)
+    limite = LimitePorHost(por_host or getattr(settings, 'IMPORTACAO_POR_HOST', 2))
+
+    resultados = [ResultadoImportacao(categoria) for categoria in categorias]
+    with ThreadPoolExecutor(max_workers=min(threads, len(categorias)), thread_name_prefix='importacao') as pool:
+        futuros = {pool.submit(_buscar, r.categoria, limite): r for r in resultados}
+        for futuro in as_completed(futuros):
+            resultado = _gravar(futuros[futuro], *futuro.result())
+            if ao_concluir is not None:
+                ao_concluir(resultado)
+    return resultados
+
+
+def importar_noticias_por_categoria(categoria):
+    return importar_categoria(categoria).importadas
+
+
+def _montar_noticia(article, categoria, url_normalizada):
+    # A API manda ``null`` em campos vazios, então ``get(chave, padrão)`` não basta.
+    data_publicacao = parse_date(article.get('pubDate'))
+
+    conteudo_final = article.get('description')
+    if not conteudo_final:
+        conteudo_final = article.get('content')
+    if not conteudo_final:
+        conteudo_final = article.get('title', 'Artigo sem conteúdo') or ''
+
+    if not conteudo_final.strip():
+        return None
+
+    noticia = Noticia(
+        titulo=(article.get('title') or '')[:200],
+        conteudo=conteudo_final[:2000],
+        categoria=categoria,
+        url_fonte=(article.get('link') or '')[:500],
+        url_normalizada=url_normalizada,
+        imagem_url=(article.get('image_url') or '')[:500],
+        autor_fonte=(article.get('source_id') or 'Fonte Externa')[:100],
+        data_publicacao=data_publicacao,
+        destaque=(categoria.nome == 'Política')
+    )
+    # bulk_create não passa pelo save(), que é quem preenche o texto de busca.
+    noticia.atualizar_texto_busca()
+    return noticia
+
+
+def _em_blocos(itens):
+    for inicio in range(0, len(itens), TAMANHO_LOTE):
+        yield itens[inicio:inicio + TAMANHO_LOTE]
+
+
+def processar_artigos_para_categoria(articles, categoria):
+    """Grava os artigos ainda não importados e retorna quantos gravou.
+
+    A deduplicação usa a URL normalizada (``links.normalizar_url``): links
+    repetidos no próprio lote são descartados antes, os que já estão no
+    banco saem de uma consulta ``url_normalizada__in`` por bloco de
+    ``TAMANHO_LOTE`` e o índice único da coluna resolve o que sobrar de
+    corrida com outra importação simultânea (``ignore_conflicts``).
+    Artigos sem link não são importados.
+    """
+    artigos_por_url = {}
+    for article in articles:
+        try:
+            url_normalizada = normalizar_url(article.get('link'))
+        except (AttributeError, TypeError):
+            logger.warning("Artigo com link inválido ignorado em %s: %r", categoria.nome, article)
+            continue
+        if url_normalizada:
+            artigos_por_url.setdefault(url_normalizada, article)
+
+    existentes = set()
+    for bloco in _em_blocos(list(artigos_por_url)):
+        existentes.update(Noticia.objects.filter(url_normalizada__in=bloco).values_list('url_normalizada', flat=True))
+
+    # Um artigo malformado fica de fora sozinho, sem derrubar o lote.
+    candidatas = {}
+    for url_normalizada, article in artigos_por_url.items():
+        if url_normalizada in existentes:
+            continue
+        try:
+            noticia = _montar_noticia(article, categoria, url_normalizada)
+        except Exception:
+            logger.exception("Artigo ignorado em %s: %s", categoria.nome, url_normalizada)
+            continue
+        if noticia is not None:
+            candidatas[url_normalizada] = noticia
+    if not candidatas:
+        return 0
+
+    with transaction.atomic():
+        Noticia.objects.bulk_create(candidatas.values(), batch_size=TAMANHO_LOTE, ignore_conflicts=True)
+        # Com ignore_conflicts o banco não devolve os ids: eles são lidos de
+        # volta pela URL. Se outra importação gravou a mesma notícia no meio
+        # tempo, ela é indexada de novo aqui, o que não muda o resultado.
+        for bloco in _em_blocos(list(candidatas)):
+            for url_normalizada, pk in Noticia.objects.filter(url_normalizada__in=bloco).values_list('url_normalizada', 'pk'):
+                candidatas[url_normalizada].pk = pk
+        noticias_novas = [noticia for noticia in candidatas.values() if noticia.pk is not None]
+        indexar_noticias(noticias_novas)
+
+    transaction.on_commit(
+        partial(registrar_mudancas_titulos, [(noticia.pk, noticia.titulo) for noticia in noticias_novas])
+    )
+    atualizar_relacionadas(noticias_novas)
+    invalidar_cache_noticias()
+    logger.info("%s notícias novas gravadas em %s", len(noticias_novas), categoria.nome)
+    return len(noticias_novas)
+
+
+def parse_date(date_string):
+    if not date_string:
+        return datetime.now()
+    
+    try:
+        return datetime.fromisoformat(date_string.replace('Z', '+00:00'))
+    except (ValueError, AttributeError):
+        try:
+            formats = [
+                '%a, %d %b %Y %H:%M:%S %Z',
+                '%a, %d %b %Y %H:%M:%S %z',
+                '%Y-%m-%d %H:%M:%S',
+                '%Y-%m-%dT%H:%M:%S.%fZ',
+                '%Y-%m-%d'
+            ]
+            
+            for fmt in formats:
+                try:
+                    return datetime.strptime(date_string, fmt)
+                except ValueError:
+                    continue
+        except:
+            pass
+        
+        return datetime.now()
+
+
+# --- Fila de importação ---
+
+def nome_trabalhador():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def enfileirar_importacao(categorias, usuario=None):
+    """Cria uma tarefa pendente por categoria.
+
+    Retorna ``(enfileiradas, ja_na_fila)``, listas de categorias; as que já
+    têm tarefa pendente ou em execução não ganham outra.
+    """
+    enfileiradas, ja_na_fila = [], []
+    for categoria in categorias:
+        try:
+            with transaction.atomic():
+                TarefaImportacao.objects.create(categoria=categoria, pedida_por=usuario)
+        except IntegrityError:
+            ja_na_fila.append(categoria)
+            continue
+        enfileiradas.append(categoria)
+    return enfileiradas, ja_na_fila
+
+
+def liberar_tarefas_travadas(timeout=None):
+    """Dá como falhas as tarefas em execução há mais de ``timeout`` segundos, liberando a categoria."""
+    timeout = timeout or getattr(settings, 'IMPORTACAO_TAREFA_TIMEOUT', TAREFA_TIMEOUT)
+    agora = timezone.now()
+    return TarefaImportacao.objects.filter(
+        status=TarefaImportacao.EXECUTANDO, iniciada_em__lt=agora - timedelta(seconds=timeout)
+    ).update(status=TarefaImportacao.FALHOU, concluida_em=agora, erro='O worker parou sem concluir a tarefa.')
+
+
+def reservar_tarefas(trabalhador, quantidade):
+    """Passa até ``quantidade`` tarefas pendentes para ``trabalhador`` e as retorna."""
+    agora = timezone.now()
+    with transaction.atomic():
+        pendentes = TarefaImportacao.objects.filter(status=TarefaImportacao.PENDENTE).order_by('criada_em', 'pk')
+        TarefaImportacao.objects.filter(
+            pk__in=pendentes.values('pk')[:quantidade], status=TarefaImportacao.PENDENTE
+        ).update(status=TarefaImportacao.EXECUTANDO, trabalhador=trabalhador, iniciada_em=agora)
+        return list(
+            TarefaImportacao.objects.filter(
+                status=TarefaImportacao.EXECUTANDO, trabalhador=trabalhador, iniciada_em=agora
+            ).select_related('categoria')
+        )
+
+
+def executar_tarefas(trabalhador=None, quantidade=None):
+    """Reserva e executa um lote de tarefas pendentes; retorna as tarefas executadas."""
+    liberar_tarefas_travadas()
+    tarefas = reservar_tarefas(
+        trabalhador or nome_trabalhador(), quantidade or getattr(settings, 'IMPORTACAO_THREADS', 4)
+    )
+    if not tarefas:
+        return []
+
+    por_categoria = {tarefa.categoria_id: tarefa for tarefa in tarefas}
+
+    def concluir(resultado):
+        tarefa = por_categoria[resultado.categoria.pk]
+        tarefa.status = TarefaImportacao.FALHOU if resultado.erro else TarefaImportacao.CONCLUIDA
+        tarefa.recebidas = resultado.recebidas
+        tarefa.importadas = resultado.importadas
+        tarefa.erro = resultado.erro
+        tarefa.concluida_em = timezone.now()
+        tarefa.save(update_fields=['status', 'recebidas', 'importadas', 'erro', 'concluida_em'])
+
+    try:
+        importar_categorias([tarefa.categoria for tarefa in tarefas], ao_concluir=concluir)
+    except Exception as e:
+        logger.exception("Falha ao executar tarefas de importação")
+        TarefaImportacao.objects.filter(
+            pk__in=[tarefa.pk for tarefa in tarefas], status=TarefaImportacao.EXECUTANDO
+        ).update(status=TarefaImportacao.FALHOU, concluida_em=timezone.now(), erro=str(e))
+        for tarefa in tarefas:
+            tarefa.refresh_from_db()
+    return tarefas
@@ -0,0 +1,46 @@
+"""
+Leituras já registradas, guardadas em memória.
+
+A tabela ``LeituraNoticia`` (índice único por perfil e notícia) decide se
+uma leitura é nova; este LRU só evita ir ao banco quando o leitor volta
+a uma notícia que já leu, o caso comum de quem recarrega a página.
+As leituras entram aqui pelo ``transaction.on_commit``, só depois de a
+transação que as gravou (ou as encontrou) ser confirmada.
+"""
+import threading
+from collections import OrderedDict
+
+
+class LeiturasRecentes:
+
+    CAPACIDADE = 100_000
+
+    def __init__(self, capacidade=CAPACIDADE):
+        self.capacidade = capacidade
+        self._lock = threading.Lock()
+        self._leituras = OrderedDict()
+
+    def contem(self, perfil_id, noticia_id):
+        chave = (perfil_id, noticia_id)
+        with self._lock:
+            if chave not in self._leituras:
+                return False
+            self._leituras.move_to_end(chave)
+            return True
+
+    def adicionar(self, perfil_id, noticia_id):
+        with self._lock:
+            self._leituras[(perfil_id, noticia_id)] = None
+            self._leituras.move_to_end((perfil_id, noticia_id))
+            while len(self._leituras) > self.capacidade:
+                self._leituras.popitem(last=False)
+
+    def limpar(self):
+        with self._lock:
+            self._leituras.clear()
+
+    def __len__(self):
+        return len(self._leituras)
+
+
+leituras_recentes = LeiturasRecentes()
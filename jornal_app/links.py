@@ -0,0 +1,53 @@
+"""
+Normalização dos links de origem das notícias.
+
+O mesmo artigo costuma chegar da API com links que só diferem em
+parâmetros de rastreamento (``utm_*``, ``fbclid``...), na caixa do
+esquema e do host ou no fragmento. ``normalizar_url()`` reduz essas
+variações a uma forma só, gravada em ``Noticia.url_normalizada``, que tem
+índice único e é a chave da deduplicação na importação.
+"""
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+MAX_URL = 500
+
+PARAMETROS_RASTREIO = {
+    'fbclid', 'gclid', 'dclid', 'gclsrc', 'msclkid', 'yclid', 'igshid',
+    'mc_cid', 'mc_eid', '_ga', '_gl', 'ref_src', 'ocid', 'cmpid',
+}
+
+PORTAS_PADRAO = {'http': ':80', 'https': ':443'}
+
+
+def parametro_de_rastreio(nome):
+    nome = nome.lower()
+    return nome.startswith('utm_') or nome in PARAMETROS_RASTREIO
+
+
+def normalizar_url(url):
+    """Forma canônica de ``url``, ou ``None`` se o link estiver vazio ou
+    malformado (``http://[abc``, por exemplo).
+
+    Esquema e host vão para minúsculas, a porta padrão e o fragmento saem,
+    os parâmetros de rastreamento são removidos e os demais mantêm a ordem.
+    """
+    url = (url or '').strip()
+    if not url:
+        return None
+
+    try:
+        partes = urlsplit(url)
+    except ValueError:
+        return None
+    esquema = partes.scheme.lower()
+    host = partes.netloc.lower()
+    porta_padrao = PORTAS_PADRAO.get(esquema)
+    if porta_padrao and host.endswith(porta_padrao):
+        host = host[:-len(porta_padrao)]
+
+    parametros = [
+        (nome, valor) for nome, valor in parse_qsl(partes.query, keep_blank_values=True)
+        if not parametro_de_rastreio(nome)
+    ]
+    caminho = partes.path or ('/' if host else '')
+    return urlunsplit((esquema, host, caminho, urlencode(parametros), ''))[:MAX_URL]
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from jornal_app.atividades import TAMANHO_LOTE, agregar_eventos
+
+
+class Command(BaseCommand):
+    help = "Agrega os eventos de atividade pendentes nos perfis e nos resumos diários."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=TAMANHO_LOTE,
+            help=f"Quantos eventos agregar por transação (padrão: {TAMANHO_LOTE}).",
+        )
+
+    def handle(self, *args, **options):
+        resultado = agregar_eventos(tamanho_lote=options['lote'])
+        self.stdout.write(self.style.SUCCESS(f"✅ Eventos agregados para {len(resultado)} perfis."))
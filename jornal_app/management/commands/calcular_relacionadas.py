@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from jornal_app.relacionadas import calcular_relacionadas
+
+
+class Command(BaseCommand):
+    help = "Recalcula o índice de notícias relacionadas (TF-IDF por categoria)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--categoria',
+            type=int,
+            action='append',
+            dest='categorias',
+            help="ID da categoria a recalcular (pode repetir). Sem a opção, recalcula todas.",
+        )
+
+    def handle(self, *args, **options):
+        total = calcular_relacionadas(options['categorias'])
+        self.stdout.write(self.style.SUCCESS(f"✅ Vizinhos calculados para {total} notícias."))
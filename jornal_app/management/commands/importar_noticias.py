@@ -0,0 +1,84 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from jornal_app.importacao import enfileirar_importacao, executar_tarefas
+from jornal_app.models import Categoria
+from jornal_app.newsdata import cliente_newsdata
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa notícias da API do NewsData. Sem opções, enfileira todas as categorias e "
+        "executa a fila; com --pendentes, só executa o que já está na fila; com --worker, fica "
+        "executando as tarefas enfileiradas pelo admin."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--categoria',
+            type=int,
+            action='append',
+            dest='categorias',
+            help="ID da categoria a importar (pode repetir). Sem a opção, importa todas.",
+        )
+        parser.add_argument(
+            '--worker',
+            action='store_true',
+            help="Não enfileira nada: processa a fila continuamente.",
+        )
+        parser.add_argument(
+            '--pendentes',
+            action='store_true',
+            help="Não enfileira nada: executa as tarefas já na fila e sai (para quando não há worker rodando).",
+        )
+        parser.add_argument(
+            '--intervalo',
+            type=float,
+            default=5,
+            help="Segundos entre consultas à fila quando ela está vazia (com --worker).",
+        )
+
+    def handle(self, *args, **options):
+        if options['worker']:
+            self.trabalhar(options['intervalo'])
+            return
+
+        if not options['pendentes']:
+            categorias = Categoria.objects.all()
+            if options['categorias']:
+                categorias = categorias.filter(pk__in=options['categorias'])
+            _, ja_na_fila = enfileirar_importacao(categorias)
+            for categoria in ja_na_fila:
+                self.stdout.write(f"⚠️ {categoria.nome} já tem importação na fila.")
+
+        while tarefas := executar_tarefas():
+            for tarefa in tarefas:
+                self.relatar(tarefa)
+
+        metricas = cliente_newsdata().metricas.resumo()
+        self.stdout.write(
+            f"📈 {metricas['requisicoes']} requisições à API ({metricas['novas_tentativas']} novas tentativas), "
+            f"tempo médio {metricas['tempo_medio'] * 1000:.0f} ms, p95 {metricas['tempo_p95'] * 1000:.0f} ms, "
+            f"espera no limite de taxa {metricas['espera_limite']:.1f} s."
+        )
+
+    def trabalhar(self, intervalo):
+        self.stdout.write(f"👷 Worker de importação iniciado (fila consultada a cada {intervalo:g}s).")
+        try:
+            while True:
+                tarefas = executar_tarefas()
+                for tarefa in tarefas:
+                    self.relatar(tarefa)
+                if not tarefas:
+                    time.sleep(intervalo)
+        except KeyboardInterrupt:
+            self.stdout.write("Worker encerrado.")
+
+    def relatar(self, tarefa):
+        if tarefa.erro:
+            self.stdout.write(self.style.ERROR(f"❌ {tarefa.categoria.nome}: {tarefa.erro}"))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ {tarefa.categoria.nome}: {tarefa.importadas} de {tarefa.recebidas} notícias importadas."
+            ))
@@ -0,0 +1,41 @@
+from django.db import migrations, OperationalError
+
+
+def criar_indice_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        try:
+            cursor.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS jornal_app_noticia_fts USING fts5("
+                "titulo, conteudo, autor_fonte, "
+                "tokenize = 'unicode61 remove_diacritics 2')"
+            )
+        except OperationalError:
+            # SQLite compilado sem FTS5: a busca usa icontains.
+            return
+
+        cursor.execute(
+            "INSERT INTO jornal_app_noticia_fts (rowid, titulo, conteudo, autor_fonte) "
+            "SELECT id, titulo, conteudo, COALESCE(autor_fonte, '') FROM jornal_app_noticia"
+        )
+
+
+def remover_indice_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("DROP TABLE IF EXISTS jornal_app_noticia_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jornal_app', '0004_userprofile'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indice_fts, remover_indice_fts),
+    ]
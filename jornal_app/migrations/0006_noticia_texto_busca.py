@@ -0,0 +1,38 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:57
+
+from django.db import migrations, models
+
+from jornal_app.busca import normalizar_texto
+
+
+def preencher_texto_busca(apps, schema_editor):
+    Noticia = apps.get_model('jornal_app', 'Noticia')
+
+    lote = []
+    for noticia in Noticia.objects.only('titulo', 'conteudo', 'autor_fonte').iterator(chunk_size=500):
+        noticia.texto_busca = normalizar_texto(
+            ' '.join([noticia.titulo or '', noticia.conteudo or '', noticia.autor_fonte or ''])
+        )
+        lote.append(noticia)
+        if len(lote) >= 500:
+            Noticia.objects.bulk_update(lote, ['texto_busca'])
+            lote = []
+
+    if lote:
+        Noticia.objects.bulk_update(lote, ['texto_busca'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jornal_app', '0005_noticia_fts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='noticia',
+            name='texto_busca',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Texto Normalizado para Busca'),
+        ),
+        migrations.RunPython(preencher_texto_busca, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jornal_app', '0006_noticia_texto_busca'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='noticia',
+            name='atualizado_em',
+            field=models.DateTimeField(auto_now=True, verbose_name='Atualizado em'),
+        ),
+        migrations.AddIndex(
+            model_name='noticia',
+            index=models.Index(fields=['categoria', '-data_publicacao'], name='noticia_categoria_data_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jornal_app', '0007_noticia_atualizado_em'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NoticiaRelacionada',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('similaridade', models.FloatField(verbose_name='Similaridade')),
+                ('noticia', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='relacionadas', to='jornal_app.noticia')),
+                ('relacionada', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='citada_como_relacionada', to='jornal_app.noticia')),
+            ],
+            options={
+                'verbose_name': 'Notícia Relacionada',
+                'verbose_name_plural': 'Notícias Relacionadas',
+                'ordering': ['noticia', '-similaridade'],
+                'constraints': [models.UniqueConstraint(fields=('noticia', 'relacionada'), name='noticia_relacionada_unica')],
+            },
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def copiar_categorias_do_json(apps, schema_editor):
+    UserProfile = apps.get_model('jornal_app', 'UserProfile')
+    Categoria = apps.get_model('jornal_app', 'Categoria')
+    CategoriaVisitada = apps.get_model('jornal_app', 'CategoriaVisitada')
+
+    existentes = set(Categoria.objects.values_list('pk', flat=True))
+    for perfil in UserProfile.objects.exclude(categorias_visitadas=[]).iterator(chunk_size=500):
+        # A lista em JSON pode ter ids repetidos ou de categorias já removidas.
+        ids = {int(pk) for pk in perfil.categorias_visitadas or [] if str(pk).isdigit()} & existentes
+        CategoriaVisitada.objects.bulk_create(
+            [CategoriaVisitada(perfil_id=perfil.pk, categoria_id=pk) for pk in sorted(ids)],
+            ignore_conflicts=True,
+        )
+        UserProfile.objects.filter(pk=perfil.pk).update(total_categorias_visitadas=len(ids))
+
+
+def copiar_categorias_para_json(apps, schema_editor):
+    UserProfile = apps.get_model('jornal_app', 'UserProfile')
+    CategoriaVisitada = apps.get_model('jornal_app', 'CategoriaVisitada')
+
+    por_perfil = {}
+    for perfil_id, categoria_id in CategoriaVisitada.objects.order_by('pk').values_list('perfil_id', 'categoria_id'):
+        por_perfil.setdefault(perfil_id, []).append(categoria_id)
+    for perfil_id, ids in por_perfil.items():
+        UserProfile.objects.filter(pk=perfil_id).update(categorias_visitadas=ids)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jornal_app', '0008_noticiarelacionada'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoriaVisitada',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data_visita', models.DateTimeField(auto_now_add=True)),
+                ('categoria', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='visitas', to='jornal_app.categoria')),
+                ('perfil', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='visitas_categorias', to='jornal_app.userprofile')),
+            ],
+            options={
+                'verbose_name': 'Categoria Visitada',
+                'verbose_name_plural': 'Categorias Visitadas',
+                'constraints': [models.UniqueConstraint(fields=('perfil', 'categoria'), name='categoria_visitada_unica')],
+            },
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='total_categorias_visitadas',
+            field=models.IntegerField(db_index=True, default=0, verbose_name='Categorias Visitadas'),
+        ),
+        migrations.RunPython(copiar_categorias_do_json, copiar_categorias_para_json),
+        migrations.RemoveField(
+            model_name='userprofile',
+            name='categorias_visitadas',
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='categorias_visitadas',
+            field=models.ManyToManyField(blank=True, related_name='visitantes', through='jornal_app.CategoriaVisitada', to='jornal_app.categoria', verbose_name='Categorias Visitadas'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from jornal_app.conquistas import regras_satisfeitas
+
+
+def calcular_conquistas_existentes(apps, schema_editor):
+    UserProfile = apps.get_model('jornal_app', 'UserProfile')
+    Categoria = apps.get_model('jornal_app', 'Categoria')
+    Conquista = apps.get_model('jornal_app', 'Conquista')
+
+    total_categorias = Categoria.objects.count()
+    contadores = ('noticias_lidas', 'comentarios_feitos', 'total_categorias_visitadas', 'nivel')
+    conquistas = []
+    for perfil_id, *valores in UserProfile.objects.values_list('pk', *contadores).iterator(chunk_size=500):
+        for regra in regras_satisfeitas(dict(zip(contadores, valores)), lambda: total_categorias):
+            conquistas.append(Conquista(perfil_id=perfil_id, badge=regra.codigo))
+    Conquista.objects.bulk_create(conquistas, batch_size=500, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jornal_app', '0009_categoriavisitada'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Conquista',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('badge', models.CharField(db_index=True, max_length=50, verbose_name='Badge')),
+                ('data_conquista', models.DateTimeField(auto_now_add=True)),
+                ('perfil', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='conquistas', to='jornal_app.userprofile')),
+            ],
+            options={
+                'verbose_name': 'Conquista',
+                'verbose_name_plural': 'Conquistas',
+                'constraints': [models.UniqueConstraint(fields=('perfil', 'badge'), name='conquista_unica')],
+            },
+        ),
+        migrations.RunPython(calcular_conquistas_existentes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:21
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jornal_app', '0010_conquista'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PontosRanking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quadro', models.CharField(max_length=40, verbose_name='Quadro')),
+                ('pontos', models.IntegerField(default=0, verbose_name='Pontos')),
+            ],
+            options={
+                'verbose_name': 'Pontos no Ranking',
+                'verbose_name_plural': 'Pontos no Ranking',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['pontos', 'nivel'], name='perfil_ranking_idx'),
+        ),
+        migrations.AddField(
+            model_name='pontosranking',
+            name='perfil',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pontos_ranking', to='jornal_app.userprofile'),
+        ),
+        migrations.AddIndex(
+            model_name='pontosranking',
+            index=models.Index(fields=['quadro', 'pontos'], name='pontos_ranking_quadro_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='pontosranking',
+            constraint=models.UniqueConstraint(fields=('quadro', 'perfil'), name='pontos_ranking_unico'),
+        ),
+    ]
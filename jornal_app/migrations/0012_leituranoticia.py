@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jornal_app', '0011_pontosranking'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeituraNoticia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data_leitura', models.DateTimeField(auto_now_add=True)),
+                ('noticia', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leituras', to='jornal_app.noticia')),
+                ('perfil', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leituras', to='jornal_app.userprofile')),
+            ],
+            options={
+                'verbose_name': 'Leitura de Notícia',
+                'verbose_name_plural': 'Leituras de Notícias',
+                'constraints': [models.UniqueConstraint(fields=('perfil', 'noticia'), name='leitura_noticia_unica')],
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:31
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jornal_app', '0012_leituranoticia'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventoAtividade',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.PositiveSmallIntegerField(choices=[(1, 'Leitura'), (2, 'Comentário'), (3, 'Visita a categoria')], verbose_name='Tipo')),
+                ('objeto_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('categoria_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('criado_em', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Data')),
+                ('lote', models.BigIntegerField(blank=True, db_index=True, null=True)),
+                ('perfil', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='eventos', to='jornal_app.userprofile')),
+            ],
+            options={
+                'verbose_name': 'Evento de Atividade',
+                'verbose_name_plural': 'Eventos de Atividade',
+                'indexes': [models.Index(fields=['perfil', 'criado_em'], name='evento_perfil_data_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ResumoDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dia', models.DateField(verbose_name='Dia')),
+                ('leituras', models.IntegerField(default=0, verbose_name='Leituras')),
+                ('comentarios', models.IntegerField(default=0, verbose_name='Comentários')),
+                ('categorias_novas', models.IntegerField(default=0, verbose_name='Categorias Novas')),
+                ('pontos', models.IntegerField(default=0, verbose_name='Pontos')),
+                ('perfil', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumos_diarios', to='jornal_app.userprofile')),
+            ],
+            options={
+                'verbose_name': 'Resumo Diário',
+                'verbose_name_plural': 'Resumos Diários',
+                'ordering': ['-dia'],
+                'constraints': [models.UniqueConstraint(fields=('perfil', 'dia'), name='resumo_diario_unico')],
+            },
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:38
+
+from django.db import migrations, models
+
+from jornal_app.busca import TABELA_FTS
+from jornal_app.links import normalizar_url
+
+
+def preencher_e_unificar_urls(apps, schema_editor):
+    """Preenche ``url_normalizada`` e junta as notícias com o mesmo link.
+
+    Fica a notícia mais antiga de cada link; comentários, leituras e eventos
+    das cópias passam para ela antes de as cópias serem apagadas.
+    """
+    Noticia = apps.get_model('jornal_app', 'Noticia')
+    Comentario = apps.get_model('jornal_app', 'Comentario')
+    LeituraNoticia = apps.get_model('jornal_app', 'LeituraNoticia')
+    EventoAtividade = apps.get_model('jornal_app', 'EventoAtividade')
+
+    original_por_url = {}
+    copias = {}
+    lote = []
+    for noticia in Noticia.objects.only('url_fonte').order_by('pk').iterator(chunk_size=500):
+        url_normalizada = normalizar_url(noticia.url_fonte)
+        if url_normalizada is None:
+            continue
+        original = original_por_url.setdefault(url_normalizada, noticia.pk)
+        if original != noticia.pk:
+            copias[noticia.pk] = original
+            continue
+        noticia.url_normalizada = url_normalizada
+        lote.append(noticia)
+        if len(lote) >= 500:
+            Noticia.objects.bulk_update(lote, ['url_normalizada'])
+            lote = []
+    if lote:
+        Noticia.objects.bulk_update(lote, ['url_normalizada'])
+
+    for copia, original in copias.items():
+        Comentario.objects.filter(noticia_id=copia).update(noticia_id=original)
+        ja_leram = LeituraNoticia.objects.filter(noticia_id=original).values('perfil_id')
+        LeituraNoticia.objects.filter(noticia_id=copia).exclude(perfil_id__in=ja_leram).update(noticia_id=original)
+        EventoAtividade.objects.filter(tipo__in=[1, 2], objeto_id=copia).update(objeto_id=original)
+
+    if copias:
+        Noticia.objects.filter(pk__in=list(copias)).delete()
+        connection = schema_editor.connection
+        if TABELA_FTS in connection.introspection.table_names():
+            with connection.cursor() as cursor:
+                cursor.executemany(f"DELETE FROM {TABELA_FTS} WHERE rowid = %s", [[pk] for pk in copias])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jornal_app', '0013_eventoatividade_resumodiario'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='noticia',
+            name='url_normalizada',
+            field=models.CharField(blank=True, editable=False, max_length=500, null=True, verbose_name='URL Normalizada'),
+        ),
+        migrations.RunPython(preencher_e_unificar_urls, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='noticia',
+            name='url_normalizada',
+            field=models.CharField(blank=True, editable=False, max_length=500, null=True, unique=True, verbose_name='URL Normalizada'),
+        ),
+    ]
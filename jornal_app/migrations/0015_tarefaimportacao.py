@@ -0,0 +1,39 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jornal_app', '0014_noticia_url_normalizada'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TarefaImportacao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('executando', 'Executando'), ('concluida', 'Concluída'), ('falhou', 'Falhou')], default='pendente', max_length=20, verbose_name='Status')),
+                ('trabalhador', models.CharField(blank=True, default='', max_length=100, verbose_name='Worker')),
+                ('criada_em', models.DateTimeField(auto_now_add=True, verbose_name='Criada em')),
+                ('iniciada_em', models.DateTimeField(blank=True, null=True, verbose_name='Iniciada em')),
+                ('concluida_em', models.DateTimeField(blank=True, null=True, verbose_name='Concluída em')),
+                ('recebidas', models.IntegerField(default=0, verbose_name='Recebidas')),
+                ('importadas', models.IntegerField(default=0, verbose_name='Importadas')),
+                ('erro', models.TextField(blank=True, default='', verbose_name='Erro')),
+                ('categoria', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='importacoes', to='jornal_app.categoria')),
+                ('pedida_por', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Tarefa de Importação',
+                'verbose_name_plural': 'Tarefas de Importação',
+                'ordering': ['-criada_em', '-pk'],
+                'indexes': [models.Index(fields=['status', 'criada_em'], name='importacao_status_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status__in', ['pendente', 'executando'])), fields=('categoria',), name='importacao_ativa_por_categoria')],
+            },
+        ),
+    ]
@@ -1,12 +1,23 @@
-from django.db import models
+from collections import Counter, defaultdict
+from functools import partial
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
 from django.contrib.auth.models import User
 from django.utils import timezone
+from django.utils.functional import cached_property
 from django.core.exceptions import ValidationError
 from django.conf import settings
-from django.utils import timezone
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.urls import reverse
+from .busca import indexar_noticia, remover_noticia_do_indice, normalizar_texto, registrar_mudancas_titulos
+from .cache_noticias import atualizar_placar, invalidar_cache_categorias, invalidar_cache_noticias
+from .conquistas import REGRAS_POR_CODIGO, contar_categorias, nomes_dos_badges, regras_alcancadas
+from .ranking import rankings
+from .leituras import leituras_recentes
+from .links import normalizar_url
 
 class Categoria(models.Model):
     nome = models.CharField(
@@ -24,6 +35,11 @@ class Categoria(models.Model):
     def __str__(self):
         return self.nome
 
+@receiver(post_save, sender=Categoria)
+@receiver(post_delete, sender=Categoria)
+def invalidar_menu_categorias(sender, **kwargs):
+    invalidar_cache_categorias()
+
 class Noticia(models.Model):
     titulo = models.CharField(max_length=200, verbose_name="Título")
     conteudo = models.TextField(verbose_name="Conteúdo")
@@ -47,6 +63,16 @@ class Noticia(models.Model):
         null=True,
         verbose_name="URL da Fonte Original"
     )
+
+    # Chave da deduplicação na importação (ver links.normalizar_url).
+    url_normalizada = models.CharField(
+        max_length=500,
+        unique=True,
+        blank=True,
+        null=True,
+        editable=False,
+        verbose_name="URL Normalizada"
+    )
     
     imagem_url = models.URLField(
         max_length=500, 
@@ -62,17 +88,86 @@ class Noticia(models.Model):
         verbose_name="Autor/Fonte Externa"
     )
 
+    texto_busca = models.TextField(
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name="Texto Normalizado para Busca"
+    )
+
+    atualizado_em = models.DateTimeField(auto_now=True, verbose_name="Atualizado em")
+
     class Meta:
         verbose_name = "Notícia"
         verbose_name_plural = "Notícias"
         ordering = ['-data_publicacao']
+        indexes = [
+            models.Index(fields=['categoria', '-data_publicacao'], name='noticia_categoria_data_idx'),
+        ]
 
     def __str__(self):
         return self.titulo
+
+    def atualizar_texto_busca(self):
+        self.texto_busca = normalizar_texto(
+            ' '.join([self.titulo or '', self.conteudo or '', self.autor_fonte or ''])
+        )
+
+    def clean(self):
+        super().clean()
+        url_normalizada = normalizar_url(self.url_fonte)
+        if url_normalizada and Noticia.objects.filter(url_normalizada=url_normalizada).exclude(pk=self.pk).exists():
+            raise ValidationError({'url_fonte': "Já existe uma notícia com esta URL de origem."})
+
+    def save(self, *args, **kwargs):
+        self.atualizar_texto_busca()
+        self.url_normalizada = normalizar_url(self.url_fonte)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'texto_busca', 'url_normalizada', 'atualizado_em'}
+        super().save(*args, **kwargs)
     
     def get_absolute_url(self):
         return reverse('jornal_app:artigo', kwargs={'pk': self.pk})
 
+@receiver(post_save, sender=Noticia)
+def atualizar_indice_busca(sender, instance, **kwargs):
+    indexar_noticia(instance)
+    update_fields = kwargs.get('update_fields')
+    if update_fields is None or 'titulo' in update_fields:
+        transaction.on_commit(partial(registrar_mudancas_titulos, [(instance.pk, instance.titulo)]))
+    invalidar_cache_noticias()
+
+@receiver(post_delete, sender=Noticia)
+def remover_do_indice_busca(sender, instance, **kwargs):
+    remover_noticia_do_indice(instance.pk)
+    transaction.on_commit(partial(registrar_mudancas_titulos, [(instance.pk, None)]))
+    invalidar_cache_noticias()
+
+class NoticiaRelacionada(models.Model):
+    noticia = models.ForeignKey(
+        Noticia,
+        on_delete=models.CASCADE,
+        related_name='relacionadas'
+    )
+    relacionada = models.ForeignKey(
+        Noticia,
+        on_delete=models.CASCADE,
+        related_name='citada_como_relacionada'
+    )
+    similaridade = models.FloatField(verbose_name="Similaridade")
+
+    class Meta:
+        verbose_name = "Notícia Relacionada"
+        verbose_name_plural = "Notícias Relacionadas"
+        ordering = ['noticia', '-similaridade']
+        constraints = [
+            models.UniqueConstraint(fields=['noticia', 'relacionada'], name='noticia_relacionada_unica'),
+        ]
+
+    def __str__(self):
+        return f'{self.noticia_id} → {self.relacionada_id} ({self.similaridade:.2f})'
+
 class Comentario(models.Model):
     noticia = models.ForeignKey(
         Noticia, 
@@ -95,6 +190,32 @@ class Comentario(models.Model):
     def __str__(self):
         return f'Comentário de {self.autor.username} em {self.noticia.titulo}'
 
+PONTOS_LEITURA = 5
+PONTOS_COMENTARIO = 10
+PONTOS_CATEGORIA_NOVA = 15
+PONTOS_POR_NIVEL = 100
+
+
+MINIMO_CATEGORIAS_EXPLORADOR = REGRAS_POR_CODIGO['explorador'].minimo
+
+
+def nivel_para_pontos(pontos):
+    return (pontos // PONTOS_POR_NIVEL) + 1
+
+
+class UserProfileQuerySet(models.QuerySet):
+    """Consultas em lote sobre os perfis (ex.: quem já tem cada badge)."""
+
+    def exploradores(self):
+        return self.filter(total_categorias_visitadas__gte=MINIMO_CATEGORIAS_EXPLORADOR)
+
+    def navegadores_completos(self):
+        return self.filter(total_categorias_visitadas__gte=Categoria.objects.count())
+
+    def com_badge(self, codigo):
+        return self.filter(conquistas__badge=codigo)
+
+
 class UserProfile(models.Model):
     usuario = models.OneToOneField(
         settings.AUTH_USER_MODEL, 
@@ -105,95 +226,430 @@ class UserProfile(models.Model):
     nivel = models.IntegerField(default=1, verbose_name="Nível")
     noticias_lidas = models.IntegerField(default=0, verbose_name="Notícias Lidas")
     comentarios_feitos = models.IntegerField(default=0, verbose_name="Comentários Feitos")
-    categorias_visitadas = models.JSONField(default=list, blank=True, verbose_name="Categorias Visitadas")
+    categorias_visitadas = models.ManyToManyField(
+        Categoria,
+        through='CategoriaVisitada',
+        blank=True,
+        related_name='visitantes',
+        verbose_name="Categorias Visitadas"
+    )
+    total_categorias_visitadas = models.IntegerField(default=0, db_index=True, verbose_name="Categorias Visitadas")
     data_criacao = models.DateTimeField(auto_now_add=True)
     ultima_atividade = models.DateTimeField(auto_now=True)
 
+    objects = UserProfileQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Perfil do Usuário"
         verbose_name_plural = "Perfis dos Usuários"
+        indexes = [
+            models.Index(fields=['pontos', 'nivel'], name='perfil_ranking_idx'),
+        ]
 
     def __str__(self):
         return f"Perfil de {self.usuario.username}"
 
-    def adicionar_pontos(self, quantidade, motivo=""):
-        self.pontos += quantidade
-        novo_nivel = (self.pontos // 100) + 1
+    def incrementar(self, pontos=0, **contadores):
+        """Soma ``pontos`` e os ``contadores`` (ex.: ``noticias_lidas=1``) num
+        único UPDATE, com o nível recalculado no próprio SQL.
+
+        Como a soma é feita pelo banco, requisições simultâneas do mesmo
+        usuário não perdem pontos. Os badges dos contadores alterados são
+        avaliados e gravados na mesma transação. Atualiza a instância e
+        retorna os valores gravados.
+        """
+        contadores = {campo: valor for campo, valor in contadores.items() if valor}
+        campos = ['pontos', 'nivel', *contadores]
+        alteracoes = {campo: F(campo) + valor for campo, valor in contadores.items()}
+        alteracoes['pontos'] = F('pontos') + pontos
+        # O nível nunca desce, igual ao cálculo feito antes em Python.
+        alteracoes['nivel'] = Greatest(F('nivel'), (F('pontos') + pontos) / PONTOS_POR_NIVEL + 1)
+        alteracoes['ultima_atividade'] = timezone.now()
+
+        with transaction.atomic():
+            UserProfile.objects.filter(pk=self.pk).update(**alteracoes)
+            novos = UserProfile.objects.filter(pk=self.pk).values(*campos).get()
+
+            antes = {campo: novos[campo] - valor for campo, valor in contadores.items()}
+            antes['nivel'] = nivel_para_pontos(novos['pontos'] - pontos)
+            alcancadas = regras_alcancadas(antes, {campo: novos[campo] for campo in antes})
+            if alcancadas:
+                Conquista.objects.bulk_create(
+                    [Conquista(perfil=self, badge=regra.codigo) for regra in alcancadas],
+                    ignore_conflicts=True,
+                )
+
+        for campo, valor in novos.items():
+            setattr(self, campo, valor)
+        self.ultima_atividade = alteracoes['ultima_atividade']
+        atualizar_placar(self.usuario_id, novos['pontos'], novos['nivel'])
+        return novos
+
+    def adicionar_pontos(self, quantidade, motivo="", pontos_por_categoria=None, **contadores):
+        # Pontos do perfil e dos rankings entram juntos ou não entram.
+        with transaction.atomic():
+            novos = self.incrementar(quantidade, **contadores)
+            rankings.registrar(self, quantidade, pontos_por_categoria)
+        # Subiu se os pontos passaram de um múltiplo de PONTOS_POR_NIVEL e o
+        # nível gravado é o calculado a partir deles.
+        nivel_dos_pontos = nivel_para_pontos(novos['pontos'])
+        subiu = novos['nivel'] == nivel_dos_pontos > nivel_para_pontos(novos['pontos'] - quantidade)
         
-        if novo_nivel > self.nivel:
-            self.nivel = novo_nivel
+        if subiu:
             print(f"🎉 {self.usuario.username} subiu para o nível {self.nivel}!")
         
-        self.save()
-        return novo_nivel > self.nivel  # Retorna True se subiu de nível
+        return subiu  # Retorna True se subiu de nível
+
+    def ja_leu(self, noticia_id):
+        """Indica se a leitura de ``noticia_id`` já está gravada.
+
+        Repetições recentes são respondidas pelo LRU em memória, sem consulta.
+        """
+        if leituras_recentes.contem(self.pk, noticia_id):
+            return True
+        lida = self.leituras.filter(noticia_id=noticia_id).exists()
+        if lida:
+            self._lembrar_leitura(noticia_id)
+        return lida
+
+    def _lembrar_leitura(self, noticia_id):
+        # Só depois do commit: se a transação for desfeita, a leitura não
+        # pode ficar no LRU como já contada.
+        transaction.on_commit(partial(leituras_recentes.adicionar, self.pk, noticia_id))
+
+    def gravar_leituras(self, noticia_ids):
+        """Grava as leituras ainda não registradas e retorna as que eram novas.
+
+        Só essas contam pontos; a restrição única de ``LeituraNoticia``
+        resolve duas requisições simultâneas para a mesma notícia.
+        """
+        novas = []
+        for noticia_id in sorted(set(noticia_ids)):
+            if leituras_recentes.contem(self.pk, noticia_id):
+                continue
+            try:
+                with transaction.atomic():
+                    LeituraNoticia.objects.create(perfil=self, noticia_id=noticia_id)
+            except IntegrityError:
+                self._lembrar_leitura(noticia_id)
+                continue
+            self._lembrar_leitura(noticia_id)
+            novas.append(noticia_id)
+        return novas
+
+    def registrar_atividade(self, tipo, objeto_id=None, categoria_id=None):
+        """Grava um evento e já o aplica, sem esperar a agregação periódica.
+
+        É o caminho das ações que mostram o resultado na hora (comentários);
+        retorna True se o perfil subiu de nível.
+        """
+        evento = EventoAtividade(
+            perfil=self, tipo=tipo, objeto_id=objeto_id, categoria_id=categoria_id, lote=EventoAtividade.APLICADO
+        )
+        with transaction.atomic():
+            evento.save()
+            return self.aplicar_eventos([evento])
+
+    def aplicar_eventos(self, eventos):
+        """Soma os ``eventos`` deste perfil aos contadores, rankings e resumos diários.
+
+        Leituras e categorias que já estavam gravadas (ou que apontam para
+        notícias e categorias apagadas) não pontuam.
+        Retorna True se o perfil subiu de nível.
+        """
+        leituras = {e.objeto_id: e for e in eventos if e.tipo == EventoAtividade.LEITURA}
+        categorias = {e.objeto_id: e for e in eventos if e.tipo == EventoAtividade.CATEGORIA}
+        # Notícia ou categoria apagada depois do evento: o evento fica no
+        # histórico sem pontuar. Sem este filtro a FK pendurada só falharia
+        # no commit (o SQLite adia a checagem) e derrubaria o lote inteiro.
+        if leituras:
+            leituras = {pk: leituras[pk] for pk in Noticia.objects.filter(pk__in=leituras).values_list('pk', flat=True)}
+        if categorias:
+            categorias = {pk: categorias[pk] for pk in Categoria.objects.filter(pk__in=categorias).values_list('pk', flat=True)}
+
+        contados = [(leituras[pk], 'leituras', PONTOS_LEITURA) for pk in self.gravar_leituras(leituras)]
+        contados += [
+            (categorias[pk], 'categorias_novas', PONTOS_CATEGORIA_NOVA)
+            for pk in self.gravar_categorias_visitadas(categorias)
+        ]
+        contados += [(e, 'comentarios', PONTOS_COMENTARIO) for e in eventos if e.tipo == EventoAtividade.COMENTARIO]
+        if not contados:
+            return False
 
-    def marcar_noticia_lida(self, noticia_id):
-        self.noticias_lidas += 1
-        level_up = self.adicionar_pontos(5, f"Leitura da notícia {noticia_id}")
-        return level_up
+        pontos_por_categoria = Counter()
+        por_dia = defaultdict(Counter)
+        for evento, campo, pontos in contados:
+            if evento.categoria_id is not None:
+                pontos_por_categoria[evento.categoria_id] += pontos
+            resumo = por_dia[timezone.localdate(evento.criado_em)]
+            resumo[campo] += 1
+            resumo['pontos'] += pontos
+        total = sum(resumo['pontos'] for resumo in por_dia.values())
 
-    def marcar_comentario_feito(self):
-        self.comentarios_feitos += 1
-        level_up = self.adicionar_pontos(10, "Comentário feito")
-        return level_up
+        with transaction.atomic():
+            subiu = self.adicionar_pontos(
+                total,
+                pontos_por_categoria=pontos_por_categoria,
+                noticias_lidas=sum(resumo['leituras'] for resumo in por_dia.values()),
+                comentarios_feitos=sum(resumo['comentarios'] for resumo in por_dia.values()),
+                total_categorias_visitadas=sum(resumo['categorias_novas'] for resumo in por_dia.values()),
+            )
+            for dia, valores in por_dia.items():
+                ResumoDiario.somar(self.pk, dia, valores)
+        return subiu
+
+    def marcar_noticia_lida(self, noticia_id, categoria_id=None):
+        if self.ja_leu(noticia_id):
+            return False
+        return self.registrar_atividade(EventoAtividade.LEITURA, noticia_id, categoria_id)
+
+    def marcar_comentario_feito(self, categoria_id=None, noticia_id=None):
+        return self.registrar_atividade(EventoAtividade.COMENTARIO, noticia_id, categoria_id)
+
+    @cached_property
+    def ids_categorias_visitadas(self):
+        """Ids das categorias já visitadas, carregados uma vez por instância."""
+        return set(self.visitas_categorias.values_list('categoria_id', flat=True))
+
+    def gravar_categorias_visitadas(self, categoria_ids):
+        """Grava as categorias ainda não visitadas e retorna as que eram novas.
+
+        A restrição única de ``CategoriaVisitada`` decide quem é novo, então
+        duas requisições simultâneas não dão os pontos da mesma categoria
+        duas vezes.
+        """
+        novas = []
+        for categoria_id in sorted(set(categoria_ids) - self.ids_categorias_visitadas):
+            try:
+                with transaction.atomic():
+                    CategoriaVisitada.objects.create(perfil=self, categoria_id=categoria_id)
+            except IntegrityError:
+                continue
+            self.ids_categorias_visitadas.add(categoria_id)
+            novas.append(categoria_id)
+        return novas
 
     def marcar_categoria_visitada(self, categoria_id):
-        if categoria_id not in self.categorias_visitadas:
-            self.categorias_visitadas.append(categoria_id)
-            level_up = self.adicionar_pontos(15, f"Nova categoria visitada: {categoria_id}")
-            return level_up
-        return False
+        if categoria_id in self.ids_categorias_visitadas:
+            return False
+        return self.registrar_atividade(EventoAtividade.CATEGORIA, categoria_id, categoria_id)
 
     def get_progresso_porcentagem(self):
-        pontos_no_nivel = self.pontos % 100
-        return min(100, (pontos_no_nivel / 100) * 100)
+        pontos_no_nivel = self.pontos % PONTOS_POR_NIVEL
+        return min(100, (pontos_no_nivel / PONTOS_POR_NIVEL) * 100)
 
     def get_pontos_proximo_nivel(self):
-        return 100 - (self.pontos % 100)
+        return PONTOS_POR_NIVEL - (self.pontos % PONTOS_POR_NIVEL)
 
     def get_badges(self):
-        badges = []
-        
-        if self.noticias_lidas >= 10:
-            badges.append('📚  Leitor Iniciante')
-        if self.noticias_lidas >= 50:
-            badges.append('📖  Leitor Ávido')
-        if self.comentarios_feitos >= 5:
-            badges.append('💬  Comentarista')
-        if self.comentarios_feitos >= 20:
-            badges.append('🗣️  Debatedor')
-        if len(self.categorias_visitadas) >= 3:
-            badges.append('🧭  Explorador')
-        if len(self.categorias_visitadas) >= Categoria.objects.count():
-            badges.append('🌎  Navegador Completo')
-        if self.nivel >= 5:
-            badges.append('⭐  Estrela em Ascensão')
-        if self.nivel >= 10:
-            badges.append('🏆  Lenda do Jornal')
-            
-        return badges
+        return nomes_dos_badges(self.conquistas.values_list('badge', flat=True))
 
     def get_estatisticas(self):
         return {
             'noticias_lidas': self.noticias_lidas,
             'comentarios_feitos': self.comentarios_feitos,
-            'categorias_exploradas': len(self.categorias_visitadas),
-            'total_categorias': Categoria.objects.count(),
+            'categorias_exploradas': self.total_categorias_visitadas,
+            'total_categorias': contar_categorias(),
             'progresso_porcentagem': self.get_progresso_porcentagem(),
             'pontos_proximo_nivel': self.get_pontos_proximo_nivel(),
             'badges': self.get_badges(),
         }
 
+class CategoriaVisitada(models.Model):
+    perfil = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='visitas_categorias')
+    categoria = models.ForeignKey(Categoria, on_delete=models.CASCADE, related_name='visitas')
+    data_visita = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Categoria Visitada"
+        verbose_name_plural = "Categorias Visitadas"
+        constraints = [
+            models.UniqueConstraint(fields=['perfil', 'categoria'], name='categoria_visitada_unica'),
+        ]
+
+    def __str__(self):
+        return f"{self.perfil} visitou {self.categoria}"
+
+class TarefaImportacao(models.Model):
+    """Importação de uma categoria, enfileirada pelo admin e executada pelo worker.
+
+    O índice único parcial ``importacao_ativa_por_categoria`` é a trava:
+    cada categoria tem no máximo uma tarefa pendente ou em execução.
+    """
+    PENDENTE = 'pendente'
+    EXECUTANDO = 'executando'
+    CONCLUIDA = 'concluida'
+    FALHOU = 'falhou'
+    STATUS = [
+        (PENDENTE, "Pendente"),
+        (EXECUTANDO, "Executando"),
+        (CONCLUIDA, "Concluída"),
+        (FALHOU, "Falhou"),
+    ]
+    ATIVAS = (PENDENTE, EXECUTANDO)
+
+    categoria = models.ForeignKey(Categoria, on_delete=models.CASCADE, related_name='importacoes')
+    status = models.CharField(max_length=20, choices=STATUS, default=PENDENTE, verbose_name="Status")
+    pedida_por = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    trabalhador = models.CharField(max_length=100, blank=True, default='', verbose_name="Worker")
+    criada_em = models.DateTimeField(auto_now_add=True, verbose_name="Criada em")
+    iniciada_em = models.DateTimeField(null=True, blank=True, verbose_name="Iniciada em")
+    concluida_em = models.DateTimeField(null=True, blank=True, verbose_name="Concluída em")
+    recebidas = models.IntegerField(default=0, verbose_name="Recebidas")
+    importadas = models.IntegerField(default=0, verbose_name="Importadas")
+    erro = models.TextField(blank=True, default='', verbose_name="Erro")
+
+    class Meta:
+        verbose_name = "Tarefa de Importação"
+        verbose_name_plural = "Tarefas de Importação"
+        ordering = ['-criada_em', '-pk']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['categoria'],
+                condition=models.Q(status__in=['pendente', 'executando']),
+                name='importacao_ativa_por_categoria',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'criada_em'], name='importacao_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"Importação de {self.categoria} ({self.get_status_display()})"
+
+class LeituraNoticia(models.Model):
+    perfil = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='leituras')
+    noticia = models.ForeignKey(Noticia, on_delete=models.CASCADE, related_name='leituras')
+    data_leitura = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Leitura de Notícia"
+        verbose_name_plural = "Leituras de Notícias"
+        constraints = [
+            models.UniqueConstraint(fields=['perfil', 'noticia'], name='leitura_noticia_unica'),
+        ]
+
+    def __str__(self):
+        return f"{self.perfil} leu {self.noticia_id}"
+
+@receiver(post_delete, sender=CategoriaVisitada)
+def descontar_categoria_visitada(sender, instance, **kwargs):
+    # Remover uma categoria apaga as visitas em cascata; o total acompanha.
+    UserProfile.objects.filter(pk=instance.perfil_id).update(
+        total_categorias_visitadas=Greatest(F('total_categorias_visitadas') - 1, 0)
+    )
+
+class Conquista(models.Model):
+    perfil = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='conquistas')
+    badge = models.CharField(max_length=50, db_index=True, verbose_name="Badge")
+    data_conquista = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Conquista"
+        verbose_name_plural = "Conquistas"
+        constraints = [
+            models.UniqueConstraint(fields=['perfil', 'badge'], name='conquista_unica'),
+        ]
+
+    def __str__(self):
+        return f"{self.perfil}: {self.badge}"
+
+class PontosRanking(models.Model):
+    """Pontos acumulados por um perfil num quadro do ranking (semana ou categoria)."""
+    perfil = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='pontos_ranking')
+    quadro = models.CharField(max_length=40, verbose_name="Quadro")
+    pontos = models.IntegerField(default=0, verbose_name="Pontos")
+
+    class Meta:
+        verbose_name = "Pontos no Ranking"
+        verbose_name_plural = "Pontos no Ranking"
+        constraints = [
+            models.UniqueConstraint(fields=['quadro', 'perfil'], name='pontos_ranking_unico'),
+        ]
+        indexes = [
+            models.Index(fields=['quadro', 'pontos'], name='pontos_ranking_quadro_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.perfil} em {self.quadro}: {self.pontos}"
+
+class EventoAtividade(models.Model):
+    """Uma ação do leitor, gravada só por acréscimo (nunca alterada depois de agregada).
+
+    ``lote`` fica vazio até a agregação periódica reservar o evento;
+    eventos já aplicados na hora da ação nascem com ``APLICADO``.
+    """
+    LEITURA = 1
+    COMENTARIO = 2
+    CATEGORIA = 3
+    TIPOS = [
+        (LEITURA, "Leitura"),
+        (COMENTARIO, "Comentário"),
+        (CATEGORIA, "Visita a categoria"),
+    ]
+
+    APLICADO = 0
+
+    perfil = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='eventos')
+    tipo = models.PositiveSmallIntegerField(choices=TIPOS, verbose_name="Tipo")
+    # Notícia (leitura e comentário) ou categoria (visita); sem FK para o
+    # histórico sobreviver à remoção do objeto.
+    objeto_id = models.PositiveIntegerField(null=True, blank=True)
+    categoria_id = models.PositiveIntegerField(null=True, blank=True)
+    criado_em = models.DateTimeField(default=timezone.now, verbose_name="Data")
+    lote = models.BigIntegerField(null=True, blank=True, db_index=True)
+
+    class Meta:
+        verbose_name = "Evento de Atividade"
+        verbose_name_plural = "Eventos de Atividade"
+        indexes = [
+            models.Index(fields=['perfil', 'criado_em'], name='evento_perfil_data_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.perfil}: {self.get_tipo_display()} em {self.criado_em:%d/%m/%Y %H:%M}"
+
+class ResumoDiario(models.Model):
+    """Totais de um perfil num dia, montados a partir dos eventos agregados."""
+    perfil = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='resumos_diarios')
+    dia = models.DateField(verbose_name="Dia")
+    leituras = models.IntegerField(default=0, verbose_name="Leituras")
+    comentarios = models.IntegerField(default=0, verbose_name="Comentários")
+    categorias_novas = models.IntegerField(default=0, verbose_name="Categorias Novas")
+    pontos = models.IntegerField(default=0, verbose_name="Pontos")
+
+    class Meta:
+        verbose_name = "Resumo Diário"
+        verbose_name_plural = "Resumos Diários"
+        ordering = ['-dia']
+        constraints = [
+            models.UniqueConstraint(fields=['perfil', 'dia'], name='resumo_diario_unico'),
+        ]
+
+    def __str__(self):
+        return f"{self.perfil} em {self.dia:%d/%m/%Y}: {self.pontos} pontos"
+
+    @classmethod
+    def somar(cls, perfil_id, dia, valores):
+        """Soma ``valores`` (campo -> quantidade) ao resumo do dia, criando-o se preciso."""
+        linha = cls.objects.filter(perfil_id=perfil_id, dia=dia)
+        alteracoes = {campo: F(campo) + valor for campo, valor in valores.items()}
+        if linha.update(**alteracoes):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(perfil_id=perfil_id, dia=dia, **valores)
+        except IntegrityError:
+            # Outra agregação criou a linha entre o UPDATE e o INSERT.
+            linha.update(**alteracoes)
+
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
 def criar_user_profile(sender, instance, created, **kwargs):
     if created:
         UserProfile.objects.create(usuario=instance)
 
-@receiver(post_save, sender=settings.AUTH_USER_MODEL)
-def salvar_user_profile(sender, instance, **kwargs):
-    if hasattr(instance, 'userprofile'):
-        instance.userprofile.save()
-
 # Mantenha a classe Perfil original se precisar para compatibilidade
 class Perfil(models.Model):
     usuario = models.OneToOneField(
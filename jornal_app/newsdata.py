@@ -0,0 +1,201 @@
+"""
+Cliente HTTP da API do NewsData.
+
+Toda importação passa por ``cliente_newsdata()``, que guarda um único
+cliente por processo:
+
+* uma ``requests.Session`` com pool de conexões, reaproveitadas (keep-alive)
+  entre categorias e entre as threads da importação;
+* novas tentativas em erro de conexão, 429 e 5xx, com espera exponencial e
+  jitter (ou o ``Retry-After`` da resposta, quando vier);
+* um balde de fichas compartilhado pelas threads, que segura as requisições
+  para não passar de ``NEWSDATA_REQUISICOES_POR_MINUTO``;
+* métricas de tempo de resposta, tentativas e espera no limite.
+
+O cliente é recriado quando alguma configuração ``NEWSDATA_*`` muda (nos
+testes, com ``override_settings``).
+"""
+import random
+import threading
+import time
+from collections import deque
+
+import requests
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from requests.adapters import HTTPAdapter
+
+NEWSDATA_URL = 'https://newsdata.io/api/1/news'
+
+STATUS_REPETIR = {429, 500, 502, 503, 504}
+
+
+class ErroNewsData(Exception):
+    pass
+
+
+class BaldeDeFichas:
+    """Limite de taxa: ``taxa`` fichas por segundo, acumulando no máximo ``capacidade``."""
+
+    def __init__(self, taxa, capacidade, relogio=time.monotonic, dormir=time.sleep):
+        self.taxa = taxa
+        self.capacidade = capacidade
+        self._relogio = relogio
+        self._dormir = dormir
+        self._lock = threading.Lock()
+        self._fichas = float(capacidade)
+        self._atualizado = relogio()
+
+    def retirar(self):
+        """Espera até haver uma ficha, consome-a e retorna quantos segundos esperou."""
+        esperado = 0.0
+        while True:
+            with self._lock:
+                agora = self._relogio()
+                self._fichas = min(self.capacidade, self._fichas + (agora - self._atualizado) * self.taxa)
+                self._atualizado = agora
+                if self._fichas >= 1:
+                    self._fichas -= 1
+                    return esperado
+                espera = (1 - self._fichas) / self.taxa
+            self._dormir(espera)
+            esperado += espera
+
+
+class Metricas:
+    """Contadores e tempos de resposta (os ``AMOSTRAS`` mais recentes)."""
+
+    AMOSTRAS = 500
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tempos = deque(maxlen=self.AMOSTRAS)
+        self.requisicoes = 0
+        self.falhas = 0
+        self.novas_tentativas = 0
+        self.espera_limite = 0.0
+
+    def registrar(self, duracao, sucesso):
+        with self._lock:
+            self.requisicoes += 1
+            self.falhas += not sucesso
+            self._tempos.append(duracao)
+
+    def registrar_nova_tentativa(self):
+        with self._lock:
+            self.novas_tentativas += 1
+
+    def registrar_espera(self, segundos):
+        with self._lock:
+            self.espera_limite += segundos
+
+    def resumo(self):
+        with self._lock:
+            tempos = sorted(self._tempos)
+            return {
+                'requisicoes': self.requisicoes,
+                'falhas': self.falhas,
+                'novas_tentativas': self.novas_tentativas,
+                'espera_limite': self.espera_limite,
+                'tempo_medio': sum(tempos) / len(tempos) if tempos else 0.0,
+                'tempo_p95': tempos[int(0.95 * (len(tempos) - 1))] if tempos else 0.0,
+                'tempo_maximo': tempos[-1] if tempos else 0.0,
+            }
+
+
+class ClienteNewsData:
+
+    def __init__(self, api_key, url=NEWSDATA_URL, tentativas=4, backoff_base=1.0, backoff_maximo=30.0,
+                 requisicoes_por_minuto=None, rajada=5, conexoes=10, timeout=30):
+        self.api_key = api_key
+        self.url = url
+        self.tentativas = max(1, tentativas)
+        self.backoff_base = backoff_base
+        self.backoff_maximo = backoff_maximo
+        self.timeout = timeout
+        self.balde = BaldeDeFichas(requisicoes_por_minuto / 60, rajada) if requisicoes_por_minuto else None
+        self.metricas = Metricas()
+
+        self.sessao = requests.Session()
+        adaptador = HTTPAdapter(pool_connections=conexoes, pool_maxsize=conexoes)
+        self.sessao.mount('http://', adaptador)
+        self.sessao.mount('https://', adaptador)
+
+    @classmethod
+    def das_configuracoes(cls):
+        return cls(
+            api_key=getattr(settings, 'NEWSDATA_API_KEY', ''),
+            url=getattr(settings, 'NEWSDATA_URL', NEWSDATA_URL),
+            tentativas=getattr(settings, 'NEWSDATA_TENTATIVAS', 4),
+            backoff_base=getattr(settings, 'NEWSDATA_BACKOFF_BASE', 1.0),
+            backoff_maximo=getattr(settings, 'NEWSDATA_BACKOFF_MAXIMO', 30.0),
+            requisicoes_por_minuto=getattr(settings, 'NEWSDATA_REQUISICOES_POR_MINUTO', None),
+            rajada=getattr(settings, 'NEWSDATA_RAJADA', 5),
+            conexoes=getattr(settings, 'IMPORTACAO_THREADS', 4),
+        )
+
+    def espera(self, tentativa, resposta=None):
+        """Segundos até a próxima tentativa: ``Retry-After`` ou exponencial com jitter completo."""
+        retry_after = resposta.headers.get('Retry-After', '') if resposta is not None else ''
+        if retry_after.isdigit():
+            return min(float(retry_after), self.backoff_maximo)
+        return random.uniform(0, min(self.backoff_maximo, self.backoff_base * 2 ** tentativa))
+
+    def get(self, **params):
+        """GET na API com as novas tentativas; retorna a última resposta recebida."""
+        for tentativa in range(self.tentativas):
+            if self.balde is not None:
+                self.metricas.registrar_espera(self.balde.retirar())
+
+            inicio = time.monotonic()
+            try:
+                resposta = self.sessao.get(self.url, params={'apikey': self.api_key, **params}, timeout=self.timeout)
+            except requests.RequestException as e:
+                resposta, erro = None, e
+            self.metricas.registrar(time.monotonic() - inicio, resposta is not None and resposta.status_code == 200)
+
+            if resposta is not None and resposta.status_code not in STATUS_REPETIR:
+                return resposta
+            if tentativa + 1 < self.tentativas:
+                self.metricas.registrar_nova_tentativa()
+                time.sleep(self.espera(tentativa, resposta))
+
+        if resposta is None:
+            raise ErroNewsData(f'Falha de conexão com a API: {erro}') from erro
+        return resposta
+
+    def buscar_noticias(self, **params):
+        """Artigos (``results``) da busca; levanta ``ErroNewsData`` se a resposta final não for 200."""
+        if not self.api_key:
+            raise ErroNewsData('Chave API não configurada')
+        resposta = self.get(**params)
+        if resposta.status_code != 200:
+            raise ErroNewsData(f'API respondeu {resposta.status_code}')
+        return resposta.json().get('results', [])
+
+    def fechar(self):
+        self.sessao.close()
+
+
+_cliente = None
+_lock_cliente = threading.Lock()
+
+
+def cliente_newsdata():
+    global _cliente
+    with _lock_cliente:
+        if _cliente is None:
+            _cliente = ClienteNewsData.das_configuracoes()
+        return _cliente
+
+
+@receiver(setting_changed)
+def recriar_cliente(setting, **kwargs):
+    global _cliente
+    if not setting.startswith(('NEWSDATA_', 'IMPORTACAO_')):
+        return
+    with _lock_cliente:
+        if _cliente is not None:
+            _cliente.fechar()
+        _cliente = None
@@ -0,0 +1,184 @@
+"""
+Rankings de leitores: geral, da semana e por categoria.
+
+O quadro geral vem de ``UserProfile.pontos`` (índice ``perfil_ranking_idx``);
+os pontos da semana e de cada categoria ficam acumulados em
+``PontosRanking``, uma linha por perfil e quadro, somados por
+``UserProfile.aplicar_eventos()``.
+
+Cada processo guarda os quadros consultados em memória, numa lista
+ordenada: os N primeiros são uma fatia e a posição de um leitor é uma
+busca binária. Os pontos ganhos no próprio processo entram na hora; os dos
+outros processos aparecem quando o quadro é recarregado do banco, a cada
+``RECARREGAR_A_CADA`` segundos.
+"""
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+QUADRO_GERAL = 'geral'
+
+RECARREGAR_A_CADA = 60
+
+
+def quadro_semanal(data=None):
+    ano, semana, _ = (data or timezone.localdate()).isocalendar()
+    return f'semana:{ano}-{semana:02d}'
+
+
+def quadro_categoria(categoria_id):
+    return f'categoria:{categoria_id}'
+
+
+class Quadro:
+    """Pontos de um quadro em ordem decrescente, como pares ``(-pontos, usuario_id)``."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._ordenados = []
+        self._pontos = {}
+        self.carregado_em = None
+
+    def carregar(self, pares):
+        """Reconstrói o quadro a partir de pares ``(usuario_id, pontos)``."""
+        pontos = {usuario_id: total for usuario_id, total in pares if total > 0}
+        ordenados = sorted((-total, usuario_id) for usuario_id, total in pontos.items())
+        with self._lock:
+            self._pontos = pontos
+            self._ordenados = ordenados
+            self.carregado_em = time.monotonic()
+
+    def desatualizado(self):
+        return self.carregado_em is None or time.monotonic() - self.carregado_em > RECARREGAR_A_CADA
+
+    def definir(self, usuario_id, pontos):
+        with self._lock:
+            anterior = self._pontos.pop(usuario_id, None)
+            if anterior is not None:
+                posicao = bisect_left(self._ordenados, (-anterior, usuario_id))
+                del self._ordenados[posicao]
+            if pontos > 0:
+                self._pontos[usuario_id] = pontos
+                insort(self._ordenados, (-pontos, usuario_id))
+
+    def somar(self, usuario_id, pontos):
+        with self._lock:
+            self.definir(usuario_id, self._pontos.get(usuario_id, 0) + pontos)
+
+    def pontos(self, usuario_id):
+        return self._pontos.get(usuario_id, 0)
+
+    def primeiros(self, quantidade):
+        """Os ``quantidade`` primeiros como ``(posicao, usuario_id, pontos)``."""
+        with self._lock:
+            topo = self._ordenados[:quantidade]
+            return [(self._posicao(-negativo), usuario_id, -negativo) for negativo, usuario_id in topo]
+
+    def posicao(self, usuario_id):
+        """Posição do leitor (empates dividem a posição), ou ``None`` se não pontuou."""
+        with self._lock:
+            pontos = self._pontos.get(usuario_id)
+            return None if pontos is None else self._posicao(pontos)
+
+    def _posicao(self, pontos):
+        # Quantos têm mais pontos, achado por busca binária.
+        return bisect_left(self._ordenados, (-pontos,)) + 1
+
+    def __len__(self):
+        return len(self._ordenados)
+
+
+class Rankings:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._quadros = {}
+
+    def quadro(self, nome):
+        """O quadro ``nome``, carregado do banco se ainda não estiver em memória ou estiver velho."""
+        with self._lock:
+            quadro = self._quadros.get(nome)
+            if quadro is None:
+                quadro = self._quadros[nome] = Quadro()
+        if quadro.desatualizado():
+            quadro.carregar(self._pares_do_banco(nome))
+        return quadro
+
+    @staticmethod
+    def _pares_do_banco(nome):
+        from .models import PontosRanking, UserProfile
+
+        if nome == QUADRO_GERAL:
+            linhas = UserProfile.objects.filter(pontos__gt=0).values_list('usuario_id', 'pontos')
+        else:
+            linhas = PontosRanking.objects.filter(quadro=nome, pontos__gt=0).values_list('perfil__usuario_id', 'pontos')
+        return linhas.iterator(chunk_size=2000)
+
+    def _em_memoria(self, nome):
+        return self._quadros.get(nome)
+
+    def registrar(self, perfil, pontos, pontos_por_categoria=None):
+        """Soma os pontos que ``perfil`` acabou de ganhar aos quadros.
+
+        ``perfil.pontos`` já deve ter o total gravado; ``pontos_por_categoria``
+        diz a que categoria pertence cada parte de ``pontos``.
+        """
+        somas = {quadro_semanal(): pontos}
+        for categoria_id, pontos_categoria in (pontos_por_categoria or {}).items():
+            if pontos_categoria:
+                somas[quadro_categoria(categoria_id)] = pontos_categoria
+
+        for nome, valor in somas.items():
+            _somar_no_banco(perfil.pk, nome, valor)
+
+        quadro = self._em_memoria(QUADRO_GERAL)
+        if quadro is not None:
+            quadro.definir(perfil.usuario_id, perfil.pontos)
+        for nome, valor in somas.items():
+            quadro = self._em_memoria(nome)
+            if quadro is not None:
+                quadro.somar(perfil.usuario_id, valor)
+
+    def limpar(self):
+        with self._lock:
+            self._quadros = {}
+
+
+def _somar_no_banco(perfil_id, quadro, pontos):
+    from .models import PontosRanking
+
+    atualizados = PontosRanking.objects.filter(perfil_id=perfil_id, quadro=quadro).update(pontos=F('pontos') + pontos)
+    if atualizados:
+        return
+    try:
+        with transaction.atomic():
+            PontosRanking.objects.create(perfil_id=perfil_id, quadro=quadro, pontos=pontos)
+    except IntegrityError:
+        # Outra requisição criou a linha entre o UPDATE e o INSERT.
+        PontosRanking.objects.filter(perfil_id=perfil_id, quadro=quadro).update(pontos=F('pontos') + pontos)
+
+
+rankings = Rankings()
+
+
+def montar_ranking(nome, quantidade=10, usuario=None):
+    """Dados para exibir um quadro: os primeiros e, se informado, a posição de ``usuario``."""
+    from django.contrib.auth import get_user_model
+
+    quadro = rankings.quadro(nome)
+    primeiros = quadro.primeiros(quantidade)
+    usuarios = get_user_model().objects.in_bulk([usuario_id for _, usuario_id, _ in primeiros])
+    return {
+        'primeiros': [
+            {'posicao': posicao, 'usuario': usuarios.get(usuario_id), 'pontos': pontos}
+            for posicao, usuario_id, pontos in primeiros
+            if usuario_id in usuarios
+        ],
+        'posicao': quadro.posicao(usuario.pk) if usuario is not None else None,
+        'pontos': quadro.pontos(usuario.pk) if usuario is not None else 0,
+        'participantes': len(quadro),
+    }
@@ -0,0 +1,196 @@
+"""
+Índice de notícias relacionadas.
+
+Cada notícia é representada por um vetor TF-IDF esparso (dicionário
+``termo -> peso`` normalizado) montado a partir do título e do conteúdo, e
+os vizinhos são as notícias da mesma categoria com maior similaridade de
+cosseno. O resultado fica na tabela ``NoticiaRelacionada``, então a página
+do artigo só faz uma leitura indexada.
+
+O cálculo completo roda pelo comando ``python manage.py calcular_relacionadas``;
+depois de cada importação, ``atualizar_relacionadas()`` calcula os vizinhos
+das notícias novas e atualiza só as listas antigas em que elas entram.
+"""
+import math
+import re
+from collections import Counter, defaultdict
+
+from django.db import transaction
+
+from .busca import normalizar_texto
+from .cache_noticias import invalidar_cache_relacionadas
+from .models import Categoria, Noticia, NoticiaRelacionada
+
+VIZINHOS_POR_NOTICIA = 4
+
+# Só os termos de maior peso entram no vetor: limita o custo do produto
+# escalar sem mudar muito quais notícias ficam mais próximas.
+MAX_TERMOS_POR_VETOR = 40
+
+TAMANHO_LOTE = 500
+
+PALAVRAS_VAZIAS = {
+    'ante', 'apos', 'aquela', 'aquele', 'aqui', 'assim', 'ate', 'com', 'como', 'contra', 'das',
+    'desde', 'dos', 'ela', 'elas', 'ele', 'eles', 'em', 'entre', 'era', 'essa', 'esse', 'esta',
+    'este', 'foi', 'for', 'foram', 'mais', 'mas', 'mesmo', 'muito', 'nao', 'nas', 'nem', 'nos',
+    'num', 'numa', 'outra', 'outro', 'para', 'pela', 'pelas', 'pelo', 'pelos', 'por', 'qual',
+    'quando', 'que', 'quem', 'sao', 'seja', 'sem', 'ser', 'sera', 'seu', 'seus', 'sobre', 'sua',
+    'suas', 'tambem', 'tem', 'ter', 'uma', 'umas', 'uns', 'vai', 'voce',
+}
+
+
+def extrair_termos(texto):
+    return [
+        termo for termo in re.findall(r'\w+', normalizar_texto(texto))
+        if len(termo) > 2 and not termo.isdigit() and termo not in PALAVRAS_VAZIAS
+    ]
+
+
+def montar_vetores(documentos):
+    """Recebe ``{pk: texto}`` e devolve ``{pk: {termo: peso}}`` com norma 1."""
+    contagens = {pk: Counter(extrair_termos(texto)) for pk, texto in documentos.items()}
+
+    frequencia_documentos = Counter()
+    for contagem in contagens.values():
+        frequencia_documentos.update(contagem.keys())
+
+    total = len(documentos)
+    vetores = {}
+    for pk, contagem in contagens.items():
+        pesos = {
+            termo: (1 + math.log(tf)) * (math.log((1 + total) / (1 + frequencia_documentos[termo])) + 1)
+            for termo, tf in contagem.items()
+        }
+        pesos = dict(sorted(pesos.items(), key=lambda item: item[1], reverse=True)[:MAX_TERMOS_POR_VETOR])
+        norma = math.sqrt(sum(peso * peso for peso in pesos.values()))
+        vetores[pk] = {termo: peso / norma for termo, peso in pesos.items()} if norma else {}
+    return vetores
+
+
+def montar_indice_invertido(vetores):
+    indice_invertido = defaultdict(list)
+    for pk, vetor in vetores.items():
+        for termo, peso in vetor.items():
+            indice_invertido[termo].append((pk, peso))
+    return indice_invertido
+
+
+def _melhores(similaridades, vizinhos=VIZINHOS_POR_NOTICIA):
+    melhores = sorted(similaridades.items(), key=lambda item: (-item[1], -item[0]))[:vizinhos]
+    return [(outro_pk, similaridade) for outro_pk, similaridade in melhores if similaridade > 0]
+
+
+def calcular_vizinhos(vetores, alvos, indice_invertido=None, vizinhos=VIZINHOS_POR_NOTICIA):
+    """Retorna ``{pk: [(pk_vizinho, similaridade), ...]}`` para cada pk em ``alvos``.
+
+    Usa um índice invertido (termo -> notícias), então cada notícia só é
+    comparada com as que compartilham algum termo com ela.
+    """
+    if indice_invertido is None:
+        indice_invertido = montar_indice_invertido(vetores)
+
+    resultado = {}
+    for pk in alvos:
+        pontuacao = defaultdict(float)
+        for termo, peso in vetores.get(pk, {}).items():
+            for outro_pk, outro_peso in indice_invertido[termo]:
+                if outro_pk != pk:
+                    pontuacao[outro_pk] += peso * outro_peso
+
+        resultado[pk] = _melhores(pontuacao, vizinhos)
+    return resultado
+
+
+def _documentos_da_categoria(categoria_id):
+    linhas = Noticia.objects.filter(categoria_id=categoria_id).values_list('pk', 'titulo', 'conteudo')
+    # O título conta em dobro: é o resumo mais fiel do assunto.
+    return {pk: f'{titulo} {titulo} {conteudo}' for pk, titulo, conteudo in linhas.iterator(chunk_size=TAMANHO_LOTE)}
+
+
+def _gravar_vizinhos(vizinhos_por_noticia):
+    pks = list(vizinhos_por_noticia)
+    with transaction.atomic():
+        for inicio in range(0, len(pks), TAMANHO_LOTE):
+            lote = pks[inicio:inicio + TAMANHO_LOTE]
+            NoticiaRelacionada.objects.filter(noticia_id__in=lote).delete()
+            NoticiaRelacionada.objects.bulk_create([
+                NoticiaRelacionada(noticia_id=pk, relacionada_id=outro_pk, similaridade=similaridade)
+                for pk in lote
+                for outro_pk, similaridade in vizinhos_por_noticia[pk]
+            ])
+
+
+def calcular_relacionadas(categoria_ids=None):
+    """Recalcula o índice inteiro (ou só das categorias informadas).
+
+    Retorna quantas notícias tiveram os vizinhos calculados.
+    """
+    if categoria_ids is None:
+        categoria_ids = list(Categoria.objects.values_list('pk', flat=True))
+
+    total = 0
+    for categoria_id in categoria_ids:
+        vetores = montar_vetores(_documentos_da_categoria(categoria_id))
+        indice_invertido = montar_indice_invertido(vetores)
+        pks = list(vetores)
+        for inicio in range(0, len(pks), TAMANHO_LOTE):
+            lote = pks[inicio:inicio + TAMANHO_LOTE]
+            _gravar_vizinhos(calcular_vizinhos(vetores, lote, indice_invertido))
+        total += len(vetores)
+    invalidar_cache_relacionadas()
+    return total
+
+
+def _vizinhos_gravados(pks):
+    gravados = defaultdict(dict)
+    for inicio in range(0, len(pks), TAMANHO_LOTE):
+        linhas = NoticiaRelacionada.objects.filter(noticia_id__in=pks[inicio:inicio + TAMANHO_LOTE])
+        for pk, outro_pk, similaridade in linhas.values_list('noticia_id', 'relacionada_id', 'similaridade'):
+            gravados[pk][outro_pk] = similaridade
+    return gravados
+
+
+def atualizar_relacionadas(noticias):
+    """Atualiza o índice depois de uma importação, sem recalcular as categorias.
+
+    As notícias novas ganham os seus vizinhos. Das antigas, só são
+    regravadas as listas em que alguma nova entra: como a lista dos N mais
+    próximos não é simétrica, a similaridade de cada antiga com as novas é
+    comparada com a lista gravada dela, e não com a lista das novas. As
+    similaridades já gravadas não são refeitas com o IDF novo da categoria;
+    ``python manage.py calcular_relacionadas`` recalcula tudo.
+
+    Retorna quantas notícias tiveram a lista gravada.
+    """
+    novas_por_categoria = defaultdict(set)
+    for noticia in noticias:
+        novas_por_categoria[noticia.categoria_id].add(noticia.pk)
+
+    total = 0
+    for categoria_id, novas in novas_por_categoria.items():
+        vetores = montar_vetores(_documentos_da_categoria(categoria_id))
+        novas = [pk for pk in novas if pk in vetores]
+        indice_invertido = montar_indice_invertido(vetores)
+        listas = calcular_vizinhos(vetores, novas, indice_invertido)
+
+        # O cosseno é simétrico: a similaridade de uma antiga com cada nova
+        # sai das mesmas somas usadas para os vizinhos das novas.
+        com_novas = defaultdict(dict)
+        for nova in novas:
+            for termo, peso in vetores[nova].items():
+                for outro_pk, outro_peso in indice_invertido[termo]:
+                    if outro_pk not in listas:
+                        com_novas[outro_pk][nova] = com_novas[outro_pk].get(nova, 0.0) + peso * outro_peso
+
+        gravados = _vizinhos_gravados(list(com_novas))
+        for pk, similaridades in com_novas.items():
+            atual = _melhores(gravados[pk])
+            nova_lista = _melhores({**gravados[pk], **similaridades})
+            if nova_lista != atual:
+                listas[pk] = nova_lista
+
+        _gravar_vizinhos(listas)
+        total += len(listas)
+    if total:
+        invalidar_cache_relacionadas()
+    return total
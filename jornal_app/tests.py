@@ -1,13 +1,37 @@
-from django.test import TestCase, Client, LiveServerTestCase
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, Client, LiveServerTestCase, override_settings
 from django.urls import reverse
+from django.core.management import call_command
+from django.conf import settings
+from django.core.cache import cache
+from django.db import OperationalError, connection
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import User
-from jornal_app.models import Noticia, Categoria, Comentario, UserProfile
-from datetime import datetime
+from django.core.exceptions import ValidationError
+from django.apps import apps
+from jornal_app.models import (
+    Noticia, NoticiaRelacionada, Categoria, Comentario, EventoAtividade, LeituraNoticia,
+    ResumoDiario, TarefaImportacao, UserProfile,
+)
+from jornal_app import atividades, busca, cache_noticias, conquistas, importacao, links, newsdata, ranking, relacionadas, views
+from jornal_app.gamificacao import fila_gamificacao
+from jornal_app.leituras import LeiturasRecentes, leituras_recentes
+from jornal_app.cache_sqlite import SQLiteCache
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from django.utils import timezone
+from unittest.mock import patch
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
+import importlib
+import io
+import json
+import os
+import tempfile
+import threading
 import time
 
 
@@ -137,6 +161,1519 @@ class JornalAppViewsTests(TestCase):
         self.assertContains(response, self.noticia.titulo)
 
 
+class BuscaNoticiasTests(TestCase):
+
+    def setUp(self):
+        self.categoria = Categoria.objects.create(nome="Economia")
+        self.url_search = reverse("jornal_app:noticia_search")
+
+    def criar_noticia(self, titulo, conteudo, autor_fonte=None):
+        return Noticia.objects.create(
+            titulo=titulo,
+            conteudo=conteudo,
+            categoria=self.categoria,
+            autor_fonte=autor_fonte,
+        )
+
+    def test_indice_fts_disponivel(self):
+        self.assertTrue(busca.fts_disponivel())
+
+    def test_titulo_tem_mais_relevancia_que_conteudo(self):
+        no_conteudo = self.criar_noticia("Mercado abre em alta", "A inflação preocupa o mercado")
+        no_titulo = self.criar_noticia("Inflação desacelera em outubro", "Índice ficou abaixo do esperado")
+
+        self.assertEqual(busca.buscar_ids("inflação"), [no_titulo.pk, no_conteudo.pk])
+
+    def test_busca_por_autor_fonte(self):
+        noticia = self.criar_noticia("Safra recorde", "Colheita supera estimativas", autor_fonte="agenciabrasil")
+        response = self.client.get(self.url_search, {"q": "agenciabrasil"})
+        self.assertContains(response, noticia.titulo)
+
+    def test_indice_acompanha_edicao_e_exclusao(self):
+        noticia = self.criar_noticia("Dólar sobe", "Moeda americana fecha em alta")
+        noticia.titulo = "Euro sobe"
+        noticia.save()
+
+        self.assertEqual(busca.buscar_ids("dólar"), [])
+        self.assertEqual(busca.buscar_ids("euro"), [noticia.pk])
+
+        noticia.delete()
+        self.assertEqual(busca.buscar_ids("euro"), [])
+
+    def test_operadores_fts_digitados_sao_ignorados(self):
+        noticia = self.criar_noticia("Juros e câmbio", "Copom mantém a Selic")
+        self.assertEqual(busca.buscar_ids('"juros" (câmbio*'), [noticia.pk])
+
+    def test_busca_paginada_com_carregar_mais(self):
+        for i in range(views.BUSCA_POR_PAGINA + 3):
+            self.criar_noticia(f"Eleição municipal {i}", "Cobertura das eleições")
+
+        response = self.client.get(self.url_search, {"q": "eleição"})
+        self.assertEqual(len(response.context["noticias"]), views.BUSCA_POR_PAGINA)
+        self.assertTrue(response.context["tem_proxima"])
+        self.assertContains(response, f"{views.BUSCA_POR_PAGINA + 3} resultado(s) encontrado(s)")
+
+        url_feed = reverse("jornal_app:noticia_search_feed")
+        response = self.client.get(url_feed, {"q": "eleição", "page": 2})
+        self.assertEqual(len(response.context["noticias"]), 3)
+        self.assertFalse(response.context["tem_proxima"])
+        self.assertNotContains(response, "search-next-page")
+
+    def test_contagem_limitada(self):
+        for i in range(5):
+            self.criar_noticia(f"Chuva forte {i}", "Alerta da Defesa Civil")
+
+        self.assertEqual(busca.contar_resultados(Noticia.objects.all(), "chuva", 3), (3, False))
+        self.assertEqual(busca.contar_resultados(Noticia.objects.all(), "chuva", 10), (5, True))
+
+    def test_busca_vazia_nao_lista_todas_as_noticias(self):
+        self.criar_noticia("Trânsito lento", "Congestionamento na avenida")
+        response = self.client.get(self.url_search)
+        self.assertEqual(response.context["noticias"], [])
+        self.assertContains(response, "Digite um termo para buscar notícias")
+
+    def test_busca_sem_acentos_e_maiusculas(self):
+        noticia = self.criar_noticia("Política de SAÚDE pública", "Ministério anuncia mutirão")
+
+        self.assertEqual(noticia.texto_busca, "politica de saude publica ministerio anuncia mutirao")
+        self.assertEqual(busca.buscar_ids("politica saude"), [noticia.pk])
+        self.assertEqual(busca.buscar_ids("MINISTÉRIO"), [noticia.pk])
+
+    def test_sem_fts_usa_texto_normalizado(self):
+        noticia = self.criar_noticia("Bolsa fecha em queda", "Ibovespa recua 2% com Petrobrás")
+        with patch("jornal_app.busca.fts_disponivel", return_value=False):
+            self.assertIsNone(busca.buscar_ids("bolsa"))
+            self.assertEqual(busca.contar_resultados(Noticia.objects.all(), "bolsa", 10), (1, True))
+            response = self.client.get(self.url_search, {"q": "petrobras IBOVESPA"})
+        self.assertContains(response, noticia.titulo)
+
+
+class CacheBuscaTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.categoria = Categoria.objects.create(nome="Política")
+        self.url_search = reverse("jornal_app:noticia_search")
+        self.noticia = Noticia.objects.create(
+            titulo="Eleições 2026: debate na TV",
+            conteudo="Candidatos discutem segurança",
+            categoria=self.categoria,
+        )
+
+    def consultas_em_noticias(self, params):
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(self.url_search, params)
+        return response, [q for q in consultas if "jornal_app_noticia" in q["sql"]]
+
+    def test_busca_repetida_vem_do_cache(self):
+        response, consultas = self.consultas_em_noticias({"q": "eleições"})
+        self.assertTrue(consultas)
+        self.assertContains(response, self.noticia.titulo)
+
+        response, consultas = self.consultas_em_noticias({"q": "ELEICOES"})
+        self.assertEqual(consultas, [])
+        self.assertContains(response, self.noticia.titulo)
+        self.assertContains(response, "1 resultado(s) encontrado(s)")
+
+    def test_publicacao_invalida_cache(self):
+        self.client.get(self.url_search, {"q": "eleições"})
+        nova = Noticia.objects.create(titulo="Eleições: pesquisa nova", conteudo="...", categoria=self.categoria)
+
+        response = self.client.get(self.url_search, {"q": "eleições"})
+        self.assertContains(response, nova.titulo)
+
+        self.noticia.delete()
+        response = self.client.get(self.url_search, {"q": "eleições"})
+        self.assertNotContains(response, self.noticia.titulo)
+
+    def test_importacao_invalida_cache(self):
+        geracao = cache_noticias.obter_geracao(cache_noticias.GERACAO_NOTICIAS)
+        importacao.processar_artigos_para_categoria([{
+            "title": "Eleições: TSE divulga calendário",
+            "link": "https://exemplo.com/tse",
+            "description": "Calendário eleitoral",
+            "source_id": "tse",
+        }], self.categoria)
+        self.assertGreater(cache_noticias.obter_geracao(cache_noticias.GERACAO_NOTICIAS), geracao)
+
+
+class CacheHomeTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.categoria = Categoria.objects.create(nome="Política")
+        self.url_home = reverse("jornal_app:home")
+        self.noticia = Noticia.objects.create(
+            titulo="Câmara aprova orçamento",
+            conteudo="Votação terminou de madrugada",
+            categoria=self.categoria,
+        )
+
+    def consultas_em_noticias(self):
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(self.url_home)
+        return response, [q for q in consultas if "jornal_app_noticia" in q["sql"]]
+
+    def test_blocos_da_home_vem_do_cache(self):
+        response, consultas = self.consultas_em_noticias()
+        self.assertEqual(len(consultas), 2)
+
+        response, consultas = self.consultas_em_noticias()
+        self.assertEqual(consultas, [])
+        self.assertContains(response, self.noticia.titulo)
+
+    def test_publicacao_atualiza_home(self):
+        self.client.get(self.url_home)
+        nova = Noticia.objects.create(titulo="Senado instala CPI", conteudo="...", categoria=self.categoria)
+        self.assertContains(self.client.get(self.url_home), nova.titulo)
+
+    def test_acao_de_destaque_no_admin_atualiza_home(self):
+        admin = User.objects.create_superuser(username="editor", password="123456")
+        self.client.force_login(admin)
+        self.client.get(self.url_home)
+
+        self.client.post(reverse("admin:jornal_app_noticia_changelist"), {
+            "action": "marcar_como_destaque",
+            "_selected_action": [self.noticia.pk],
+        })
+        response = self.client.get(self.url_home)
+        self.assertRegex(response.content.decode(), r'feature-title">\s*' + self.noticia.titulo)
+
+
+class CacheMenuCategoriasTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.categoria = Categoria.objects.create(nome="Economia")
+        self.url_home = reverse("jornal_app:home")
+
+    def test_home_anonima_sem_consultas(self):
+        self.client.get(self.url_home)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url_home)
+        self.assertContains(response, "ECONOMIA")
+
+    def test_menu_acompanha_alteracoes_de_categoria(self):
+        self.client.get(self.url_home)
+
+        Categoria.objects.create(nome="Tecnologia")
+        self.assertContains(self.client.get(self.url_home), "TECNOLOGIA")
+
+        self.categoria.delete()
+        self.assertNotContains(self.client.get(self.url_home), "ECONOMIA")
+
+    def test_criar_categorias_api_atualiza_menu(self):
+        staff = User.objects.create_user(username="editor", password="123456", is_staff=True)
+        self.client.force_login(staff)
+        self.client.get(self.url_home)
+
+        self.client.get(reverse("jornal_app:criar_categorias_api"))
+        self.assertContains(self.client.get(self.url_home), "ENTRETENIMENTO")
+
+
+@override_settings(GAMIFICACAO_FLUSH_INTERVALO=0)
+class GetCondicionalTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.categoria = Categoria.objects.create(nome="Cultura")
+        self.usuario = User.objects.create_user(username="leitor", password="123456")
+        self.noticia = Noticia.objects.create(
+            titulo="Festival de inverno começa hoje",
+            conteudo="Programação gratuita",
+            categoria=self.categoria,
+        )
+        self.url_artigo = reverse("jornal_app:artigo", args=[self.noticia.pk])
+        self.url_categoria = reverse("jornal_app:noticias_por_categoria", args=[self.categoria.pk])
+
+    def revalidar(self, url):
+        etag = self.client.get(url)["ETag"]
+        return etag, self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_artigo_sem_mudancas_retorna_304(self):
+        etag, response = self.revalidar(self.url_artigo)
+        self.assertEqual(response.status_code, 304)
+
+    def test_sem_last_modified(self):
+        # Só o ETag valida: If-Modified-Since não enxerga comentário nem notícia removidos.
+        comentario = Comentario.objects.create(noticia=self.noticia, autor=self.usuario, texto="Imperdível")
+        self.assertNotIn("Last-Modified", self.client.get(self.url_artigo))
+        self.assertNotIn("Last-Modified", self.client.get(self.url_categoria))
+
+        etag = self.client.get(self.url_artigo)["ETag"]
+        comentario.delete()
+        self.assertEqual(self.client.get(self.url_artigo, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_edicao_e_comentario_mudam_etag_do_artigo(self):
+        etag = self.client.get(self.url_artigo)["ETag"]
+
+        Comentario.objects.create(noticia=self.noticia, autor=self.usuario, texto="Imperdível")
+        response = self.client.get(self.url_artigo, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Imperdível")
+
+        etag = response["ETag"]
+        self.noticia.conteudo = "Programação atualizada"
+        self.noticia.save()
+        self.assertEqual(self.client.get(self.url_artigo, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_barra_de_relacionadas_muda_etag_do_artigo(self):
+        etag = self.client.get(self.url_artigo)["ETag"]
+        Noticia.objects.create(titulo="Mostra de cinema", conteudo="...", categoria=self.categoria)
+        response = self.client.get(self.url_artigo, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Mostra de cinema")
+
+        etag = response["ETag"]
+        relacionadas.calcular_relacionadas()
+        self.assertEqual(self.client.get(self.url_artigo, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_usuario_logado_nao_recebe_304(self):
+        self.client.force_login(self.usuario)
+        response = self.client.get(self.url_artigo)
+        self.assertNotIn("ETag", response)
+
+    def test_categoria_e_feeds(self):
+        etag, response = self.revalidar(self.url_categoria)
+        self.assertEqual(response.status_code, 304)
+
+        url_feed_categoria = reverse("jornal_app:categoria_feed", args=[self.categoria.pk])
+        etag_feed_categoria, response = self.revalidar(url_feed_categoria)
+        self.assertEqual(response.status_code, 304)
+
+        url_feed = reverse("jornal_app:noticia_feed")
+        etag_feed, response = self.revalidar(url_feed)
+        self.assertEqual(response.status_code, 304)
+
+        Noticia.objects.create(titulo="Mostra de cinema", conteudo="...", categoria=self.categoria)
+        self.assertEqual(self.client.get(self.url_categoria, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        self.assertEqual(self.client.get(url_feed_categoria, HTTP_IF_NONE_MATCH=etag_feed_categoria).status_code, 200)
+        self.assertEqual(self.client.get(url_feed, HTTP_IF_NONE_MATCH=etag_feed).status_code, 200)
+
+
+class ArtigoQueryBudgetTests(TestCase):
+    # validadores do GET condicional + notícia com categoria + comentários
+    # com autores + vizinhos pré-calculados + recentes da categoria (a notícia
+    # do teste ainda não tem vizinhos)
+    CONSULTAS_ARTIGO_ANONIMO = 5
+
+    def setUp(self):
+        cache.clear()
+        self.categoria = Categoria.objects.create(nome="Geral")
+        self.noticia = Noticia.objects.create(titulo="Obras no metrô", conteudo="Linha sul", categoria=self.categoria)
+        self.url_artigo = reverse("jornal_app:artigo", args=[self.noticia.pk])
+        self.client.get(reverse("jornal_app:home"))
+
+    def comentar(self, quantidade):
+        for i in range(quantidade):
+            autor = User.objects.create_user(username=f"leitor{Comentario.objects.count()}", password="123456")
+            Comentario.objects.create(noticia=self.noticia, autor=autor, texto=f"Comentário {i}")
+
+    def test_orcamento_de_consultas_nao_cresce_com_comentarios(self):
+        self.comentar(1)
+        with self.assertNumQueries(self.CONSULTAS_ARTIGO_ANONIMO):
+            response = self.client.get(self.url_artigo)
+        self.assertContains(response, "1 Comentário<")
+
+        self.comentar(5)
+        with self.assertNumQueries(self.CONSULTAS_ARTIGO_ANONIMO):
+            response = self.client.get(self.url_artigo)
+        self.assertContains(response, "6 Comentários")
+        self.assertContains(response, self.categoria.nome)
+
+
+class NoticiasRelacionadasTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.categoria = Categoria.objects.create(nome="Esportes")
+
+    def importar(self, titulos):
+        artigos = [
+            {"title": titulo, "link": f"https://exemplo.com/{i}", "description": conteudo, "source_id": "teste"}
+            for i, (titulo, conteudo) in enumerate(titulos)
+        ]
+        importacao.processar_artigos_para_categoria(artigos, self.categoria)
+        return {n.titulo: n for n in Noticia.objects.all()}
+
+    def test_vizinhos_por_similaridade(self):
+        vetores = relacionadas.montar_vetores({
+            1: "Sport vence o Náutico na Ilha do Retiro",
+            2: "Náutico perde para o Sport no clássico da Ilha",
+            3: "Vôlei de praia: dupla brasileira é campeã",
+        })
+        vizinhos = relacionadas.calcular_vizinhos(vetores, [1, 3])
+        self.assertEqual([pk for pk, _ in vizinhos[1]], [2])
+        self.assertEqual(vizinhos[3], [])
+
+    def test_importacao_atualiza_indice_e_pagina_do_artigo(self):
+        noticias = self.importar([
+            ("Sport vence o Náutico", "Clássico pernambucano na Ilha do Retiro"),
+            ("Vôlei de praia tem nova campeã", "Dupla brasileira vence etapa"),
+            ("Náutico quer revanche contra o Sport", "Clássico pernambucano volta aos Aflitos"),
+        ])
+        sport = noticias["Sport vence o Náutico"]
+        revanche = noticias["Náutico quer revanche contra o Sport"]
+
+        primeiro_vizinho = sport.relacionadas.order_by("-similaridade").first()
+        self.assertEqual(primeiro_vizinho.relacionada, revanche)
+
+        response = self.client.get(reverse("jornal_app:artigo", args=[sport.pk]))
+        self.assertEqual(response.context["noticias_similares"][0], revanche)
+
+    def test_importacao_so_regrava_as_listas_em_que_as_novas_entram(self):
+        sport = Noticia.objects.create(titulo="Sport vence o Náutico", conteudo="Clássico na Ilha do Retiro", categoria=self.categoria)
+        revanche = Noticia.objects.create(titulo="Náutico quer revanche", conteudo="Clássico nos Aflitos", categoria=self.categoria)
+        frevo = Noticia.objects.create(titulo="Frevo abre o carnaval", conteudo="Orquestras no Recife Antigo", categoria=self.categoria)
+        maracatu = Noticia.objects.create(titulo="Maracatu no carnaval", conteudo="Nações no Recife Antigo", categoria=self.categoria)
+        relacionadas.calcular_relacionadas()
+
+        nova = Noticia.objects.create(titulo="Sport e Náutico de novo", conteudo="Clássico decide o turno", categoria=self.categoria)
+        geracao_noticias = cache_noticias.obter_geracao(cache_noticias.GERACAO_NOTICIAS)
+        with patch.object(relacionadas, "_gravar_vizinhos", wraps=relacionadas._gravar_vizinhos) as gravar:
+            self.assertEqual(relacionadas.atualizar_relacionadas([nova]), 3)
+
+        self.assertEqual(set(gravar.call_args.args[0]), {nova.pk, sport.pk, revanche.pk})
+        self.assertIn(nova, [r.relacionada for r in sport.relacionadas.all()])
+        self.assertEqual({r.relacionada for r in nova.relacionadas.all()}, {sport, revanche})
+        self.assertEqual([r.relacionada for r in frevo.relacionadas.all()], [maracatu])
+        # Recalcular vizinhos não invalida buscas, home e o índice de títulos.
+        self.assertEqual(cache_noticias.obter_geracao(cache_noticias.GERACAO_NOTICIAS), geracao_noticias)
+
+    def test_sem_vizinhos_mostra_recentes_da_categoria(self):
+        sem_termos = Noticia.objects.create(titulo="Gol!", conteudo="...", categoria=self.categoria)
+        outra = Noticia.objects.create(titulo="Tabela do campeonato", conteudo="Rodada 10", categoria=self.categoria)
+        relacionadas.calcular_relacionadas()
+
+        self.assertFalse(sem_termos.relacionadas.exists())
+        self.assertEqual(views.noticias_similares(sem_termos), [outra])
+
+    def test_comando_recalcula_tudo(self):
+        Noticia.objects.create(titulo="Sport contrata atacante", conteudo="Reforço", categoria=self.categoria)
+        Noticia.objects.create(titulo="Atacante do Sport é apresentado", conteudo="Reforço", categoria=self.categoria)
+        call_command("calcular_relacionadas", stdout=io.StringIO())
+        self.assertEqual(NoticiaRelacionada.objects.count(), 2)
+
+
+class SQLiteCacheTests(SimpleTestCase):
+
+    def setUp(self):
+        pasta = tempfile.TemporaryDirectory()
+        self.addCleanup(pasta.cleanup)
+        self.caminho = os.path.join(pasta.name, "cache.sqlite3")
+        self.cache = self.novo_worker()
+
+    def novo_worker(self, **opcoes):
+        return SQLiteCache(self.caminho, {"OPTIONS": opcoes})
+
+    def test_set_get_delete(self):
+        self.cache.set("chave", {"valor": [1, 2]})
+        self.assertEqual(self.cache.get("chave"), {"valor": [1, 2]})
+        self.assertTrue(self.cache.delete("chave"))
+        self.assertIsNone(self.cache.get("chave"))
+
+    def test_testes_nao_usam_o_cache_do_projeto(self):
+        self.assertNotEqual(
+            os.path.realpath(settings.CACHES["default"]["LOCATION"]),
+            os.path.realpath(os.path.join(settings.BASE_DIR, "cache.sqlite3")),
+        )
+
+    def test_compartilhado_entre_workers(self):
+        outro_worker = self.novo_worker()
+        self.cache.set("geracao", 10)
+        self.assertEqual(outro_worker.incr("geracao"), 11)
+        self.assertEqual(self.cache.get("geracao"), 11)
+
+    def test_ttl(self):
+        self.cache.set("curta", 1, timeout=1)
+        with patch("jornal_app.cache_sqlite.time.time", return_value=time.time() + 5):
+            self.assertIsNone(self.cache.get("curta"))
+            self.assertTrue(self.cache.add("curta", 2))
+        self.assertFalse(self.cache.add("curta", 3))
+
+    def test_incr_inexistente(self):
+        with self.assertRaises(ValueError):
+            self.cache.incr("nao-existe")
+
+    def test_despeja_menos_usadas(self):
+        cache_pequeno = self.novo_worker(MAX_ENTRIES=4, CULL_FREQUENCY=2)
+        cache_pequeno.INTERVALO_VERIFICACAO = 1
+        inicio = time.time()
+        for i in range(4):
+            with patch("jornal_app.cache_sqlite.time.time", return_value=inicio + i * 60):
+                cache_pequeno.set(f"item{i}", i, timeout=None)
+
+        # item0 é lido depois, então passa a ser o mais recente
+        with patch("jornal_app.cache_sqlite.time.time", return_value=inicio + 300):
+            cache_pequeno.get("item0")
+        with patch("jornal_app.cache_sqlite.time.time", return_value=inicio + 400):
+            cache_pequeno.set("item4", 4, timeout=None)
+
+        restantes = cache_pequeno.get_many([f"item{i}" for i in range(5)])
+        self.assertEqual(sorted(restantes), ["item0", "item3", "item4"])
+
+    def test_estatisticas_somam_todos_os_workers(self):
+        self.cache.set("a", 1)
+        self.cache.get("a")
+        self.cache.get("b")
+
+        estatisticas = self.cache.estatisticas()
+        self.assertEqual((estatisticas["acertos"], estatisticas["falhas"]), (1, 1))
+        self.assertEqual(estatisticas["entradas"], 1)
+
+        outro_worker = self.novo_worker()
+        outro_worker.get("a")
+        estatisticas = outro_worker.estatisticas()
+        self.assertEqual((estatisticas["acertos"], estatisticas["falhas"]), (2, 1))
+        self.assertEqual(estatisticas["taxa_acerto"], 2 / 3)
+
+
+@override_settings(GAMIFICACAO_FLUSH_INTERVALO=3600, GAMIFICACAO_FLUSH_LIMITE=1000)
+class FilaGamificacaoTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        fila_gamificacao.descartar()
+        leituras_recentes.limpar()
+        self.addCleanup(fila_gamificacao.descartar)
+        self.categoria = Categoria.objects.create(nome="Economia")
+        self.outra_categoria = Categoria.objects.create(nome="Cultura")
+        self.usuario = User.objects.create_user(username="leitor", password="123456")
+        self.perfil, _ = UserProfile.objects.get_or_create(usuario=self.usuario)
+        self.noticias = [
+            Noticia.objects.create(titulo=f"Notícia {i}", conteudo="...", categoria=self.categoria)
+            for i in range(3)
+        ]
+        self.client.force_login(self.usuario)
+
+    def test_leitura_nao_escreve_no_banco(self):
+        url = reverse("jornal_app:artigo", args=[self.noticias[0].pk])
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+        escritas = [q["sql"] for q in consultas.captured_queries if q["sql"].startswith(("UPDATE", "INSERT"))]
+        escritas = [sql for sql in escritas if "jornal_app_userprofile" in sql]
+        self.assertEqual(escritas, [])
+        self.perfil.refresh_from_db()
+        self.assertEqual(self.perfil.pontos, 0)
+
+    def test_descarregar_agrupa_as_visitas(self):
+        for noticia in self.noticias:
+            self.client.get(reverse("jornal_app:artigo", args=[noticia.pk]))
+        self.client.get(reverse("jornal_app:noticias_por_categoria", args=[self.outra_categoria.pk]))
+
+        self.assertEqual(fila_gamificacao.descarregar(), 1)
+        self.perfil.refresh_from_db()
+        self.assertEqual(self.perfil.noticias_lidas, 3)
+        self.assertEqual(
+            sorted(self.perfil.categorias_visitadas.values_list("pk", flat=True)),
+            sorted([self.categoria.pk, self.outra_categoria.pk]),
+        )
+        self.assertEqual(self.perfil.total_categorias_visitadas, 2)
+        self.assertEqual(self.perfil.pontos, 3 * 5 + 2 * 15)
+
+        # categoria já gravada não volta a dar pontos
+        self.client.get(reverse("jornal_app:noticias_por_categoria", args=[self.categoria.pk]))
+        fila_gamificacao.descarregar()
+        self.perfil.refresh_from_db()
+        self.assertEqual(self.perfil.pontos, 45)
+
+    def test_descarga_sem_pontos_nao_grava_o_perfil(self):
+        # Instância carregada por outra requisição antes da visita ser gravada:
+        # ela ainda enfileira a categoria, que na descarga não vale pontos.
+        outra_requisicao = UserProfile.objects.get(pk=self.perfil.pk)
+        self.assertEqual(outra_requisicao.ids_categorias_visitadas, set())
+        fila_gamificacao.registrar_visita_categoria(self.perfil, self.categoria.pk)
+        fila_gamificacao.descarregar()
+        fila_gamificacao.registrar_visita_categoria(outra_requisicao, self.categoria.pk)
+
+        with CaptureQueriesContext(connection) as consultas:
+            self.assertEqual(fila_gamificacao.descarregar(), 1)
+
+        escritas = [q["sql"] for q in consultas.captured_queries if q["sql"].startswith("UPDATE")]
+        self.assertFalse([sql for sql in escritas if "jornal_app_userprofile" in sql])
+        self.assertFalse(EventoAtividade.objects.filter(lote__isnull=True).exists())
+        self.perfil.refresh_from_db()
+        self.assertEqual(self.perfil.pontos, 15)
+
+    def test_mensagem_de_nivel_usa_pontos_pendentes(self):
+        UserProfile.objects.filter(pk=self.perfil.pk).update(pontos=75)
+        response = self.client.get(reverse("jornal_app:artigo", args=[self.noticias[0].pk]))
+        self.assertNotContains(response, "subiu para o nível")
+
+        response = self.client.get(reverse("jornal_app:artigo", args=[self.noticias[1].pk]))
+        self.assertEqual(fila_gamificacao.pontos_pendentes(self.perfil), 25)
+        mensagens = [str(m) for m in response.context["messages"]]
+        self.assertIn("🎉 Parabéns! Você subiu para o nível 2!", mensagens)
+
+    def test_comentario_grava_pendencias_do_usuario(self):
+        url = reverse("jornal_app:artigo", args=[self.noticias[0].pk])
+        self.client.get(url)
+        self.client.post(url, {"texto": "Boa matéria"})
+
+        self.perfil.refresh_from_db()
+        self.assertEqual(self.perfil.pontos, 5 + 15 + 10)
+        self.assertEqual(self.perfil.comentarios_feitos, 1)
+
+
+class PontosAtomicosTests(TransactionTestCase):
+    THREADS = 8
+    CHAMADAS_POR_THREAD = 25
+
+    # Prazo (segundos) para as threads terminarem: se o banco ficar preso,
+    # o teste falha em vez de travar a suíte.
+    PRAZO = 30
+
+    def setUp(self):
+        # Uma descarga da fila agendada por outro teste disputaria o banco.
+        fila_gamificacao.descartar()
+        self.addCleanup(fila_gamificacao.descartar)
+        leituras_recentes.limpar()
+        self.usuario = User.objects.create_user(username="leitor", password="123456")
+        self.perfil, _ = UserProfile.objects.get_or_create(usuario=self.usuario)
+        self.prazo = time.monotonic() + self.PRAZO
+
+    def test_incremento_retorna_valores_gravados(self):
+        categoria = Categoria.objects.create(nome="Geral")
+        noticia = Noticia.objects.create(titulo="Chuva em Recife", conteudo="...", categoria=categoria)
+        UserProfile.objects.filter(pk=self.perfil.pk).update(pontos=95)
+        self.assertTrue(self.perfil.marcar_noticia_lida(noticia.pk))
+        self.assertEqual((self.perfil.pontos, self.perfil.nivel, self.perfil.noticias_lidas), (100, 2, 1))
+
+        novos = self.perfil.incrementar(10, comentarios_feitos=1)
+        self.assertEqual(novos, {"pontos": 110, "nivel": 2, "comentarios_feitos": 1})
+
+    def test_incremento_so_grava_campos_alterados(self):
+        with CaptureQueriesContext(connection) as consultas:
+            self.perfil.marcar_comentario_feito()
+        [update] = [q["sql"] for q in consultas.captured_queries if q["sql"].startswith('UPDATE "jornal_app_userprofile"')]
+        self.assertIn("comentarios_feitos", update)
+        self.assertNotIn("noticias_lidas", update)
+        self.assertNotIn("total_categorias_visitadas", update)
+
+    def repetir_se_travado(self, funcao, *args):
+        # O banco de teste em memória do SQLite recusa escritas e leituras
+        # concorrentes ("table is locked") em vez de esperar a vez.
+        while True:
+            try:
+                return funcao(*args)
+            except OperationalError as erro:
+                if "locked" not in str(erro) or time.monotonic() > self.prazo:
+                    raise
+                time.sleep(0.001)
+
+    def test_threads_simultaneas_nao_perdem_pontos(self):
+        erros = []
+
+        def comentar():
+            # Cada thread usa a própria instância (e conexão), como em
+            # requisições diferentes do mesmo usuário.
+            try:
+                perfil = self.repetir_se_travado(
+                    lambda: UserProfile.objects.select_related("usuario").get(pk=self.perfil.pk)
+                )
+                for _ in range(self.CHAMADAS_POR_THREAD):
+                    self.repetir_se_travado(perfil.marcar_comentario_feito)
+            except Exception as erro:
+                erros.append(erro)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=comentar, daemon=True) for _ in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            # Um segundo a mais que o prazo das novas tentativas.
+            thread.join(max(0, self.prazo + 1 - time.monotonic()))
+        self.assertFalse([thread for thread in threads if thread.is_alive()], "threads não terminaram no prazo")
+
+        self.assertEqual(erros, [])
+        total = self.THREADS * self.CHAMADAS_POR_THREAD
+        self.perfil.refresh_from_db()
+        self.assertEqual(self.perfil.comentarios_feitos, total)
+        self.assertEqual(self.perfil.pontos, total * 10)
+        self.assertEqual(self.perfil.nivel, total * 10 // 100 + 1)
+
+
+class LoginPerfilTests(TestCase):
+
+    def setUp(self):
+        self.usuario = User.objects.create_user(username="leitor", password="123456")
+
+    def test_usuario_novo_ganha_perfil(self):
+        self.assertTrue(UserProfile.objects.filter(usuario=self.usuario).exists())
+
+    def test_login_nao_grava_perfil(self):
+        UserProfile.objects.filter(usuario=self.usuario).update(pontos=40)
+        atividade = UserProfile.objects.get(usuario=self.usuario).ultima_atividade
+
+        with CaptureQueriesContext(connection) as consultas:
+            self.assertTrue(self.client.login(username="leitor", password="123456"))
+        # Fora a sessão (que depende do backend de sessão), o login só lê o
+        # usuário e grava last_login; antes o sinal de User somava um SELECT
+        # e um UPDATE do perfil.
+        consultas_login = [
+            q["sql"] for q in consultas.captured_queries
+            if "django_session" not in q["sql"] and "SAVEPOINT" not in q["sql"]
+        ]
+        self.assertEqual(len(consultas_login), 2)
+        self.assertTrue(consultas_login[0].startswith('SELECT "auth_user"'))
+        self.assertTrue(consultas_login[1].startswith('UPDATE "auth_user" SET "last_login"'))
+        self.assertFalse([q for q in consultas.captured_queries if "jornal_app_userprofile" in q["sql"]])
+
+        perfil = UserProfile.objects.get(usuario=self.usuario)
+        self.assertEqual((perfil.pontos, perfil.ultima_atividade), (40, atividade))
+
+
+class CategoriasVisitadasTests(TestCase):
+
+    def setUp(self):
+        self.categorias = [Categoria.objects.create(nome=nome) for nome in ("Economia", "Política", "Cultura")]
+        self.usuario = User.objects.create_user(username="leitor", password="123456")
+        self.perfil = UserProfile.objects.get(usuario=self.usuario)
+
+    def test_categoria_so_pontua_na_primeira_visita(self):
+        categoria = self.categorias[0]
+        # instância carregada por outra requisição antes da visita ser gravada
+        outra_requisicao = UserProfile.objects.get(pk=self.perfil.pk)
+        self.assertEqual(outra_requisicao.ids_categorias_visitadas, set())
+
+        self.perfil.marcar_categoria_visitada(categoria.pk)
+        self.assertFalse(self.perfil.marcar_categoria_visitada(categoria.pk))
+        self.assertFalse(outra_requisicao.marcar_categoria_visitada(categoria.pk))
+
+        self.perfil.refresh_from_db()
+        self.assertEqual((self.perfil.pontos, self.perfil.total_categorias_visitadas), (15, 1))
+        self.assertEqual(list(self.perfil.categorias_visitadas.all()), [categoria])
+
+    def test_pertinencia_sem_consultas_depois_de_carregada(self):
+        self.perfil.marcar_categoria_visitada(self.categorias[0].pk)
+        with self.assertNumQueries(0):
+            self.assertIn(self.categorias[0].pk, self.perfil.ids_categorias_visitadas)
+            self.assertNotIn(self.categorias[1].pk, self.perfil.ids_categorias_visitadas)
+
+    def test_badges_consultaveis_em_lote(self):
+        outro = UserProfile.objects.get(usuario=User.objects.create_user(username="outro", password="123456"))
+        for categoria in self.categorias:
+            self.perfil.marcar_categoria_visitada(categoria.pk)
+        outro.marcar_categoria_visitada(self.categorias[0].pk)
+
+        self.assertEqual(list(UserProfile.objects.exploradores()), [self.perfil])
+        self.assertEqual(list(UserProfile.objects.navegadores_completos()), [self.perfil])
+        self.assertIn("🧭  Explorador", self.perfil.get_badges())
+
+    def test_remover_categoria_desconta_total(self):
+        for categoria in self.categorias[:2]:
+            self.perfil.marcar_categoria_visitada(categoria.pk)
+        self.categorias[0].delete()
+
+        self.perfil.refresh_from_db()
+        self.assertEqual(self.perfil.total_categorias_visitadas, 1)
+
+
+class ConquistasTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        leituras_recentes.limpar()
+        self.categorias = [Categoria.objects.create(nome=nome) for nome in ("Economia", "Política", "Cultura")]
+        self.noticias = [
+            Noticia.objects.create(titulo=f"Notícia {i}", conteudo="...", categoria=self.categorias[0])
+            for i in range(2)
+        ]
+        self.usuario = User.objects.create_user(username="leitor", password="123456")
+        self.perfil = UserProfile.objects.get(usuario=self.usuario)
+
+    def test_badge_gravado_ao_passar_do_minimo(self):
+        UserProfile.objects.filter(pk=self.perfil.pk).update(noticias_lidas=8)
+        self.perfil.marcar_noticia_lida(self.noticias[0].pk)
+        self.assertEqual(self.perfil.get_badges(), [])
+
+        self.perfil.marcar_noticia_lida(self.noticias[1].pk)
+        self.assertEqual(self.perfil.get_badges(), ["📚  Leitor Iniciante"])
+        self.assertEqual(list(UserProfile.objects.com_badge("leitor_iniciante")), [self.perfil])
+
+    def test_so_avalia_regras_do_contador_alterado(self):
+        # o nível já era 5 antes do comentário: só os contadores alterados
+        # são avaliados e a regra de nível não dispara sem mudar de nível
+        UserProfile.objects.filter(pk=self.perfil.pk).update(pontos=400, nivel=5)
+        with patch("jornal_app.models.regras_alcancadas", wraps=conquistas.regras_alcancadas) as avaliar:
+            self.perfil.marcar_comentario_feito()
+        self.assertEqual(sorted(avaliar.call_args.args[1]), ["comentarios_feitos", "nivel"])
+        self.assertEqual(self.perfil.get_badges(), [])
+
+        UserProfile.objects.filter(pk=self.perfil.pk).update(pontos=395, nivel=4)
+        self.assertTrue(self.perfil.marcar_noticia_lida(self.noticias[0].pk))
+        self.assertEqual(self.perfil.get_badges(), ["⭐  Estrela em Ascensão"])
+
+    def test_navegador_completo_usa_total_de_categorias(self):
+        for categoria in self.categorias:
+            self.perfil.marcar_categoria_visitada(categoria.pk)
+        self.assertEqual(self.perfil.get_badges(), ["🧭  Explorador", "🌎  Navegador Completo"])
+
+    def test_perfil_renderiza_do_estado_gravado(self):
+        for categoria in self.categorias[:2]:
+            self.perfil.marcar_categoria_visitada(categoria.pk)
+        self.client.force_login(self.usuario)
+        url_perfil = reverse("jornal_app:profile")
+        self.client.get(url_perfil)
+
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(url_perfil)
+        self.assertContains(response, "2/3")
+        self.assertFalse([q for q in consultas.captured_queries if "COUNT(" in q["sql"]])
+        # sessão, usuário, perfil e badges gravados
+        self.assertEqual(len(consultas), 4)
+
+
+class RankingTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        ranking.rankings.limpar()
+        leituras_recentes.limpar()
+        self.addCleanup(ranking.rankings.limpar)
+        self.economia = Categoria.objects.create(nome="Economia")
+        self.cultura = Categoria.objects.create(nome="Cultura")
+        self.noticias = [
+            Noticia.objects.create(titulo=f"Economia {i}", conteudo="...", categoria=self.economia)
+            for i in range(2)
+        ]
+        self.perfis = {
+            nome: UserProfile.objects.get(usuario=User.objects.create_user(username=nome, password="123456"))
+            for nome in ("ana", "bia", "caio")
+        }
+
+    def test_quadro_em_memoria(self):
+        quadro = ranking.Quadro()
+        quadro.carregar([(1, 30), (2, 50), (3, 30), (4, 0)])
+        self.assertEqual(quadro.primeiros(2), [(1, 2, 50), (2, 1, 30)])
+        self.assertEqual([quadro.posicao(u) for u in (1, 2, 3, 4)], [2, 1, 2, None])
+
+        quadro.somar(3, 25)
+        self.assertEqual(quadro.posicao(3), 1)
+        self.assertEqual(quadro.posicao(2), 2)
+        self.assertEqual(quadro.posicao(1), 3)
+        self.assertEqual(len(quadro), 3)
+
+    def test_marcar_alimenta_quadros(self):
+        ana, bia, caio = self.perfis["ana"], self.perfis["bia"], self.perfis["caio"]
+        geral = ranking.rankings.quadro(ranking.QUADRO_GERAL)
+
+        ana.marcar_noticia_lida(self.noticias[0].pk, self.economia.pk)
+        bia.marcar_categoria_visitada(self.cultura.pk)
+        caio.marcar_comentario_feito(self.economia.pk)
+        caio.marcar_noticia_lida(self.noticias[1].pk, self.economia.pk)
+
+        self.assertEqual(geral.primeiros(3), [(1, bia.usuario_id, 15), (1, caio.usuario_id, 15), (3, ana.usuario_id, 5)])
+        self.assertEqual(geral.posicao(ana.usuario_id), 3)
+
+        economia = ranking.rankings.quadro(ranking.quadro_categoria(self.economia.pk))
+        self.assertEqual(economia.primeiros(5), [(1, caio.usuario_id, 15), (2, ana.usuario_id, 5)])
+        self.assertIsNone(economia.posicao(bia.usuario_id))
+
+        # recarregado do banco, o quadro fica igual ao mantido em memória
+        ranking.rankings.limpar()
+        self.assertEqual(ranking.rankings.quadro(ranking.quadro_semanal()).primeiros(3), geral.primeiros(3))
+        self.assertEqual(ranking.rankings.quadro(ranking.quadro_categoria(self.economia.pk)).primeiros(5), economia.primeiros(5))
+
+    def test_semana_nova_comeca_zerada(self):
+        self.perfis["ana"].marcar_noticia_lida(self.noticias[0].pk, self.economia.pk)
+        semana_que_vem = timezone.localdate() + timedelta(days=7)
+        self.assertEqual(len(ranking.rankings.quadro(ranking.quadro_semanal(semana_que_vem))), 0)
+
+    @override_settings(GAMIFICACAO_FLUSH_INTERVALO=0)
+    def test_pagina_de_ranking(self):
+        noticia = self.noticias[0]
+        self.client.force_login(self.perfis["bia"].usuario)
+        self.client.get(reverse("jornal_app:artigo", args=[noticia.pk]))
+        self.perfis["ana"].marcar_noticia_lida(noticia.pk, self.economia.pk)
+
+        response = self.client.get(reverse("jornal_app:ranking"), {"categoria": self.economia.pk})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["ranking_categoria"]["posicao"], 1)
+        self.assertEqual([linha["usuario"].username for linha in response.context["ranking_geral"]["primeiros"]], ["bia", "ana"])
+        self.assertContains(response, "Sua posição: 1º de 2 (20 pontos)")
+
+
+class PlacarCabecalhoTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.categoria = Categoria.objects.create(nome="Economia")
+        self.usuario = User.objects.create_user(username="leitor", password="123456")
+        self.perfil = UserProfile.objects.get(usuario=self.usuario)
+        self.client.force_login(self.usuario)
+        self.url_home = reverse("jornal_app:home")
+
+    def consultas_ao_perfil(self, url):
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(url)
+        return response, [q["sql"] for q in consultas.captured_queries if "jornal_app_userprofile" in q["sql"]]
+
+    def test_cabecalho_sem_consulta_ao_perfil(self):
+        UserProfile.objects.filter(pk=self.perfil.pk).update(pontos=120, nivel=2)
+        response, consultas = self.consultas_ao_perfil(self.url_home)
+        self.assertEqual(len(consultas), 1)
+        self.assertContains(response, 'title="Nível 2">⭐ 120<')
+
+        response, consultas = self.consultas_ao_perfil(self.url_home)
+        self.assertEqual(consultas, [])
+        self.assertContains(response, "⭐ 120<")
+
+    def test_adicionar_pontos_atualiza_placar(self):
+        self.client.get(self.url_home)
+        self.perfil.marcar_comentario_feito(self.categoria.pk)
+
+        # dentro da transação do teste o placar só volta a ser lido do perfil
+        response, consultas = self.consultas_ao_perfil(self.url_home)
+        self.assertContains(response, "⭐ 10<")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.perfil.marcar_comentario_feito(self.categoria.pk)
+        response, consultas = self.consultas_ao_perfil(self.url_home)
+        self.assertEqual(consultas, [])
+        self.assertContains(response, "⭐ 20<")
+
+
+@override_settings(GAMIFICACAO_FLUSH_INTERVALO=3600, GAMIFICACAO_FLUSH_LIMITE=1000)
+class LeiturasUnicasTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        leituras_recentes.limpar()
+        fila_gamificacao.descartar()
+        self.addCleanup(fila_gamificacao.descartar)
+        self.categoria = Categoria.objects.create(nome="Economia")
+        self.noticia = Noticia.objects.create(titulo="Dólar cai", conteudo="...", categoria=self.categoria)
+        self.usuario = User.objects.create_user(username="leitor", password="123456")
+        self.perfil = UserProfile.objects.get(usuario=self.usuario)
+
+    def test_so_a_primeira_leitura_pontua(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.perfil.marcar_noticia_lida(self.noticia.pk)
+        with self.assertNumQueries(0):
+            self.assertFalse(self.perfil.marcar_noticia_lida(self.noticia.pk))
+
+        self.perfil.refresh_from_db()
+        self.assertEqual((self.perfil.pontos, self.perfil.noticias_lidas), (5, 1))
+        self.assertEqual(LeituraNoticia.objects.filter(perfil=self.perfil).count(), 1)
+
+    def test_leitura_gravada_em_outro_processo(self):
+        LeituraNoticia.objects.create(perfil=self.perfil, noticia=self.noticia)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertTrue(self.perfil.ja_leu(self.noticia.pk))
+        with self.assertNumQueries(0):
+            self.assertTrue(self.perfil.ja_leu(self.noticia.pk))
+        self.assertEqual(self.perfil.gravar_leituras([self.noticia.pk]), [])
+
+    def test_leitura_desfeita_nao_fica_no_lru(self):
+        evento = EventoAtividade.objects.create(
+            perfil=self.perfil, tipo=EventoAtividade.LEITURA, objeto_id=self.noticia.pk, categoria_id=self.categoria.pk
+        )
+        with patch.object(UserProfile, "adicionar_pontos", side_effect=RuntimeError), self.assertLogs("jornal_app.atividades"):
+            atividades.agregar_eventos()
+        self.assertFalse(leituras_recentes.contem(self.perfil.pk, self.noticia.pk))
+
+        atividades.agregar_eventos()
+        evento.refresh_from_db()
+        self.perfil.refresh_from_db()
+        self.assertIsNotNone(evento.lote)
+        self.assertEqual((self.perfil.pontos, self.perfil.noticias_lidas), (5, 1))
+
+    def test_recarregar_artigo_nao_enfileira_de_novo(self):
+        self.client.force_login(self.usuario)
+        url = reverse("jornal_app:artigo", args=[self.noticia.pk])
+        for _ in range(3):
+            self.client.get(url)
+        self.assertEqual(fila_gamificacao.pontos_pendentes(self.perfil), 5 + 15)
+
+        fila_gamificacao.descarregar()
+        self.client.get(url)
+        self.assertEqual(fila_gamificacao.descarregar(), 0)
+        self.perfil.refresh_from_db()
+        self.assertEqual((self.perfil.pontos, self.perfil.noticias_lidas), (20, 1))
+
+    def test_lru_descarta_as_mais_antigas(self):
+        recentes = LeiturasRecentes(capacidade=2)
+        recentes.adicionar(1, 10)
+        recentes.adicionar(1, 11)
+        recentes.contem(1, 10)
+        recentes.adicionar(1, 12)
+        self.assertEqual([recentes.contem(1, n) for n in (10, 11, 12)], [True, False, True])
+
+
+class AtividadesTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        leituras_recentes.limpar()
+        ranking.rankings.limpar()
+        fila_gamificacao.descartar()
+        self.addCleanup(fila_gamificacao.descartar)
+        self.categoria = Categoria.objects.create(nome="Economia")
+        self.noticias = [
+            Noticia.objects.create(titulo=f"Notícia {i}", conteudo="...", categoria=self.categoria) for i in range(3)
+        ]
+        self.usuario = User.objects.create_user(username="leitor", password="123456")
+        self.perfil = UserProfile.objects.get(usuario=self.usuario)
+
+    def evento_pendente(self, noticia, quando=None):
+        return EventoAtividade.objects.create(
+            perfil=self.perfil, tipo=EventoAtividade.LEITURA, objeto_id=noticia.pk,
+            categoria_id=noticia.categoria_id, criado_em=quando or timezone.now(),
+        )
+
+    @override_settings(GAMIFICACAO_FLUSH_INTERVALO=3600, GAMIFICACAO_FLUSH_LIMITE=1000)
+    def test_descarga_acrescenta_eventos_num_unico_insert(self):
+        for noticia in self.noticias:
+            fila_gamificacao.registrar_leitura(self.perfil, noticia.pk, self.categoria.pk)
+
+        with CaptureQueriesContext(connection) as consultas:
+            fila_gamificacao.descarregar()
+        inserts = [c for c in consultas.captured_queries if c['sql'].startswith('INSERT INTO "jornal_app_eventoatividade"')]
+        self.assertEqual(len(inserts), 1)
+
+        eventos = EventoAtividade.objects.filter(perfil=self.perfil)
+        self.assertEqual(eventos.filter(tipo=EventoAtividade.LEITURA).count(), 3)
+        self.assertEqual(eventos.filter(tipo=EventoAtividade.CATEGORIA).count(), 1)
+        self.assertFalse(eventos.filter(lote__isnull=True).exists())
+
+        self.perfil.refresh_from_db()
+        self.assertEqual((self.perfil.pontos, self.perfil.noticias_lidas, self.perfil.total_categorias_visitadas), (30, 3, 1))
+        resumo = ResumoDiario.objects.get(perfil=self.perfil)
+        self.assertEqual((resumo.dia, resumo.leituras, resumo.categorias_novas, resumo.pontos), (timezone.localdate(), 3, 1, 30))
+
+    def test_comando_agrega_eventos_pendentes_uma_vez(self):
+        ontem = timezone.now() - timedelta(days=1)
+        self.evento_pendente(self.noticias[0], ontem)
+        self.evento_pendente(self.noticias[1])
+        # Leitura repetida fica no histórico, mas não pontua.
+        self.evento_pendente(self.noticias[1])
+
+        call_command('agregar_atividades', stdout=io.StringIO())
+        call_command('agregar_atividades', stdout=io.StringIO())
+
+        self.perfil.refresh_from_db()
+        self.assertEqual((self.perfil.pontos, self.perfil.noticias_lidas), (10, 2))
+        self.assertEqual(
+            list(ResumoDiario.objects.filter(perfil=self.perfil).order_by('dia').values_list('dia', 'leituras')),
+            [(timezone.localdate(ontem), 1), (timezone.localdate(), 1)],
+        )
+
+    def test_agregacao_em_lotes(self):
+        for noticia in self.noticias:
+            self.evento_pendente(noticia)
+        resultado = atividades.agregar_eventos(tamanho_lote=2)
+
+        self.assertEqual(resultado, {self.usuario.pk: False})
+        self.assertEqual(EventoAtividade.objects.values('lote').distinct().count(), 2)
+        self.perfil.refresh_from_db()
+        self.assertEqual(self.perfil.noticias_lidas, 3)
+
+    def test_falha_devolve_eventos_a_fila(self):
+        self.evento_pendente(self.noticias[0])
+        with patch.object(UserProfile, 'aplicar_eventos', side_effect=RuntimeError), self.assertLogs('jornal_app.atividades'):
+            self.assertEqual(atividades.agregar_eventos(), {})
+        self.assertTrue(EventoAtividade.objects.filter(lote__isnull=True).exists())
+
+        atividades.agregar_eventos()
+        self.perfil.refresh_from_db()
+        self.assertEqual(self.perfil.noticias_lidas, 1)
+
+    def test_evento_de_noticia_apagada_nao_derruba_o_lote(self):
+        outro = UserProfile.objects.get(usuario=User.objects.create_user(username="outro", password="123456"))
+        apagada = self.evento_pendente(self.noticias[0])
+        EventoAtividade.objects.create(
+            perfil=outro, tipo=EventoAtividade.LEITURA, objeto_id=self.noticias[1].pk, categoria_id=self.categoria.pk
+        )
+        self.noticias[0].delete()
+
+        atividades.agregar_eventos()
+        connection.check_constraints()
+
+        outro.refresh_from_db()
+        self.perfil.refresh_from_db()
+        apagada.refresh_from_db()
+        self.assertEqual((outro.noticias_lidas, self.perfil.noticias_lidas), (1, 0))
+        self.assertIsNotNone(apagada.lote)
+
+    def test_comentario_e_aplicado_na_hora(self):
+        self.perfil.marcar_comentario_feito(self.categoria.pk, self.noticias[0].pk)
+
+        evento = EventoAtividade.objects.get(perfil=self.perfil)
+        self.assertEqual((evento.tipo, evento.objeto_id, evento.lote), (EventoAtividade.COMENTARIO, self.noticias[0].pk, EventoAtividade.APLICADO))
+        self.assertEqual(ResumoDiario.objects.get(perfil=self.perfil).comentarios, 1)
+        self.assertEqual(atividades.agregar_eventos(), {})
+        self.perfil.refresh_from_db()
+        self.assertEqual((self.perfil.pontos, self.perfil.comentarios_feitos), (10, 1))
+
+
+class NewsDataFalso(BaseHTTPRequestHandler):
+    """Imita a API do NewsData: responde devagar e registra quantas requisições abertas houve."""
+
+    ATRASO = 0.4
+    FALHAS = {'sports'}
+    lock = threading.Lock()
+    abertas = 0
+    maximo_abertas = 0
+
+    def do_GET(self):
+        categoria = parse_qs(urlsplit(self.path).query)['category'][0]
+        cls = type(self)
+        with cls.lock:
+            cls.abertas += 1
+            cls.maximo_abertas = max(cls.maximo_abertas, cls.abertas)
+        try:
+            time.sleep(self.ATRASO)
+            if categoria in self.FALHAS:
+                self.send_response(500)
+                self.end_headers()
+                return
+            corpo = json.dumps({'results': [
+                {'title': f'{categoria} {i}', 'link': f'https://exemplo.com/{categoria}/{i}', 'description': 'Texto'}
+                for i in range(2)
+            ]}).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+        finally:
+            with cls.lock:
+                cls.abertas -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+class ImportacaoNoticiasTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.servidor = ThreadingHTTPServer(('127.0.0.1', 0), NewsDataFalso)
+        threading.Thread(target=cls.servidor.serve_forever, daemon=True).start()
+        cls.url = f'http://127.0.0.1:{cls.servidor.server_port}/api/1/news'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.servidor.shutdown()
+        cls.servidor.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        NewsDataFalso.maximo_abertas = 0
+        configuracao = override_settings(
+            NEWSDATA_URL=self.url, NEWSDATA_API_KEY='teste', NEWSDATA_TENTATIVAS=2, NEWSDATA_BACKOFF_BASE=0.01,
+            NEWSDATA_REQUISICOES_POR_MINUTO=None, IMPORTACAO_POR_HOST=2,
+        )
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+        self.categorias = [
+            Categoria.objects.create(nome=nome) for nome in ('Política', 'Economia', 'Tecnologia', 'Saúde')
+        ]
+
+    def test_buscas_em_paralelo_respeitam_limite_por_host(self):
+        inicio = time.monotonic()
+        resultados = importacao.importar_categorias(self.categorias, threads=4)
+        decorrido = time.monotonic() - inicio
+
+        self.assertEqual([r.categoria for r in resultados], self.categorias)
+        self.assertEqual([r.importadas for r in resultados], [2, 2, 2, 2])
+        self.assertEqual(NewsDataFalso.maximo_abertas, 2)
+        # Em sequência seriam 4 x ATRASO; com 2 por host, cerca de 2 x ATRASO.
+        self.assertLess(decorrido, 3 * NewsDataFalso.ATRASO)
+        self.assertEqual(Noticia.objects.count(), 8)
+
+    def test_falha_de_uma_categoria_nao_interrompe_as_outras(self):
+        esportes = Categoria.objects.create(nome='Esportes')
+        with self.assertLogs('jornal_app.importacao', 'WARNING'):
+            resultados = importacao.importar_categorias([esportes, self.categorias[0]])
+
+        self.assertIn('500', resultados[0].erro)
+        self.assertEqual((resultados[0].importadas, resultados[1].importadas), (0, 2))
+        self.assertFalse(resultados[1].erro)
+
+    def test_admin_so_enfileira(self):
+        admin = User.objects.create_user(username='editor', password='123456', is_staff=True)
+        self.client.force_login(admin)
+        url = reverse('jornal_app:importar_noticias')
+
+        self.client.post(url, {'categoria': ''})
+        response = self.client.post(url, {'categoria': self.categorias[0].pk}, follow=True)
+
+        self.assertEqual(NewsDataFalso.maximo_abertas, 0)
+        self.assertFalse(Noticia.objects.exists())
+        self.assertEqual(TarefaImportacao.objects.filter(status=TarefaImportacao.PENDENTE).count(), 4)
+        mensagens = [str(m) for m in response.context['messages']]
+        self.assertIn('⏳ Política já tem uma importação na fila.', mensagens)
+        self.assertEqual(response.context['tarefas_ativas'], 4)
+
+    def test_comando_executa_a_fila(self):
+        esportes = Categoria.objects.create(nome='Esportes')
+        importacao.enfileirar_importacao([esportes, self.categorias[0]])
+        saida = io.StringIO()
+
+        with self.assertLogs('jornal_app.importacao', 'WARNING'):
+            call_command('importar_noticias', stdout=saida)
+
+        tarefas = {t.categoria.nome: t for t in TarefaImportacao.objects.select_related('categoria')}
+        self.assertEqual(len(tarefas), 5)
+        self.assertEqual(tarefas['Esportes'].status, TarefaImportacao.FALHOU)
+        self.assertIn('500', tarefas['Esportes'].erro)
+        self.assertEqual((tarefas['Política'].status, tarefas['Política'].recebidas, tarefas['Política'].importadas),
+                         (TarefaImportacao.CONCLUIDA, 2, 2))
+        self.assertEqual(Noticia.objects.count(), 8)
+        self.assertIn('❌ Esportes', saida.getvalue())
+
+    def test_comando_executa_so_as_pendentes(self):
+        importacao.enfileirar_importacao([self.categorias[0]])
+
+        call_command('importar_noticias', '--pendentes', stdout=io.StringIO())
+
+        tarefa = TarefaImportacao.objects.select_related('categoria').get()
+        self.assertEqual((tarefa.categoria, tarefa.status), (self.categorias[0], TarefaImportacao.CONCLUIDA))
+        self.assertEqual(Noticia.objects.count(), 2)
+
+    def test_uma_importacao_ativa_por_categoria(self):
+        politica = self.categorias[0]
+        self.assertEqual(importacao.enfileirar_importacao([politica]), ([politica], []))
+        self.assertEqual(importacao.enfileirar_importacao([politica]), ([], [politica]))
+
+        tarefa = TarefaImportacao.objects.get()
+        TarefaImportacao.objects.filter(pk=tarefa.pk).update(
+            status=TarefaImportacao.EXECUTANDO, iniciada_em=timezone.now() - timedelta(hours=1)
+        )
+        self.assertEqual(importacao.enfileirar_importacao([politica]), ([], [politica]))
+
+        # Worker que morreu no meio: a tarefa vira falha e a categoria é liberada.
+        self.assertEqual(importacao.liberar_tarefas_travadas(), 1)
+        self.assertEqual(importacao.enfileirar_importacao([politica]), ([politica], []))
+
+
+class NewsDataInstavel(BaseHTTPRequestHandler):
+    """Responde na ordem os status de ``respostas`` (200 quando acabam), mantendo a conexão aberta."""
+
+    protocol_version = 'HTTP/1.1'
+    respostas = []
+    portas = []
+
+    def do_GET(self):
+        type(self).portas.append(self.client_address[1])
+        status = type(self).respostas.pop(0) if type(self).respostas else 200
+        corpo = json.dumps({'results': [{'title': 'Ok'}]} if status == 200 else {}).encode()
+        self.send_response(status)
+        if status == 429:
+            self.send_header('Retry-After', '0')
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+class ClienteNewsDataTests(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.servidor = ThreadingHTTPServer(('127.0.0.1', 0), NewsDataInstavel)
+        threading.Thread(target=cls.servidor.serve_forever, daemon=True).start()
+        cls.url = f'http://127.0.0.1:{cls.servidor.server_port}/api/1/news'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.servidor.shutdown()
+        cls.servidor.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        NewsDataInstavel.respostas = []
+        NewsDataInstavel.portas = []
+        self.cliente = newsdata.ClienteNewsData('teste', url=self.url, tentativas=3, backoff_base=0.01)
+        self.addCleanup(self.cliente.fechar)
+
+    def test_repete_em_429_e_5xx(self):
+        NewsDataInstavel.respostas = [429, 503]
+        self.assertEqual(self.cliente.buscar_noticias(category='sports'), [{'title': 'Ok'}])
+
+        metricas = self.cliente.metricas.resumo()
+        self.assertEqual((metricas['requisicoes'], metricas['falhas'], metricas['novas_tentativas']), (3, 2, 2))
+        self.assertGreater(metricas['tempo_maximo'], 0)
+
+    def test_desiste_depois_das_tentativas(self):
+        NewsDataInstavel.respostas = [500, 500, 500, 500]
+        with self.assertRaisesMessage(newsdata.ErroNewsData, 'API respondeu 500'):
+            self.cliente.buscar_noticias()
+        self.assertEqual(NewsDataInstavel.respostas, [500])
+
+    def test_erro_que_nao_adianta_repetir(self):
+        NewsDataInstavel.respostas = [401]
+        with self.assertRaisesMessage(newsdata.ErroNewsData, 'API respondeu 401'):
+            self.cliente.buscar_noticias()
+        self.assertEqual(self.cliente.metricas.novas_tentativas, 0)
+
+    def test_sessao_reaproveita_a_conexao(self):
+        for _ in range(3):
+            self.cliente.buscar_noticias()
+        self.assertEqual(len(set(NewsDataInstavel.portas)), 1)
+
+    def test_espera_exponencial_com_jitter(self):
+        cliente = newsdata.ClienteNewsData('teste', backoff_base=1, backoff_maximo=5)
+        self.addCleanup(cliente.fechar)
+        for tentativa, teto in [(0, 1), (1, 2), (2, 4), (5, 5)]:
+            self.assertTrue(all(0 <= cliente.espera(tentativa) <= teto for _ in range(50)))
+
+    def test_balde_de_fichas_segura_as_requisicoes(self):
+        relogio = [0.0]
+
+        def dormir(segundos):
+            relogio[0] += segundos
+
+        balde = newsdata.BaldeDeFichas(taxa=2, capacidade=2, relogio=lambda: relogio[0], dormir=dormir)
+        esperas = [balde.retirar() for _ in range(4)]
+        self.assertEqual(esperas, [0, 0, 0.5, 0.5])
+
+    def test_cliente_e_recriado_quando_a_configuracao_muda(self):
+        with override_settings(NEWSDATA_URL=self.url):
+            cliente = newsdata.cliente_newsdata()
+            self.assertIs(newsdata.cliente_newsdata(), cliente)
+        self.assertIsNot(newsdata.cliente_newsdata(), cliente)
+
+
+class ProcessarArtigosTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.categoria = Categoria.objects.create(nome="Economia")
+
+    def artigos(self, quantidade, inicio=0):
+        return [
+            {"title": f"Notícia {i}", "link": f"https://exemplo.com/{i}", "description": f"Texto {i}", "source_id": "teste"}
+            for i in range(inicio, inicio + quantidade)
+        ]
+
+    def consultas_para(self, artigos):
+        with CaptureQueriesContext(connection) as consultas:
+            importacao.processar_artigos_para_categoria(artigos, self.categoria)
+        return len(consultas)
+
+    def test_numero_de_consultas_nao_depende_do_tamanho_do_lote(self):
+        # Já com notícias na categoria, as duas importações leem as listas de
+        # vizinhos antigas que as novas podem alterar.
+        importacao.processar_artigos_para_categoria(self.artigos(2, inicio=1000), self.categoria)
+        poucas = self.consultas_para(self.artigos(3))
+        muitas = self.consultas_para(self.artigos(60, inicio=100))
+        self.assertEqual(poucas, muitas)
+        self.assertEqual(Noticia.objects.count(), 65)
+
+    def test_descarta_duplicadas_do_banco_e_do_proprio_lote(self):
+        importacao.processar_artigos_para_categoria(self.artigos(2), self.categoria)
+        repetidos = self.artigos(3) + self.artigos(3)
+
+        importadas = importacao.processar_artigos_para_categoria(repetidos, self.categoria)
+
+        self.assertEqual(importadas, 1)
+        self.assertEqual(Noticia.objects.filter(url_fonte="https://exemplo.com/2").count(), 1)
+        self.assertEqual(Noticia.objects.count(), 3)
+
+    def test_noticias_importadas_entram_na_busca(self):
+        importacao.processar_artigos_para_categoria(self.artigos(2), self.categoria)
+        noticia = Noticia.objects.get(url_fonte="https://exemplo.com/1")
+        self.assertEqual(noticia.texto_busca, "noticia 1 texto 1 teste")
+        response = self.client.get(reverse("jornal_app:noticia_search"), {"q": "Notícia 1"})
+        self.assertIn(noticia, response.context["noticias"])
+
+    def test_campos_nulos_e_artigo_malformado_nao_derrubam_o_lote(self):
+        artigos = self.artigos(2)
+        artigos[0].update({"image_url": None, "source_id": None, "pubDate": None})
+        artigos.append({"title": "Sem texto", "link": "https://exemplo.com/ruim", "description": 123})
+
+        with self.assertLogs("jornal_app.importacao", "ERROR"):
+            importadas = importacao.processar_artigos_para_categoria(artigos, self.categoria)
+
+        self.assertEqual(importadas, 2)
+        noticia = Noticia.objects.get(url_fonte="https://exemplo.com/0")
+        self.assertEqual((noticia.imagem_url, noticia.autor_fonte), ("", "Fonte Externa"))
+        self.assertFalse(Noticia.objects.filter(url_fonte="https://exemplo.com/ruim").exists())
+
+
+class UrlNormalizadaTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.categoria = Categoria.objects.create(nome="Economia")
+
+    def artigo(self, link):
+        return {"title": "Dólar cai", "link": link, "description": "Texto", "source_id": "teste"}
+
+    def test_normalizacao(self):
+        self.assertEqual(
+            links.normalizar_url("HTTPS://Exemplo.COM:443/Economia/Dolar?id=7&utm_source=x&fbclid=abc#topo"),
+            "https://exemplo.com/Economia/Dolar?id=7",
+        )
+        self.assertEqual(links.normalizar_url("http://exemplo.com"), "http://exemplo.com/")
+        self.assertIsNone(links.normalizar_url("  "))
+        self.assertIsNone(links.normalizar_url("http://[abc"))
+
+    def test_link_malformado_nao_derruba_a_importacao(self):
+        artigos = [self.artigo("http://[abc"), self.artigo("https://exemplo.com/dolar")]
+        self.assertEqual(importacao.processar_artigos_para_categoria(artigos, self.categoria), 1)
+        self.assertEqual(list(Noticia.objects.values_list("url_fonte", flat=True)), ["https://exemplo.com/dolar"])
+
+    def test_importacao_ignora_variacoes_do_mesmo_link(self):
+        importadas = importacao.processar_artigos_para_categoria([
+            self.artigo("https://exemplo.com/dolar?utm_source=newsdata"),
+            self.artigo("https://EXEMPLO.com/dolar#comentarios"),
+        ], self.categoria)
+        self.assertEqual(importadas, 1)
+
+        de_novo = importacao.processar_artigos_para_categoria([self.artigo("https://exemplo.com/dolar?gclid=1")], self.categoria)
+        self.assertEqual(de_novo, 0)
+        self.assertEqual(Noticia.objects.get().url_normalizada, "https://exemplo.com/dolar")
+
+    def test_corrida_com_outra_importacao_nao_duplica(self):
+        montar = importacao._montar_noticia
+
+        def montar_depois_de_outra_importacao(article, categoria, url_normalizada):
+            # Outra importação grava a mesma notícia depois da checagem de duplicadas.
+            Noticia.objects.create(titulo="Cópia", conteudo="...", categoria=categoria, url_fonte=article["link"])
+            return montar(article, categoria, url_normalizada)
+
+        with patch.object(importacao, "_montar_noticia", side_effect=montar_depois_de_outra_importacao):
+            importacao.processar_artigos_para_categoria([self.artigo("https://exemplo.com/dolar")], self.categoria)
+        self.assertEqual(Noticia.objects.get().titulo, "Cópia")
+
+    def test_formulario_recusa_link_repetido(self):
+        Noticia.objects.create(titulo="Dólar cai", conteudo="...", categoria=self.categoria, url_fonte="https://exemplo.com/dolar")
+        repetida = Noticia(titulo="Dólar cai de novo", conteudo="...", categoria=self.categoria,
+                           url_fonte="https://exemplo.com/dolar?utm_medium=email")
+        with self.assertRaises(ValidationError):
+            repetida.full_clean()
+
+    def test_migracao_une_duplicadas(self):
+        migracao = importlib.import_module("jornal_app.migrations.0014_noticia_url_normalizada")
+        original = Noticia.objects.create(titulo="Dólar cai", conteudo="...", categoria=self.categoria, url_fonte="https://exemplo.com/dolar")
+        copia = Noticia.objects.create(titulo="Dólar cai", conteudo="...", categoria=self.categoria, url_fonte="https://outro.com/")
+        Noticia.objects.filter(pk=copia.pk).update(url_fonte="https://exemplo.com/dolar?utm_source=x", url_normalizada=None)
+        autor = User.objects.create_user(username="leitor", password="123456")
+        comentario = Comentario.objects.create(noticia=copia, autor=autor, texto="Oi")
+        # Link antigo malformado: fica sem url_normalizada, sem parar a migração.
+        quebrada = Noticia.objects.create(titulo="Link quebrado", conteudo="...", categoria=self.categoria)
+        Noticia.objects.filter(pk=quebrada.pk).update(url_fonte="http://[abc")
+
+        migracao.preencher_e_unificar_urls(apps, type("SchemaEditor", (), {"connection": connection})())
+
+        self.assertEqual(list(Noticia.objects.order_by("pk").values_list("pk", flat=True)), [original.pk, quebrada.pk])
+        comentario.refresh_from_db()
+        self.assertEqual(comentario.noticia_id, original.pk)
+
+
+class SugestoesBuscaTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        busca.indice_titulos.carregado = False
+        self.categoria = Categoria.objects.create(nome="Esportes")
+        self.url_sugestoes = reverse("jornal_app:noticia_sugestoes")
+        self.sport = Noticia.objects.create(
+            titulo="Sport vence o Náutico no clássico",
+            conteudo="Partida na Ilha do Retiro",
+            categoria=self.categoria,
+        )
+
+    def test_sugestoes_por_prefixo_sem_acento(self):
+        response = self.client.get(self.url_sugestoes, {"q": "nauti"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["sugestoes"], [{
+            "id": self.sport.pk,
+            "titulo": self.sport.titulo,
+            "url": reverse("jornal_app:artigo", args=[self.sport.pk]),
+        }])
+
+    def test_sugestoes_nao_consultam_banco_depois_de_carregado(self):
+        self.client.get(self.url_sugestoes, {"q": "sport"})
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url_sugestoes, {"q": "sport vence cl"})
+        self.assertEqual(len(response.json()["sugestoes"]), 1)
+
+    def test_indice_acompanha_sinais_de_noticia(self):
+        self.client.get(self.url_sugestoes, {"q": "sport"})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            nova = Noticia.objects.create(titulo="Santa Cruz anuncia técnico", conteudo="...", categoria=self.categoria)
+        self.assertEqual(busca.indice_titulos.sugerir("santa"), [(nova.pk, nova.titulo)])
+
+        self.sport.titulo = "Sport empata com o Náutico"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sport.save()
+        self.assertEqual(busca.indice_titulos.sugerir("vence"), [])
+        self.assertEqual(busca.indice_titulos.sugerir("empa"), [(self.sport.pk, self.sport.titulo)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            nova.delete()
+        self.assertEqual(busca.indice_titulos.sugerir("santa"), [])
+
+        # As próprias gravações já avançaram a geração: nada a reler do banco.
+        with self.assertNumQueries(0):
+            self.client.get(self.url_sugestoes, {"q": "sport"})
+
+    def mudanca_de_outro_processo(self, *pks):
+        ate = cache_noticias.incrementar_geracao(cache_noticias.GERACAO_TITULOS, len(pks))
+        for i, pk in enumerate(pks):
+            cache.set(busca.CHAVE_MUDANCA_TITULO.format(ate - len(pks) + 1 + i), pk)
+
+    def test_mudancas_de_outro_processo_aplicadas_sem_remontar(self):
+        nova = Noticia.objects.create(titulo="Santa Cruz anuncia técnico", conteudo="...", categoria=self.categoria)
+        self.client.get(self.url_sugestoes, {"q": "sport"})
+
+        # Gravações de outro processo não passam pelos sinais deste; chegam
+        # pelo registro de mudanças no cache compartilhado.
+        Noticia.objects.filter(pk=self.sport.pk).update(titulo="Sport empata com o Náutico")
+        Noticia.objects.filter(pk=nova.pk).delete()
+        self.mudanca_de_outro_processo(self.sport.pk, nova.pk)
+
+        with patch.object(busca.indice_titulos, "carregar") as carregar, self.assertNumQueries(1):
+            response = self.client.get(self.url_sugestoes, {"q": "sport"})
+        carregar.assert_not_called()
+        self.assertEqual([s["titulo"] for s in response.json()["sugestoes"]], ["Sport empata com o Náutico"])
+        self.assertEqual(busca.indice_titulos.sugerir("santa"), [])
+
+    def test_registro_incompleto_remonta_em_segundo_plano(self):
+        self.client.get(self.url_sugestoes, {"q": "sport"})
+        self.mudanca_de_outro_processo(self.sport.pk)
+        cache.delete(busca.CHAVE_MUDANCA_TITULO.format(busca.indice_titulos.geracao + 1))
+
+        with patch.object(busca.indice_titulos, "remontar_em_segundo_plano") as remontar:
+            busca.carregar_indice_titulos()
+        remontar.assert_called_once()
+
+    def test_remontagem_troca_o_indice_quando_termina(self):
+        indice = busca.IndicePrefixos()
+        indice.carregar([(1, "Sport vence")], geracao=1)
+        liberar = threading.Event()
+
+        def pares():
+            liberar.wait(5)
+            return [(2, "Náutico empata")]
+
+        thread = indice.remontar_em_segundo_plano(pares, 5)
+        self.assertEqual(indice.sugerir("sport"), [(1, "Sport vence")])
+        liberar.set()
+        thread.join(5)
+        self.assertEqual((indice.sugerir("sport"), indice.sugerir("nauti"), indice.geracao), ([], [(2, "Náutico empata")], 5))
+
+    def test_termo_curto_nao_gera_sugestoes(self):
+        response = self.client.get(self.url_sugestoes, {"q": "s"})
+        self.assertEqual(response.json()["sugestoes"], [])
+
+
 # =====================================================
 # TESTES E2E (End-to-End) COM SELENIUM
 # =====================================================
@@ -542,7 +2079,13 @@ class JornalProductionE2ETests(TestCase):
         options.add_experimental_option("excludeSwitches", ["enable-automation"])
         options.add_experimental_option('useAutomationExtension', False)
         
-        cls.selenium = webdriver.Chrome(options=options)
+        try:
+            cls.selenium = webdriver.Chrome(options=options)
+        except Exception:
+            # Sem o navegador o tearDownClass não roda, e a transação aberta
+            # pelo TestCase ficaria travando as tabelas para o resto da suíte.
+            super().tearDownClass()
+            raise
         cls.selenium.implicitly_wait(10)
         
         # Deixar navegador aberto por mais tempo para visualização
@@ -9,6 +9,8 @@ urlpatterns = [
     path('categorias/<int:pk>/', views.NoticiasPorCategoriaView.as_view(), name='noticias_por_categoria'),
     path('noticia/<int:pk>/', views.NoticiaDetailView.as_view(), name='artigo'),
     path('busca/', views.noticia_search, name='noticia_search'),
+    path('busca/feed/', views.noticia_search_feed, name='noticia_search_feed'),
+    path('busca/sugestoes/', views.noticia_sugestoes, name='noticia_sugestoes'),
     path('editor/categorias/', views.CategoriaListView.as_view(), name='categoria_list'),
     path('editor/categorias/nova/', views.CategoriaCreateView.as_view(), name='categoria_create'),
     path('editor/categorias/<int:pk>/excluir/', views.CategoriaDeleteView.as_view(), name='categoria_delete'),
@@ -30,6 +32,7 @@ urlpatterns = [
     path('accounts/logout/', auth_views.LogoutView.as_view(next_page='/'), name='logout'),
     path('accounts/register/', views.register, name='register'),
     path('accounts/profile/', views.profile, name='profile'),
+    path('ranking/', views.ranking, name='ranking'),
     
     # ✅ INFINITE SCROLL PARA CATEGORIAS
     path('categorias/<int:pk>/feed/', views.MaisNoticiasCategoriaView.as_view(), name='categoria_feed'),
@@ -1,21 +1,87 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from django.urls import reverse_lazy
+from django.http import JsonResponse
+from django.urls import reverse, reverse_lazy
 from django.views.generic import ListView, CreateView, DeleteView, DetailView, TemplateView
 from django.contrib import messages
 from django.db.models.deletion import ProtectedError
-from django.db.models import Q
 from django.contrib.auth.decorators import login_required
 from django.utils.decorators import method_decorator
-from .models import Categoria, Noticia, Comentario, UserProfile
+from django.views.decorators.http import condition
+from django.db.models import Count, Max, Q
+from .models import Categoria, Noticia, Comentario, TarefaImportacao, UserProfile
 from .forms import CategoriaForm, ComentarioForm
+from .busca import buscar_pagina, contar_resultados, carregar_indice_titulos, indice_titulos
+from .cache_noticias import (
+    GERACAO_CATEGORIAS, GERACAO_NOTICIAS, GERACAO_RELACIONADAS, HOME_CACHE_TIMEOUT, chave_busca,
+    invalidar_cache_categorias, invalidar_cache_noticias, obter_geracao, obter_ou_calcular,
+)
+from .importacao import enfileirar_importacao
+from .gamificacao import fila_gamificacao
+from .ranking import QUADRO_GERAL, montar_ranking, quadro_categoria, quadro_semanal
 from django.contrib.admin.views.decorators import staff_member_required
-import requests
 from django.conf import settings
-import json
-from datetime import datetime
+import hashlib
 from django.contrib.auth import login, authenticate
 from django.contrib.auth.forms import UserCreationForm
 
+# --- Validadores para GET condicional (ETag) ---
+# Só valem para visitantes anônimos sem mensagens pendentes: para usuários
+# logados a página muda com os pontos no cabeçalho e a visita conta pontos.
+# Não há Last-Modified: remover um comentário ou uma notícia não deixa
+# data para trás, então um If-Modified-Since receberia 304 com a página velha.
+
+def _resposta_personalizada(request):
+    return request.user.is_authenticated or 'messages' in request.COOKIES
+
+def _etag(*partes):
+    return hashlib.md5(':'.join(str(parte) for parte in partes).encode('utf-8')).hexdigest()
+
+def _validadores_artigo(request, pk):
+    if _resposta_personalizada(request):
+        return None
+
+    if not hasattr(request, '_validadores_artigo'):
+        request._validadores_artigo = Noticia.objects.filter(pk=pk).annotate(
+            total_comentarios=Count('comentarios', filter=Q(comentarios__ativo=True)),
+            ultimo_comentario=Max('comentarios__id'),
+        ).values_list('data_publicacao', 'atualizado_em', 'total_comentarios', 'ultimo_comentario').first()
+    return request._validadores_artigo
+
+def etag_artigo(request, pk):
+    validadores = _validadores_artigo(request, pk)
+    if validadores is None:
+        return None
+    # A barra de relacionadas muda com o recálculo dos vizinhos e com as
+    # notícias mostradas nela (ou, sem vizinhos, com as recentes da categoria).
+    return _etag(
+        'artigo', pk, *validadores, obter_geracao(GERACAO_CATEGORIAS),
+        obter_geracao(GERACAO_NOTICIAS), obter_geracao(GERACAO_RELACIONADAS),
+    )
+
+def _validadores_categoria(request, pk):
+    if _resposta_personalizada(request):
+        return None
+
+    if not hasattr(request, '_validadores_categoria'):
+        request._validadores_categoria = Categoria.objects.filter(pk=pk).annotate(
+            total=Count('noticias'),
+            ultima_publicacao=Max('noticias__data_publicacao'),
+            ultima_atualizacao=Max('noticias__atualizado_em'),
+        ).values_list('total', 'ultima_publicacao', 'ultima_atualizacao').first()
+    return request._validadores_categoria
+
+def etag_categoria(request, pk):
+    validadores = _validadores_categoria(request, pk)
+    if validadores is None:
+        return None
+    return _etag('categoria', pk, request.GET.get('page', 1), *validadores, obter_geracao(GERACAO_CATEGORIAS))
+
+def etag_feed(request):
+    # O feed geral muda a cada notícia criada, editada ou removida, que é
+    # exatamente quando a geração de notícias é incrementada.
+    return _etag('feed', request.GET.get('page', 1), obter_geracao(GERACAO_NOTICIAS))
+
+@method_decorator(condition(etag_func=etag_feed), name='get')
 class MaisNoticiasView(ListView):
     model = Noticia
     template_name = 'jornal_app/partials/noticia_feed.html'
@@ -25,31 +91,48 @@ class MaisNoticiasView(ListView):
     def get_queryset(self):
         return Noticia.objects.all().order_by('-data_publicacao')[4:]
 
+QUANTIDADE_SIMILARES = 2
+
+def noticias_similares(noticia):
+    # Vizinhos pré-calculados (jornal_app.relacionadas); enquanto a notícia
+    # não tiver vizinhos, mostra as mais recentes da mesma categoria.
+    similares = list(
+        Noticia.objects.filter(citada_como_relacionada__noticia=noticia)
+        .order_by('-citada_como_relacionada__similaridade')[:QUANTIDADE_SIMILARES]
+    )
+    if not similares:
+        similares = list(
+            Noticia.objects.filter(categoria_id=noticia.categoria_id)
+            .exclude(pk=noticia.pk)
+            .order_by('-data_publicacao')[:QUANTIDADE_SIMILARES]
+        )
+    return similares
+
+@method_decorator(condition(etag_func=etag_artigo), name='get')
 class NoticiaDetailView(DetailView):
     model = Noticia
     template_name = 'jornal_app/artigo.html'
     context_object_name = 'noticia'
 
-    def dispatch(self, request, *args, **kwargs):
-        return super().dispatch(request, *args, **kwargs)
+    def get_queryset(self):
+        return Noticia.objects.select_related('categoria')
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        noticia = self.get_object()
+        noticia = self.object
         
-        if self.request.user.is_authenticated:
+        if self.request.user.is_authenticated and self.request.method == 'GET':
             user_profile = self.request.user.userprofile
-            level_up = user_profile.marcar_noticia_lida(noticia.pk)
-            user_profile.marcar_categoria_visitada(noticia.categoria.pk)
+            level_up, nivel = fila_gamificacao.registrar_leitura(user_profile, noticia.pk, noticia.categoria_id)
             
             if level_up:
-                messages.success(self.request, f'🎉 Parabéns! Você subiu para o nível {user_profile.nivel}!')
+                messages.success(self.request, f'🎉 Parabéns! Você subiu para o nível {nivel}!')
         
-        context['comentarios'] = noticia.comentarios.filter(ativo=True)
+        comentarios = list(noticia.comentarios.filter(ativo=True).select_related('autor'))
+        context['comentarios'] = comentarios
+        context['total_comentarios'] = len(comentarios)
         context['comentario_form'] = ComentarioForm()
-        context['noticias_similares'] = Noticia.objects.filter(
-            categoria=noticia.categoria  
-        ).exclude(pk=noticia.pk).order_by('?')[:2]
+        context['noticias_similares'] = noticias_similares(noticia)
         
         return context
     
@@ -58,7 +141,7 @@ class NoticiaDetailView(DetailView):
             messages.error(request, 'Você precisa estar logado para comentar.')
             return redirect('login')
             
-        noticia = self.get_object()
+        noticia = self.object = self.get_object()
         comentario_form = ComentarioForm(request.POST)
         
         if comentario_form.is_valid():
@@ -67,8 +150,11 @@ class NoticiaDetailView(DetailView):
             novo_comentario.autor = request.user
             novo_comentario.save()
             
-            user_profile = request.user.userprofile
-            level_up = user_profile.marcar_comentario_feito()
+            # Grava antes as visitas pendentes deste usuário, para o nível
+            # calculado aqui já considerar esses pontos.
+            fila_gamificacao.descarregar(request.user.pk)
+            user_profile = UserProfile.objects.get(usuario=request.user)
+            level_up = user_profile.marcar_comentario_feito(noticia.categoria_id, noticia.pk)
             
             messages.success(request, 'Comentário adicionado com sucesso! +10 pontos!')
             
@@ -86,10 +172,15 @@ class HomeView(TemplateView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        # Os querysets são preguiçosos: se os blocos estiverem no cache do
+        # template ({% cache %} em home.html), nenhuma consulta é feita.
         context['destaques'] = Noticia.objects.filter(destaque=True).order_by('-data_publicacao')[:3]
         context['artigos_recentes'] = Noticia.objects.filter(destaque=False).order_by('-data_publicacao')[:3]
+        context['home_cache_timeout'] = HOME_CACHE_TIMEOUT
+        context['geracao_noticias'] = obter_geracao(GERACAO_NOTICIAS)
         return context
 
+@method_decorator(condition(etag_func=etag_categoria), name='get')
 class NoticiasPorCategoriaView(ListView):
     model = Noticia
     template_name = 'jornal_app/noticias_por_categoria.html'
@@ -106,7 +197,10 @@ class NoticiasPorCategoriaView(ListView):
         
         if self.request.user.is_authenticated:
             user_profile = self.request.user.userprofile
-            user_profile.marcar_categoria_visitada(self.categoria.pk)
+            level_up, nivel = fila_gamificacao.registrar_visita_categoria(user_profile, self.categoria.pk)
+            
+            if level_up:
+                messages.success(self.request, f'🎉 Parabéns! Você subiu para o nível {nivel}!')
         
         return context
 
@@ -164,22 +258,67 @@ class CategoriaDeleteView(DeleteView):
             )
             return redirect(self.success_url)
 
-def noticia_search(request):
-    query = request.GET.get('q', '')
-    noticias = Noticia.objects.all()
-    
+BUSCA_POR_PAGINA = 10
+BUSCA_LIMITE_CONTAGEM = 1000
+
+def _pagina_da_busca(request):
+    query = request.GET.get('q', '').strip()
+    try:
+        pagina = max(1, int(request.GET.get('page', 1)))
+    except ValueError:
+        pagina = 1
+
+    noticias, tem_proxima = [], False
     if query:
-        noticias = noticias.filter(
-            Q(titulo__icontains=query) | 
-            Q(conteudo__icontains=query)
-        ).order_by('-data_publicacao')
-    
-    context = {
+        noticias, tem_proxima = obter_ou_calcular(
+            chave_busca(query, pagina),
+            lambda: buscar_pagina(Noticia.objects.all(), query, pagina, BUSCA_POR_PAGINA),
+        )
+
+    return {
         'noticias': noticias,
-        'query': query
+        'query': query,
+        'pagina': pagina,
+        'tem_proxima': tem_proxima,
+        'proxima_pagina': pagina + 1,
     }
+
+def noticia_search(request):
+    context = _pagina_da_busca(request)
+
+    if context['noticias']:
+        total, total_exato = obter_ou_calcular(
+            chave_busca(context['query']),
+            lambda: contar_resultados(Noticia.objects.all(), context['query'], BUSCA_LIMITE_CONTAGEM),
+        )
+        context['total'] = total
+        context['total_exato'] = total_exato
+
     return render(request, 'jornal_app/noticia_search.html', context)
 
+def noticia_search_feed(request):
+    context = _pagina_da_busca(request)
+    return render(request, 'jornal_app/partials/busca_feed.html', context)
+
+SUGESTOES_LIMITE = 8
+SUGESTOES_MIN_CARACTERES = 2
+
+def noticia_sugestoes(request):
+    query = request.GET.get('q', '').strip()
+    if len(query) < SUGESTOES_MIN_CARACTERES:
+        return JsonResponse({'sugestoes': []})
+
+    carregar_indice_titulos()
+    sugestoes = [
+        {
+            'id': pk,
+            'titulo': titulo,
+            'url': reverse('jornal_app:artigo', kwargs={'pk': pk}),
+        }
+        for pk, titulo in indice_titulos.sugerir(query, limite=SUGESTOES_LIMITE)
+    ]
+    return JsonResponse({'sugestoes': sugestoes})
+
 @staff_member_required
 def criar_categorias_api(request):
     categorias_api = [
@@ -201,6 +340,8 @@ def criar_categorias_api(request):
     
     return redirect('jornal_app:importar_noticias')
 
+TAREFAS_RECENTES = 20
+
 @staff_member_required
 def importar_noticias(request):
     api_key = getattr(settings, 'NEWSDATA_API_KEY', '')
@@ -213,147 +354,37 @@ def importar_noticias(request):
             messages.error(request, '❌ Chave API não configurada. Adicione NEWSDATA_API_KEY no settings.py')
             return redirect('jornal_app:importar_noticias')
             
-        try:
-            categoria_id = request.POST.get('categoria')
-            
-            if categoria_id:
-                categoria_filtro = get_object_or_404(Categoria, pk=categoria_id)
-                quantidade_importada = importar_noticias_por_categoria(categoria_filtro)
-                messages.success(request, f'✅ {quantidade_importada} notícias de {categoria_filtro.nome} importadas!')
-            else:
-                total_importadas = 0
-                for categoria in categorias:
-                    quantidade = importar_noticias_por_categoria(categoria)
-                    total_importadas += quantidade
-                    print(f"📰 {quantidade} notícias importadas para {categoria.nome}")
-                
-                messages.success(request, f'✅ {total_importadas} notícias importadas para TODAS as categorias!')
-                
-        except Exception as e:
-            messages.error(request, f'❌ Erro ao importar notícias: {str(e)}')
+        # A importação roda no worker (manage.py importar_noticias --worker);
+        # aqui só entram as tarefas na fila.
+        categoria_id = request.POST.get('categoria')
+        if categoria_id:
+            categorias = [get_object_or_404(Categoria, pk=categoria_id)]
+        enfileiradas, ja_na_fila = enfileirar_importacao(categorias, usuario=request.user)
+
+        if enfileiradas:
+            nomes = ', '.join(categoria.nome for categoria in enfileiradas)
+            messages.success(request, f'✅ Importação enfileirada para: {nomes}. Acompanhe o andamento abaixo.')
+        for categoria in ja_na_fila:
+            messages.info(request, f'⏳ {categoria.nome} já tem uma importação na fila.')
         
         return redirect('jornal_app:importar_noticias')
     
+    tarefas = TarefaImportacao.objects.select_related('categoria')
     context = {
         'api_configurada': api_configurada,
         'NEWSDATA_API_KEY': api_key,
-        'categorias': categorias
+        'categorias': categorias,
+        'tarefas': tarefas[:TAREFAS_RECENTES],
+        'tarefas_ativas': tarefas.filter(status__in=TarefaImportacao.ATIVAS).count(),
     }
     return render(request, 'admin/importar_noticias.html', context)
 
-def importar_noticias_por_categoria(categoria):
-    api_key = getattr(settings, 'NEWSDATA_API_KEY', '')
-    
-    if not api_key:
-        raise Exception('Chave API não configurada')
-    
-    base_url = "https://newsdata.io/api/1/news"
-    
-    mapeamento_para_api = {
-        'Política': 'politics',
-        'Esportes': 'sports', 
-        'Economia': 'business',
-        'Tecnologia': 'technology',
-        'Entretenimento': 'entertainment',
-        'Saúde': 'health',
-        'Ciência': 'science',
-        'Geral': 'general'
-    }
-    
-    categoria_api = mapeamento_para_api.get(categoria.nome, 'general')
-    print(f"🎯 Buscando notícias: {categoria.nome} → {categoria_api}")
-    
-    params = {
-        'apikey': api_key,
-        'country': 'br', 
-        'language': 'pt',
-        'category': categoria_api,
-        'size': 5
-    }
-    
-    try:
-        response = requests.get(base_url, params=params, timeout=30)
-        
-        if response.status_code != 200:
-            print(f"❌ Erro na API para {categoria.nome}: {response.status_code}")
-            return 0
-        
-        data = response.json()
-        articles = data.get('results', [])
-        
-        print(f"📰 {len(articles)} notícias recebidas para {categoria.nome}")
-        return processar_artigos_para_categoria(articles, categoria)
-        
-    except Exception as e:
-        print(f"❌ Erro ao buscar notícias para {categoria.nome}: {str(e)}")
-        return 0
-
-def processar_artigos_para_categoria(articles, categoria):
-    quantidade_importada = 0
-    
-    for article in articles:
-        url_fonte = article.get('link', '')
-        if Noticia.objects.filter(url_fonte=url_fonte).exists():
-            continue
-        
-        data_publicacao = parse_date(article.get('pubDate', ''))
-        
-        conteudo_final = article.get('description', '')
-        if not conteudo_final:
-            conteudo_final = article.get('content', '')
-        if not conteudo_final:
-            conteudo_final = article.get('title', 'Artigo sem conteúdo')
-        
-        if not conteudo_final.strip():
-            continue
-            
-        noticia = Noticia(
-            titulo=article.get('title', '')[:200],
-            conteudo=conteudo_final[:2000],
-            categoria=categoria,
-            url_fonte=url_fonte[:500],
-            imagem_url=article.get('image_url', '')[:500],
-            autor_fonte=article.get('source_id', 'Fonte Externa')[:100],
-            data_publicacao=data_publicacao,
-            destaque=(categoria.nome == 'Política')
-        )
-        
-        noticia.save()
-        quantidade_importada += 1
-        print(f"✅ Notícia salva: {noticia.titulo[:50]}...")
-    
-    return quantidade_importada
-
-def parse_date(date_string):
-    if not date_string:
-        return datetime.now()
-    
-    try:
-        return datetime.fromisoformat(date_string.replace('Z', '+00:00'))
-    except (ValueError, AttributeError):
-        try:
-            formats = [
-                '%a, %d %b %Y %H:%M:%S %Z',
-                '%a, %d %b %Y %H:%M:%S %z',
-                '%Y-%m-%d %H:%M:%S',
-                '%Y-%m-%dT%H:%M:%S.%fZ',
-                '%Y-%m-%d'
-            ]
-            
-            for fmt in formats:
-                try:
-                    return datetime.strptime(date_string, fmt)
-                except ValueError:
-                    continue
-        except:
-            pass
-        
-        return datetime.now()
-
 @staff_member_required
 def reset_total(request):
     Noticia.objects.all().delete()
     Categoria.objects.all().delete()
+    invalidar_cache_noticias()
+    invalidar_cache_categorias()
     
     messages.success(request, "🗑️ Banco limpo! Pronto para começar do zero.")
     return redirect('jornal_app:criar_categorias_definitivas')
@@ -409,6 +440,25 @@ def profile(request):
     
     return render(request, 'jornal_app/profile.html', context)
 
+RANKING_QUANTIDADE = 10
+
+def ranking(request):
+    usuario = request.user if request.user.is_authenticated else None
+    categoria = None
+    categoria_id = request.GET.get('categoria')
+    if categoria_id and categoria_id.isdigit():
+        categoria = get_object_or_404(Categoria, pk=categoria_id)
+    
+    context = {
+        'ranking_geral': montar_ranking(QUADRO_GERAL, RANKING_QUANTIDADE, usuario),
+        'ranking_semanal': montar_ranking(quadro_semanal(), RANKING_QUANTIDADE, usuario),
+        'categoria': categoria,
+        'ranking_categoria': montar_ranking(quadro_categoria(categoria.pk), RANKING_QUANTIDADE, usuario) if categoria else None,
+    }
+    
+    return render(request, 'jornal_app/ranking.html', context)
+
+@method_decorator(condition(etag_func=etag_categoria), name='get')
 class MaisNoticiasCategoriaView(ListView):
     model = Noticia
     template_name = 'jornal_app/partials/categoria_feed.html'
@@ -3,7 +3,7 @@ document.addEventListener('DOMContentLoaded', function() {
     // Menu mobile (se necessário no futuro)
     initMobileMenu();
     
-    // Busca em tempo real (opcional)
+    // Sugestões de busca enquanto o leitor digita
     initSearch();
     
     // Animações suaves
@@ -17,11 +17,69 @@ function initMobileMenu() {
 
 function initSearch() {
     const searchInput = document.querySelector('.search-input');
-    if (searchInput) {
-        searchInput.addEventListener('input', function(e) {
-            // Implementar busca em tempo real se necessário
+    const suggestionsList = document.querySelector('.search-suggestions');
+    if (!searchInput || !suggestionsList || !searchInput.dataset.sugestoesUrl) {
+        return;
+    }
+
+    const searchSection = searchInput.closest('.search-section');
+    let debounceTimer = null;
+    let lastController = null;
+
+    function hideSuggestions() {
+        suggestionsList.hidden = true;
+        suggestionsList.innerHTML = '';
+        if (searchSection) searchSection.classList.remove('has-suggestions');
+    }
+
+    function showSuggestions(sugestoes) {
+        suggestionsList.innerHTML = '';
+        sugestoes.forEach(sugestao => {
+            const item = document.createElement('li');
+            const link = document.createElement('a');
+            link.href = sugestao.url;
+            link.textContent = sugestao.titulo;
+            link.className = 'search-suggestion';
+            item.appendChild(link);
+            suggestionsList.appendChild(item);
         });
+        suggestionsList.hidden = sugestoes.length === 0;
+        if (searchSection) searchSection.classList.toggle('has-suggestions', sugestoes.length > 0);
+    }
+
+    async function fetchSuggestions(query) {
+        // Cancela a requisição anterior para não exibir sugestões atrasadas
+        if (lastController) lastController.abort();
+        lastController = new AbortController();
+
+        try {
+            const params = new URLSearchParams({ q: query });
+            const response = await fetch(`${searchInput.dataset.sugestoesUrl}?${params}`, {
+                signal: lastController.signal,
+            });
+            const data = await response.json();
+            showSuggestions(data.sugestoes || []);
+        } catch (error) {
+            if (error.name !== 'AbortError') {
+                console.error('Erro ao buscar sugestões:', error);
+            }
+        }
     }
+
+    searchInput.addEventListener('input', function(e) {
+        const query = e.target.value.trim();
+        clearTimeout(debounceTimer);
+
+        if (query.length < 2) {
+            hideSuggestions();
+            return;
+        }
+        debounceTimer = setTimeout(() => fetchSuggestions(query), 150);
+    });
+
+    searchInput.addEventListener('keydown', function(e) {
+        if (e.key === 'Escape') hideSuggestions();
+    });
 }
 
 function initAnimations() {